@@ -7,7 +7,8 @@ from sqlalchemy import pool
 from alembic import context
 
 from app.database import Base
-from app.models import User, TokenBlacklist, Category, Book, book_categories, CartItem, Order, OrderItem, OrderStatusHistory, Review
+from app.models.book import is_search_index
+from app.models import User, TokenBlacklist, Category, Book, book_categories, CartItem, Order, OrderItem, OrderStatusHistory, Review, DailyStats, DailyOrderStats
 
 config = context.config
 
@@ -16,6 +17,17 @@ if config.config_file_name is not None:
 
 target_metadata = Base.metadata
 
+
+# The full-text search index is raw DDL outside Base.metadata; without these
+# filters autogenerate would emit a migration dropping it
+def include_name(name, type_, parent_names):
+    return not is_search_index(name, type_)
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    return not is_search_index(name, type_)
+
+
 # Get DATABASE_URL from environment, converting to sync driver for Alembic
 def get_sync_database_url():
     url = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./bookstore.db")
@@ -37,6 +49,8 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_name=include_name,
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -54,7 +68,10 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection,
+            target_metadata=target_metadata,
+            include_name=include_name,
+            include_object=include_object,
         )
 
         with context.begin_transaction():
@@ -0,0 +1,28 @@
+"""add_order_status_history_index
+
+Revision ID: a7c3e9f1b246
+Revises: f2b7c4e8a913
+Create Date: 2026-10-17 21:12:08.530417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7c3e9f1b246'
+down_revision: Union[str, None] = 'f2b7c4e8a913'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Finds an order's PAID transition for the "customers also bought" query
+    op.create_index(
+        'ix_order_status_history_order_id_status', 'order_status_history', ['order_id', 'status'], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_order_status_history_order_id_status', table_name='order_status_history')
@@ -0,0 +1,40 @@
+"""add_book_fulltext_search
+
+Revision ID: b3d91e6f2a10
+Revises: 7f12590bdecc
+Create Date: 2026-10-17 09:12:40.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.models.book import POSTGRES_FTS_DDL, POSTGRES_FTS_DROP, SQLITE_FTS_DDL, SQLITE_FTS_DROP
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3d91e6f2a10'
+down_revision: Union[str, None] = '7f12590bdecc'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# The same DDL the app runs when it creates the books table itself
+SQLITE_UPGRADE = [*SQLITE_FTS_DDL, "INSERT INTO books_fts(books_fts) VALUES ('rebuild')"]
+SQLITE_DOWNGRADE = SQLITE_FTS_DROP
+POSTGRES_UPGRADE = POSTGRES_FTS_DDL
+POSTGRES_DOWNGRADE = POSTGRES_FTS_DROP
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    statements = {"sqlite": SQLITE_UPGRADE, "postgresql": POSTGRES_UPGRADE}.get(dialect, [])
+    for statement in statements:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    statements = {"sqlite": SQLITE_DOWNGRADE, "postgresql": POSTGRES_DOWNGRADE}.get(dialect, [])
+    for statement in statements:
+        op.execute(statement)
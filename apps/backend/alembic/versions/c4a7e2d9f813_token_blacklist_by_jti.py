@@ -0,0 +1,77 @@
+"""token_blacklist_by_jti
+
+Revision ID: c4a7e2d9f813
+Revises: b3d91e6f2a10
+Create Date: 2026-10-17 11:03:27.450912
+
+"""
+import hashlib
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from jose import jwt, JWTError
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4a7e2d9f813'
+down_revision: Union[str, None] = 'b3d91e6f2a10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+token_blacklist = sa.table(
+    'token_blacklist',
+    sa.column('id', sa.Integer),
+    sa.column('token', sa.Text),
+    sa.column('jti', sa.String),
+    sa.column('expires_at', sa.DateTime),
+)
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('token_blacklist') as batch_op:
+        batch_op.add_column(sa.Column('jti', sa.String(64), nullable=True))
+        batch_op.add_column(sa.Column('expires_at', sa.DateTime(), nullable=True))
+
+    # Existing rows hold whole tokens issued before jti existed; key them by
+    # digest, which is what the application uses for tokens without a jti
+    bind = op.get_bind()
+    rows = bind.execute(sa.select(token_blacklist.c.id, token_blacklist.c.token)).all()
+    for row_id, token in rows:
+        try:
+            claims = jwt.get_unverified_claims(token)
+            expires_at = datetime.utcfromtimestamp(claims['exp'])
+        except (JWTError, KeyError, TypeError, ValueError):
+            claims, expires_at = {}, datetime.utcnow()
+        jti = claims.get('jti') or hashlib.sha256(token.encode()).hexdigest()
+        bind.execute(
+            token_blacklist.update()
+            .where(token_blacklist.c.id == row_id)
+            .values(jti=jti, expires_at=expires_at)
+        )
+
+    with op.batch_alter_table('token_blacklist') as batch_op:
+        batch_op.drop_index('ix_token_blacklist_token')
+        batch_op.drop_column('token')
+        batch_op.alter_column('jti', existing_type=sa.String(64), nullable=False)
+        batch_op.alter_column('expires_at', existing_type=sa.DateTime(), nullable=False)
+        batch_op.create_index('ix_token_blacklist_jti', ['jti'], unique=True)
+        batch_op.create_index('ix_token_blacklist_expires_at', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    # The original token text cannot be recovered; the identifier takes its place
+    with op.batch_alter_table('token_blacklist') as batch_op:
+        batch_op.add_column(sa.Column('token', sa.Text(), nullable=True))
+
+    op.execute(token_blacklist.update().values(token=token_blacklist.c.jti))
+
+    with op.batch_alter_table('token_blacklist') as batch_op:
+        batch_op.drop_index('ix_token_blacklist_expires_at')
+        batch_op.drop_index('ix_token_blacklist_jti')
+        batch_op.drop_column('expires_at')
+        batch_op.drop_column('jti')
+        batch_op.alter_column('token', existing_type=sa.Text(), nullable=False)
+        batch_op.create_index('ix_token_blacklist_token', ['token'], unique=True)
@@ -0,0 +1,70 @@
+"""book_rating_aggregates
+
+Revision ID: d5e8f3a1b724
+Revises: c4a7e2d9f813
+Create Date: 2026-10-17 14:26:51.304117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5e8f3a1b724'
+down_revision: Union[str, None] = 'c4a7e2d9f813'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+AGGREGATE_COLUMNS = ['rating_sum'] + [f'rating_{stars}_count' for stars in range(1, 6)]
+
+books = sa.table(
+    'books',
+    sa.column('id', sa.Integer),
+    sa.column('rating', sa.Numeric(3, 2)),
+    sa.column('review_count', sa.Integer),
+    *(sa.column(name, sa.Integer) for name in AGGREGATE_COLUMNS),
+)
+
+reviews = sa.table(
+    'reviews',
+    sa.column('id', sa.Integer),
+    sa.column('book_id', sa.Integer),
+    sa.column('rating', sa.Integer),
+    sa.column('is_approved', sa.Boolean),
+)
+
+
+def approved(*criteria):
+    return sa.and_(reviews.c.book_id == books.c.id, reviews.c.is_approved == sa.true(), *criteria)
+
+
+def upgrade() -> None:
+    # Plain ADD/DROP COLUMN keeps the books_fts triggers that a batch rebuild would drop
+    for name in AGGREGATE_COLUMNS:
+        op.add_column('books', sa.Column(name, sa.Integer(), server_default='0', nullable=False))
+
+    values = {
+        'review_count': sa.select(sa.func.count(reviews.c.id)).where(approved()).scalar_subquery(),
+        'rating_sum': sa.select(sa.func.coalesce(sa.func.sum(reviews.c.rating), 0)).where(approved()).scalar_subquery(),
+    }
+    for stars in range(1, 6):
+        values[f'rating_{stars}_count'] = (
+            sa.select(sa.func.count(reviews.c.id)).where(approved(reviews.c.rating == stars)).scalar_subquery()
+        )
+    op.execute(books.update().values(values))
+    op.execute(
+        books.update().values(
+            rating=sa.case(
+                (books.c.review_count > 0, sa.func.round(books.c.rating_sum * sa.literal_column("1.0") / books.c.review_count, 2)),
+                else_=0,
+            )
+        )
+    )
+
+
+def downgrade() -> None:
+    for name in reversed(AGGREGATE_COLUMNS):
+        op.drop_column('books', name)
@@ -0,0 +1,49 @@
+"""add_daily_rollups
+
+Revision ID: e6f1a9c3d852
+Revises: d5e8f3a1b724
+Create Date: 2026-10-17 16:40:12.583920
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6f1a9c3d852'
+down_revision: Union[str, None] = 'd5e8f3a1b724'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+CREATED_AT_TABLES = ['books', 'orders', 'reviews', 'users']
+
+
+def upgrade() -> None:
+    # Rollups are filled in by the application the first time analytics is read
+    op.create_table('daily_stats',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('new_users', sa.Integer(), nullable=False),
+    sa.Column('new_reviews', sa.Integer(), nullable=False),
+    sa.Column('new_books', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('day')
+    )
+    op.create_table('daily_order_stats',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('status', postgresql.ENUM('PENDING', 'PAID', 'CANCELLED', 'SHIPPED', 'COMPLETED', name='orderstatus', create_type=False), nullable=False),
+    sa.Column('order_count', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.PrimaryKeyConstraint('day', 'status')
+    )
+    for table in CREATED_AT_TABLES:
+        op.create_index(op.f(f'ix_{table}_created_at'), table, ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    for table in CREATED_AT_TABLES:
+        op.drop_index(op.f(f'ix_{table}_created_at'), table_name=table)
+    op.drop_table('daily_order_stats')
+    op.drop_table('daily_stats')
@@ -0,0 +1,43 @@
+"""add_hot_path_indexes
+
+Revision ID: f2b7c4e8a913
+Revises: e6f1a9c3d852
+Create Date: 2026-10-17 18:05:44.912311
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2b7c4e8a913'
+down_revision: Union[str, None] = 'e6f1a9c3d852'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Filter columns first, then the sort column and the id tie-breaker of keyset pagination
+INDEXES = [
+    ('ix_orders_user_id_created_at', 'orders', ['user_id', 'created_at', 'id']),
+    ('ix_orders_status_created_at', 'orders', ['status', 'created_at', 'id']),
+    ('ix_order_items_order_id', 'order_items', ['order_id']),
+    ('ix_order_items_book_id_order_id', 'order_items', ['book_id', 'order_id']),
+    ('ix_reviews_book_id_is_approved_created_at', 'reviews', ['book_id', 'is_approved', 'created_at', 'id']),
+    ('ix_reviews_is_approved_created_at', 'reviews', ['is_approved', 'created_at', 'id']),
+    ('ix_cart_items_user_id_expires_at', 'cart_items', ['user_id', 'expires_at']),
+    ('ix_books_is_deleted_created_at', 'books', ['is_deleted', 'created_at', 'id']),
+    ('ix_books_is_deleted_price', 'books', ['is_deleted', 'price', 'id']),
+    ('ix_books_is_deleted_rating', 'books', ['is_deleted', 'rating', 'id']),
+    ('ix_book_categories_category_id', 'book_categories', ['category_id', 'book_id']),
+]
+
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -12,11 +12,86 @@ class Settings(BaseSettings):
 
     # pydantic-settings automatically reads from env vars (case-insensitive)
     database_url: str = "sqlite+aiosqlite:///./bookstore.db"
+
+    # SQLite file databases: one writer connection plus a pool of read-only ones, each tuned on connect
+    sqlite_wal: bool = True
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_cache_size_kib: int = 65536
+    sqlite_mmap_size: int = 268435456
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_read_pool_size: int = 4
+
+    # PostgreSQL pools, and comma-separated read replica URLs for the endpoints that use get_read_db.
+    # A replica lagging more than replica_max_lag_seconds is skipped, and for that long after a
+    # user's own write their reads go to the primary
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_pool_timeout: float = 30
+    database_replica_urls: str = ""
+    db_replica_pool_size: int = 5
+    db_replica_max_overflow: int = 10
+    replica_max_lag_seconds: float = 5.0
+    replica_lag_check_seconds: int = 10
+
     secret_key: str = "dev-secret-key-not-for-production"
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 15
     refresh_token_expire_days: int = 7
 
+    # Per-process cache of decoded access tokens and user rows; 0 disables it
+    auth_cache_ttl_seconds: int = 30
+    auth_cache_size: int = 10000
+
+    # bcrypt runs in a "thread" or "process" pool; requests beyond max_pending get a 503.
+    # 0 workers means CPU count minus one (at least one), leaving a CPU for the event loop.
+    password_hash_executor: str = "thread"
+    password_hash_workers: int = 0
+    password_hash_max_pending: int = 64
+
+    # "Customers also bought" index: on-disk snapshot (empty disables it) and refresh interval
+    copurchase_index_path: str = "data/copurchase.idx"
+    copurchase_refresh_seconds: int = 300
+
+    # Interval for pruning expired blacklist rows and picking up other workers' revocations
+    revocation_sync_seconds: int = 30
+
+    # Interval for rolling days that have closed into the admin dashboard's daily stats
+    analytics_rollup_seconds: int = 600
+
+    # "auto" uses FTS5 on SQLite and tsvector on PostgreSQL; "like" forces ILIKE
+    search_backend: str = "auto"
+
+    # How long include_total=estimate may reuse a counted total where no planner estimate exists
+    count_cache_ttl_seconds: int = 60
+
+    # Catalog GET responses, invalidated by a version bump on every catalog write.
+    # A redis:// URL shares entries and versions between workers; otherwise both are per process.
+    response_cache_enabled: bool = True
+    response_cache_size: int = 2048
+    response_cache_ttl_seconds: int = 300
+    response_cache_url: str = ""
+
+    # Cache-Control sent with cacheable GET responses, per router. "no-cache" lets browsers
+    # and CDNs keep a copy but revalidate it with If-None-Match on every use.
+    books_cache_control: str = "public, no-cache"
+    categories_cache_control: str = "public, max-age=300"
+    reviews_cache_control: str = "public, no-cache"
+
+    # Large list endpoints (books, a user's orders, a book's reviews) build their JSON from projected
+    # rows with orjson instead of validating every item against the response model. Opt-in: both
+    # paths build the same fields, but only the default one checks them against the response model
+    fast_list_responses: bool = False
+
+    # Upper bound on how long the in-process category registry may go without reloading,
+    # for deployments whose categories version is not shared between workers
+    category_registry_ttl_seconds: int = 300
+
+    # Serve per-worker request, query, pool and cache metrics at /metrics
+    metrics_enabled: bool = True
+
+    # Report each request's query count and connection wait in a Server-Timing header
+    server_timing: bool = False
+
     google_client_id: str | None = None
     google_client_secret: str | None = None
     google_redirect_uri: str = "http://localhost:8000/auth/google/callback"
@@ -32,6 +107,15 @@ class Settings(BaseSettings):
             return v.replace("postgresql://", "postgresql+asyncpg://", 1)
         return v
 
+    @field_validator("database_replica_urls", mode="after")
+    @classmethod
+    def convert_replica_urls(cls, v: str) -> str:
+        return ",".join(cls.convert_database_url(url.strip()) for url in v.split(",") if url.strip())
+
+    @property
+    def replica_urls(self) -> list[str]:
+        return self.database_replica_urls.split(",") if self.database_replica_urls else []
+
 
 @lru_cache
 def get_settings() -> Settings:
@@ -1,41 +1,310 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
-from sqlalchemy.orm import DeclarativeBase
+import logging
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Iterable
 
-from app.config import get_settings
+from sqlalchemy import CompoundSelect, Engine, Select, event, text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, AsyncSession, async_sessionmaker
+from sqlalchemy.orm import DeclarativeBase, Session, SessionTransaction
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+from app.config import Settings, get_settings
+from app.utils.cache import TTLCache
+from app.utils.metrics import collector, db_checkout_wait, db_query_duration, family
+
+logger = logging.getLogger(__name__)
 
 settings = get_settings()
 
-# Configure engine based on database type
-engine_kwargs = {
-    "echo": False,
-    "future": True,
+# Seconds the replica is behind, or 0 when it has replayed everything it received
+REPLICA_LAG = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+def is_sqlite_file(url: str) -> bool:
+    return url.startswith("sqlite") and ":memory:" not in url and "mode=memory" not in url
+
+
+def apply_sqlite_pragmas(engine: AsyncEngine, settings: Settings, read_only: bool = False) -> None:
+    """Tune every new connection: WAL so readers never wait on the writer, and larger caches."""
+    pragmas = [
+        f"PRAGMA busy_timeout = {settings.sqlite_busy_timeout_ms}",
+        f"PRAGMA synchronous = {settings.sqlite_synchronous}",
+        f"PRAGMA cache_size = -{settings.sqlite_cache_size_kib}",
+        f"PRAGMA mmap_size = {settings.sqlite_mmap_size}",
+        "PRAGMA temp_store = MEMORY",
+    ]
+    if settings.sqlite_wal:
+        pragmas.insert(0, "PRAGMA journal_mode = WAL")
+    if read_only:
+        pragmas.append("PRAGMA query_only = ON")
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+
+def create_engines(settings: Settings) -> tuple[AsyncEngine, AsyncEngine]:
+    """The engine for writes and the engine for reads, which are the same one unless split.
+
+    A SQLite file database gets a single writer connection, so concurrent
+    writers queue for it in the pool instead of failing with "database is
+    locked", and a pool of query_only connections that read alongside it
+    under WAL.
+    """
+    url = settings.database_url
+    engine_kwargs = {
+        "echo": False,
+        "future": True,
+    }
+
+    if url.startswith("sqlite"):
+        engine_kwargs["connect_args"] = {"check_same_thread": False}
+        if not is_sqlite_file(url):
+            engine = create_async_engine(url, **engine_kwargs)
+            return engine, engine
+
+        # aiosqlite defaults to NullPool; a queue pool keeps the tuned connections open
+        engine_kwargs["poolclass"] = AsyncAdaptedQueuePool
+        write_engine = create_async_engine(url, pool_size=1, max_overflow=0, **engine_kwargs)
+        read_engine = create_async_engine(
+            url, pool_size=settings.sqlite_read_pool_size, max_overflow=0, **engine_kwargs
+        )
+        apply_sqlite_pragmas(write_engine, settings)
+        apply_sqlite_pragmas(read_engine, settings, read_only=True)
+        return write_engine, read_engine
+
+    if url.startswith("postgresql"):
+        engine_kwargs["pool_size"] = settings.db_pool_size
+        engine_kwargs["max_overflow"] = settings.db_max_overflow
+        engine_kwargs["pool_timeout"] = settings.db_pool_timeout
+        engine_kwargs["pool_pre_ping"] = True
+    engine = create_async_engine(url, **engine_kwargs)
+    return engine, engine
+
+
+def create_replica_engines(settings: Settings) -> list[AsyncEngine]:
+    return [
+        create_async_engine(
+            url,
+            pool_size=settings.db_replica_pool_size,
+            max_overflow=settings.db_replica_max_overflow,
+            pool_timeout=settings.db_pool_timeout,
+            pool_pre_ping=True,
+        )
+        for url in settings.replica_urls
+    ]
+
+
+class ReplicaSet:
+    """Read replicas taken in turn, skipping any that lag more than ``max_lag`` seconds.
+
+    Lag is measured by ``check_lag``; until the first check every replica
+    counts as current, and one that cannot be reached counts as infinitely
+    behind until it answers again.
+    """
+
+    def __init__(self, engines: list[AsyncEngine], max_lag: float):
+        self.engines = engines
+        self.max_lag = max_lag
+        self.lag = {engine: 0.0 for engine in engines}
+        self._turn = 0
+
+    def __bool__(self) -> bool:
+        return bool(self.engines)
+
+    def pick(self) -> AsyncEngine | None:
+        """The next replica within the lag budget, or None to read from the primary."""
+        current = [engine for engine in self.engines if self.lag[engine] <= self.max_lag]
+        if not current:
+            return None
+        self._turn += 1
+        return current[self._turn % len(current)]
+
+    async def check_lag(self) -> None:
+        for engine in self.engines:
+            if engine.dialect.name != "postgresql":
+                continue
+            try:
+                async with engine.connect() as conn:
+                    self.lag[engine] = float((await conn.execute(REPLICA_LAG)).scalar_one())
+            except (OSError, SQLAlchemyError):
+                logger.warning(f"Replica {engine.url.host} is unreachable, reading from the primary")
+                self.lag[engine] = float("inf")
+
+
+@dataclass
+class RequestStats:
+    """Database work done while serving one request."""
+
+    queries: int = 0
+    checkouts: int = 0
+    checkout_seconds: float = 0.0
+
+
+# Set per request by the app's middleware; None outside a request
+request_stats: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+
+
+OPERATIONS = frozenset({"SELECT", "INSERT", "UPDATE", "DELETE"})
+
+
+def statement_operation(statement: str) -> str:
+    operation = statement.lstrip()[:6].upper()
+    return operation if operation in OPERATIONS else "OTHER"
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_query(conn, cursor, statement, parameters, context, executemany) -> None:
+    if context is not None:
+        context.started_at = time.perf_counter()
+    stats = request_stats.get()
+    if stats is not None:
+        stats.queries += 1
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _time_query(conn, cursor, statement, parameters, context, executemany) -> None:
+    started_at = getattr(context, "started_at", None)
+    if started_at is not None:
+        db_query_duration.observe(time.perf_counter() - started_at, statement_operation(statement))
+
+
+@event.listens_for(Pool, "checkout")
+def _count_checkout(dbapi_connection, connection_record, connection_proxy) -> None:
+    stats = request_stats.get()
+    if stats is not None:
+        stats.checkouts += 1
+
+
+def is_read(clause) -> bool:
+    return isinstance(clause, (Select, CompoundSelect)) and clause._for_update_arg is None
+
+
+class RoutingSession(Session):
+    """Sends plain SELECTs to ``read_bind`` until the transaction writes.
+
+    From the first flush, DML statement or SELECT ... FOR UPDATE until the
+    transaction ends, every statement goes to the writer, so the session
+    reads its own uncommitted changes.
+    """
+
+    def __init__(self, *args, read_bind: Engine | None = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.read_bind = read_bind
+        self.writing = False
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self.writing:
+            return super().get_bind(mapper, clause=clause, **kwargs)
+        if self._flushing or not is_read(clause):
+            self.writing = True
+            return super().get_bind(mapper, clause=clause, **kwargs)
+        return self.read_bind or super().get_bind(mapper, clause=clause, **kwargs)
+
+    def _connection_for_bind(self, engine, execution_options=None, **kwargs):
+        transaction = self._transaction
+        if transaction is not None and engine in transaction._connections:
+            return super()._connection_for_bind(engine, execution_options, **kwargs)
+        # The transaction's first statement on this bind waits here for a pooled connection
+        start = time.perf_counter()
+        try:
+            return super()._connection_for_bind(engine, execution_options, **kwargs)
+        finally:
+            waited = time.perf_counter() - start
+            db_checkout_wait.observe(waited, engine_roles.get(engine, "other"))
+            stats = request_stats.get()
+            if stats is not None:
+                stats.checkout_seconds += waited
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _remember_writer(session: RoutingSession) -> None:
+    user_id = session.info.get("user_id")
+    if replicas and session.writing and user_id is not None:
+        recent_writers.set(user_id, True)
+
+
+@event.listens_for(RoutingSession, "after_transaction_end")
+def _stop_writing(session: RoutingSession, transaction: SessionTransaction) -> None:
+    if transaction.parent is None:
+        session.writing = False
+
+
+def session_factory(write_engine: AsyncEngine, read_engine: AsyncEngine) -> async_sessionmaker:
+    return async_sessionmaker(
+        write_engine,
+        class_=AsyncSession,
+        sync_session_class=RoutingSession,
+        read_bind=read_engine.sync_engine if read_engine is not write_engine else None,
+        expire_on_commit=False,
+        autocommit=False,
+        autoflush=False,
+    )
+
+
+engine, read_engine = create_engines(settings)
+
+AsyncSessionLocal = session_factory(engine, read_engine)
+
+replicas = ReplicaSet(create_replica_engines(settings), settings.replica_max_lag_seconds)
+
+# Metric labels of the app's engines
+engine_roles: dict[Engine, str] = {
+    replica.sync_engine: f"replica{number}" for number, replica in enumerate(replicas.engines)
 }
+engine_roles[read_engine.sync_engine] = "reader"
+engine_roles[engine.sync_engine] = "primary"
+
+
+@collector
+def _pool_metrics() -> Iterable[str]:
+    pools = {(role,): bound.pool for bound, role in engine_roles.items() if isinstance(bound.pool, QueuePool)}
+    yield from family("db_pool_size", "gauge", "Connections the pool keeps open", ("engine",),
+                      {role: pool.size() for role, pool in pools.items()})
+    yield from family("db_pool_checked_out", "gauge", "Connections in use", ("engine",),
+                      {role: pool.checkedout() for role, pool in pools.items()})
+    yield from family("db_pool_overflow", "gauge", "Connections open beyond the pool size", ("engine",),
+                      {role: max(pool.overflow(), 0) for role, pool in pools.items()})
 
-# SQLite-specific settings
-if settings.database_url.startswith("sqlite"):
-    engine_kwargs["connect_args"] = {"check_same_thread": False}
-# PostgreSQL-specific settings
-elif settings.database_url.startswith("postgresql"):
-    engine_kwargs["pool_size"] = 5
-    engine_kwargs["max_overflow"] = 10
-    engine_kwargs["pool_pre_ping"] = True
-
-engine = create_async_engine(settings.database_url, **engine_kwargs)
-
-AsyncSessionLocal = async_sessionmaker(
-    engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
-    autocommit=False,
-    autoflush=False,
+# Users whose last write may not have reached the replicas yet (per process)
+recent_writers: TTLCache[int, bool] = TTLCache(
+    "recent_writers", maxsize=100000, ttl=settings.replica_max_lag_seconds
 )
 
 
+def use_replica(session: AsyncSession, user_id: int | None = None) -> None:
+    """Send the session's SELECTs to a current replica, unless ``user_id`` has just written."""
+    if not replicas or (user_id is not None and recent_writers.get(user_id)):
+        return
+    replica = replicas.pick()
+    if replica is not None:
+        session.sync_session.read_bind = replica.sync_engine
+
+
+def read_session(user_id: int | None = None) -> AsyncSession:
+    """A new session whose SELECTs go to a current replica, unless ``user_id`` has just written."""
+    session = AsyncSessionLocal()
+    # A commit that writes marks the user as a recent writer, as on get_db's session
+    session.info["user_id"] = user_id
+    use_replica(session, user_id)
+    return session
+
+
 class Base(DeclarativeBase):
     pass
 
 
 async def get_db():
+    # One session per request, shared by every dependency that declares get_db;
+    # it checks out a connection only when its first statement runs
     async with AsyncSessionLocal() as session:
         try:
             yield session
@@ -2,20 +2,46 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app.database import get_db, read_session
 from app.models.user import User, UserRole
 from app.services.auth import AuthService
 from app.exceptions import ForbiddenException
+from app.utils.auth_cache import access_claims
 
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
+
+
+async def get_token_claims(
+    credentials: HTTPAuthorizationCredentials | None = Depends(optional_security),
+) -> dict | None:
+    """The bearer token's access claims, decoded at most once per request; None without a valid one."""
+    if not credentials:
+        return None
+    return access_claims(credentials.credentials)
 
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
+    claims: dict | None = Depends(get_token_claims),
     db: AsyncSession = Depends(get_db),
 ) -> User:
     auth_service = AuthService(db)
-    return await auth_service.get_current_user(credentials.credentials)
+    user = await auth_service.get_current_user(credentials.credentials, claims)
+    # Commits on this session mark the user as a recent writer (see get_read_db)
+    db.info["user_id"] = user.id
+    return user
+
+
+async def get_read_db(claims: dict | None = Depends(get_token_claims)):
+    """Session for read endpoints, separate from get_db's: SELECTs go to a read replica when one
+    is configured and current, except for a caller whose own write may not have replicated yet."""
+    user_id = int(claims["sub"]) if claims and claims.get("sub") else None
+    async with read_session(user_id) as session:
+        try:
+            yield session
+        finally:
+            await session.close()
 
 
 async def get_current_active_user(
@@ -39,16 +65,15 @@ async def get_admin_user(
 
 def get_optional_user():
     async def _get_optional_user(
-        credentials: HTTPAuthorizationCredentials | None = Depends(
-            HTTPBearer(auto_error=False)
-        ),
+        credentials: HTTPAuthorizationCredentials | None = Depends(optional_security),
+        claims: dict | None = Depends(get_token_claims),
         db: AsyncSession = Depends(get_db),
     ) -> User | None:
         if not credentials:
             return None
         try:
             auth_service = AuthService(db)
-            return await auth_service.get_current_user(credentials.credentials)
+            return await auth_service.get_current_user(credentials.credentials, claims)
         except Exception:
             return None
 
@@ -60,3 +60,12 @@ class PaymentException(BookStoreException):
             detail=detail,
             status_code=status.HTTP_402_PAYMENT_REQUIRED
         )
+
+
+class ServiceUnavailableException(BookStoreException):
+    def __init__(self, detail: str = "Service temporarily unavailable", retry_after: int = 1):
+        super().__init__(
+            detail=detail,
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE
+        )
+        self.headers = {"Retry-After": str(retry_after)}
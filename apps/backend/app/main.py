@@ -1,14 +1,23 @@
+import asyncio
 import os
 import subprocess
+import time
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 import logging
 
-from app.database import create_tables
+from app.config import get_settings
+from app.database import AsyncSessionLocal, RequestStats, create_tables, replicas, request_stats
 from app.routers import auth_router, users_router, categories_router, books_router, cart_router, orders_router, payments_router, reviews_router, admin_router
 from app.exceptions import BookStoreException
+from app.services.analytics import AnalyticsService
+from app.services.auth import AuthService
+from app.services.category_registry import category_registry
+from app.services.copurchase import copurchase_index
+from app.utils import metrics
+from app.utils.security import password_hasher
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -67,6 +76,59 @@ def run_seed():
             # Don't raise - allow app to start even if seeding fails
 
 
+async def sweep_revocations():
+    """Periodically prune expired blacklisted tokens and sync revocations from other workers"""
+    interval = get_settings().revocation_sync_seconds
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            async with AsyncSessionLocal() as db:
+                deleted = await AuthService(db).sweep_revocations()
+            if deleted:
+                logger.info(f"Pruned {deleted} expired blacklisted tokens")
+        except Exception:
+            logger.exception("Token revocation sweep failed")
+
+
+async def roll_up_analytics():
+    """Roll closed days into the dashboard's daily stats at startup and then periodically"""
+    interval = get_settings().analytics_rollup_seconds
+    while True:
+        try:
+            async with AsyncSessionLocal() as db:
+                await AnalyticsService(db).roll_up_closed_days()
+        except Exception:
+            logger.exception("Analytics rollup failed")
+        await asyncio.sleep(interval)
+
+
+async def refresh_copurchase_index():
+    """Periodically apply orders paid on other workers and snapshot the index to disk"""
+    settings = get_settings()
+    while True:
+        await asyncio.sleep(settings.copurchase_refresh_seconds)
+        try:
+            async with AsyncSessionLocal() as db:
+                await copurchase_index.catch_up(db)
+            if settings.copurchase_index_path:
+                await copurchase_index.save(settings.copurchase_index_path)
+            else:
+                await copurchase_index.compact()
+        except Exception:
+            logger.exception("Co-purchase index refresh failed")
+
+
+async def monitor_replicas():
+    """Periodically measure replica lag so lagging replicas stop serving reads"""
+    interval = get_settings().replica_lag_check_seconds
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await replicas.check_lag()
+        except Exception:
+            logger.exception("Replica lag check failed")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     run_migrations()
@@ -75,7 +137,23 @@ async def lifespan(app: FastAPI):
     if os.getenv("RUN_MIGRATIONS", "false").lower() != "true":
         await create_tables()
     run_seed()
+
+    async with AsyncSessionLocal() as db:
+        await AuthService(db).load_revocations()
+        await category_registry.load(db)
+        await copurchase_index.warm(db, get_settings().copurchase_index_path or None)
+    background_tasks = [
+        asyncio.create_task(sweep_revocations()),
+        asyncio.create_task(refresh_copurchase_index()),
+        asyncio.create_task(roll_up_analytics()),
+    ]
+    if replicas:
+        await replicas.check_lag()
+        background_tasks.append(asyncio.create_task(monitor_replicas()))
     yield
+    for task in background_tasks:
+        task.cancel()
+    password_hasher.shutdown()
 
 
 app = FastAPI(
@@ -96,8 +174,30 @@ app.add_middleware(
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
     logger.info(f"Request: {request.method} {request.url.path}")
-    response = await call_next(request)
-    logger.info(f"Response: {response.status_code} for {request.method} {request.url.path}")
+    stats = request.state.db_stats = RequestStats()
+    token = request_stats.set(stats)
+    metrics.http_requests_in_progress.inc(request.method)
+    start = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+    finally:
+        request_stats.reset(token)
+        metrics.http_requests_in_progress.dec(request.method)
+        # Label by route template so /books/1 and /books/2 share a series
+        route = request.scope.get("route")
+        route_path = route.path if route is not None else "unmatched"
+        metrics.http_request_duration.observe(time.perf_counter() - start, request.method, route_path)
+        metrics.http_requests.inc(request.method, route_path, status_code)
+    logger.info(
+        f"Response: {response.status_code} for {request.method} {request.url.path} "
+        f"({stats.queries} queries, {stats.checkout_seconds * 1000:.1f} ms waiting for connections)"
+    )
+    if get_settings().server_timing:
+        response.headers["Server-Timing"] = (
+            f'db;dur={stats.checkout_seconds * 1000:.1f};desc="{stats.queries} queries, {stats.checkouts} checkouts"'
+        )
     return response
 
 
@@ -106,6 +206,7 @@ async def bookstore_exception_handler(request: Request, exc: BookStoreException)
     return JSONResponse(
         status_code=exc.status_code,
         content={"detail": exc.detail},
+        headers=exc.headers,
     )
 
 
@@ -120,6 +221,14 @@ app.include_router(reviews_router)
 app.include_router(admin_router)
 
 
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Prometheus metrics of this worker process."""
+    if not get_settings().metrics_enabled:
+        return JSONResponse(status_code=404, content={"detail": "Not Found"})
+    return PlainTextResponse(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
 @app.get("/health")
 async def health_check():
     return {
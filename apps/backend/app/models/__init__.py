@@ -4,3 +4,4 @@ from app.models.book import Book, book_categories
 from app.models.cart import CartItem
 from app.models.order import Order, OrderItem, OrderStatusHistory, OrderStatus
 from app.models.review import Review
+from app.models.analytics import DailyStats, DailyOrderStats
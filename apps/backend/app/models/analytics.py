@@ -0,0 +1,31 @@
+from datetime import date
+from decimal import Decimal
+from sqlalchemy import Date, Enum, Integer, Numeric
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+from app.models.order import OrderStatus
+
+
+class DailyStats(Base):
+    """Rows created on a closed (UTC) day, net of later deletions.
+
+    A row exists for every day up to yesterday once it has been rolled up,
+    so the latest ``day`` is also the rollup watermark.
+    """
+    __tablename__ = "daily_stats"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    new_users: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    new_reviews: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    new_books: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+
+
+class DailyOrderStats(Base):
+    """Orders placed on a closed day, bucketed by their current status."""
+    __tablename__ = "daily_order_stats"
+
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    status: Mapped[OrderStatus] = mapped_column(Enum(OrderStatus), primary_key=True)
+    order_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    revenue: Mapped[Decimal] = mapped_column(Numeric(12, 2), default=Decimal("0.00"), nullable=False)
@@ -1,6 +1,6 @@
 from datetime import datetime
 from decimal import Decimal
-from sqlalchemy import String, DateTime, Text, Numeric, Integer, Boolean, ForeignKey, Table, Column
+from sqlalchemy import String, DateTime, Text, Numeric, Integer, Boolean, ForeignKey, Table, Column, MetaData, DDL, Index, event
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -10,11 +10,18 @@ book_categories = Table(
     Base.metadata,
     Column("book_id", Integer, ForeignKey("books.id", ondelete="CASCADE"), primary_key=True),
     Column("category_id", Integer, ForeignKey("categories.id", ondelete="CASCADE"), primary_key=True),
+    Index("ix_book_categories_category_id", "category_id", "book_id"),
 )
 
 
 class Book(Base):
     __tablename__ = "books"
+    # One per listing sort, led by the soft-delete filter and ending in the id tie-breaker
+    __table_args__ = (
+        Index("ix_books_is_deleted_created_at", "is_deleted", "created_at", "id"),
+        Index("ix_books_is_deleted_price", "is_deleted", "price", "id"),
+        Index("ix_books_is_deleted_rating", "is_deleted", "rating", "id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     title: Mapped[str] = mapped_column(String(255), nullable=False, index=True)
@@ -26,8 +33,15 @@ class Book(Base):
     cover_image: Mapped[str | None] = mapped_column(String(500), nullable=True)
     rating: Mapped[Decimal] = mapped_column(Numeric(3, 2), default=Decimal("0.00"), nullable=False)
     review_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    # Running aggregates over approved reviews; rating is rating_sum / review_count
+    rating_sum: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    rating_1_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    rating_2_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    rating_3_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    rating_4_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    rating_5_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
     is_deleted: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, index=True, nullable=False)
     updated_at: Mapped[datetime] = mapped_column(
         DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
     )
@@ -37,3 +51,87 @@ class Book(Base):
         secondary=book_categories,
         back_populates="books"
     )
+
+    @property
+    def rating_histogram(self) -> dict[int, int]:
+        return {stars: getattr(self, f"rating_{stars}_count") or 0 for stars in range(1, 6)}
+
+
+# Full-text search index over books. SQLite uses an external-content FTS5 table
+# kept in sync by triggers; PostgreSQL uses a generated tsvector column with a
+# GIN index. Neither is part of Base.metadata, so they are created by DDL hooks
+# when the books table itself is created (and by the matching migration).
+books_fts = Table(
+    "books_fts",
+    MetaData(),
+    Column("rowid", Integer, primary_key=True),
+    Column("books_fts", Text),
+    Column("title", Text),
+    Column("author", Text),
+    Column("description", Text),
+    Column("isbn", Text),
+    Column("rank", Numeric),
+)
+
+SQLITE_FTS_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS books_fts USING fts5("
+    "title, author, description, isbn, content='books', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS books_fts_ai AFTER INSERT ON books BEGIN "
+    "INSERT INTO books_fts(rowid, title, author, description, isbn) "
+    "VALUES (new.id, new.title, new.author, new.description, new.isbn); END",
+    "CREATE TRIGGER IF NOT EXISTS books_fts_ad AFTER DELETE ON books BEGIN "
+    "INSERT INTO books_fts(books_fts, rowid, title, author, description, isbn) "
+    "VALUES ('delete', old.id, old.title, old.author, old.description, old.isbn); END",
+    "CREATE TRIGGER IF NOT EXISTS books_fts_au AFTER UPDATE OF title, author, description, isbn ON books BEGIN "
+    "INSERT INTO books_fts(books_fts, rowid, title, author, description, isbn) "
+    "VALUES ('delete', old.id, old.title, old.author, old.description, old.isbn); "
+    "INSERT INTO books_fts(rowid, title, author, description, isbn) "
+    "VALUES (new.id, new.title, new.author, new.description, new.isbn); END",
+]
+
+SQLITE_FTS_DROP = [
+    "DROP TRIGGER IF EXISTS books_fts_au",
+    "DROP TRIGGER IF EXISTS books_fts_ad",
+    "DROP TRIGGER IF EXISTS books_fts_ai",
+    "DROP TABLE IF EXISTS books_fts",
+]
+
+POSTGRES_SEARCH_DOCUMENT = (
+    "to_tsvector('simple', coalesce(title, '') || ' ' || coalesce(author, '') || ' ' "
+    "|| coalesce(description, '') || ' ' || coalesce(isbn, ''))"
+)
+
+POSTGRES_FTS_DDL = [
+    f"ALTER TABLE books ADD COLUMN IF NOT EXISTS search_vector tsvector "
+    f"GENERATED ALWAYS AS ({POSTGRES_SEARCH_DOCUMENT}) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_books_search_vector ON books USING GIN (search_vector)",
+]
+
+POSTGRES_FTS_DROP = [
+    "DROP INDEX IF EXISTS ix_books_search_vector",
+    "ALTER TABLE books DROP COLUMN IF EXISTS search_vector",
+]
+
+
+def is_search_index(name: str | None, type_: str) -> bool:
+    """Whether a database object belongs to the search index above, for autogenerate to skip.
+
+    The FTS5 table's shadow tables (books_fts_data, books_fts_idx, ...) share
+    its prefix. Triggers are never compared, so they need no entry.
+    """
+    if type_ == "table":
+        return bool(name) and name.startswith("books_fts")
+    if type_ == "column":
+        return name == "search_vector"
+    if type_ == "index":
+        return name == "ix_books_search_vector"
+    return False
+
+for statement in SQLITE_FTS_DDL:
+    event.listen(Book.__table__, "after_create", DDL(statement).execute_if(dialect="sqlite"))
+for statement in POSTGRES_FTS_DDL:
+    event.listen(Book.__table__, "after_create", DDL(statement).execute_if(dialect="postgresql"))
+event.listen(
+    Book.__table__, "before_drop", DDL("DROP TABLE IF EXISTS books_fts").execute_if(dialect="sqlite")
+)
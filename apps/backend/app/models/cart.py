@@ -1,5 +1,5 @@
 from datetime import datetime, timedelta
-from sqlalchemy import Integer, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy import Integer, DateTime, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -9,6 +9,7 @@ class CartItem(Base):
     __tablename__ = "cart_items"
     __table_args__ = (
         UniqueConstraint("user_id", "book_id", name="uq_user_book"),
+        Index("ix_cart_items_user_id_expires_at", "user_id", "expires_at"),
     )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import String, DateTime, Text, Integer, Boolean, ForeignKey, UniqueConstraint, CheckConstraint
+from sqlalchemy import String, DateTime, Text, Integer, Boolean, ForeignKey, Index, UniqueConstraint, CheckConstraint
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.database import Base
@@ -10,6 +10,8 @@ class Review(Base):
     __table_args__ = (
         UniqueConstraint("user_id", "book_id", name="uq_user_book_review"),
         CheckConstraint("rating >= 1 AND rating <= 5", name="ck_rating_range"),
+        Index("ix_reviews_book_id_is_approved_created_at", "book_id", "is_approved", "created_at", "id"),
+        Index("ix_reviews_is_approved_created_at", "is_approved", "created_at", "id"),
     )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
@@ -19,7 +21,7 @@ class Review(Base):
     comment: Mapped[str | None] = mapped_column(Text, nullable=True)
     is_verified_purchase: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
     is_approved: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, index=True, nullable=False)
     updated_at: Mapped[datetime] = mapped_column(
         DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
     )
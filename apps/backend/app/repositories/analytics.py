@@ -0,0 +1,144 @@
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Sequence
+from sqlalchemy import Date, delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.analytics import DailyStats, DailyOrderStats
+from app.models.book import Book
+from app.models.order import Order, OrderStatus
+from app.models.review import Review
+from app.models.user import User
+from app.repositories.base import BaseRepository
+
+# Models counted into DailyStats, by the column they feed
+DAILY_COUNTS = {"new_users": User, "new_reviews": Review, "new_books": Book}
+
+
+def start_of(day: date) -> datetime:
+    return datetime.combine(day, datetime.min.time())
+
+
+def utc_today() -> date:
+    return datetime.utcnow().date()
+
+
+class AnalyticsRepository(BaseRepository[DailyStats]):
+    def __init__(self, db: AsyncSession):
+        super().__init__(DailyStats, db)
+
+    async def get_latest_day(self) -> date | None:
+        result = await self.db.execute(select(func.max(DailyStats.day)))
+        return result.scalar_one()
+
+    async def get_first_day(self) -> date | None:
+        first = None
+        for model in (Order, *DAILY_COUNTS.values()):
+            result = await self.db.execute(select(func.min(model.created_at)))
+            created_at = result.scalar_one()
+            if created_at is not None and (first is None or created_at.date() < first):
+                first = created_at.date()
+        return first
+
+    async def roll_up(self, start: date, end: date) -> None:
+        """Recompute the rollups for days in [start, end) from the base tables."""
+        # Deleting first also pins the transaction to the primary, so a session whose
+        # reads go to a replica never rolls up a day from rows the replica has not seen yet
+        await self.db.execute(
+            delete(DailyOrderStats).where(DailyOrderStats.day >= start, DailyOrderStats.day < end)
+        )
+        counts = {
+            start + timedelta(days=offset): dict.fromkeys(DAILY_COUNTS, 0)
+            for offset in range((end - start).days)
+        }
+        for row_day, values in (await self.count_by_day(start_of(start), start_of(end))).items():
+            counts[row_day] = values
+        order_rows = [
+            {"day": row_day, "status": status, "order_count": count, "revenue": revenue}
+            for row_day, status, count, revenue in await self.orders_by_day(start_of(start), start_of(end))
+        ]
+
+        await self.upsert(
+            order_rows, ["day", "status"], replace=["order_count", "revenue"], model=DailyOrderStats
+        )
+        await self.upsert(
+            [{"day": row_day, **values} for row_day, values in counts.items()],
+            ["day"],
+            replace=list(DAILY_COUNTS),
+        )
+
+    async def get_daily_stats(self, start: date | None, end: date) -> Sequence[DailyStats]:
+        query = select(DailyStats).where(DailyStats.day < end).order_by(DailyStats.day)
+        if start is not None:
+            query = query.where(DailyStats.day >= start)
+        result = await self.db.execute(query)
+        return result.scalars().all()
+
+    async def get_daily_order_stats(self, start: date | None, end: date) -> Sequence[DailyOrderStats]:
+        query = select(DailyOrderStats).where(DailyOrderStats.day < end).order_by(DailyOrderStats.day)
+        if start is not None:
+            query = query.where(DailyOrderStats.day >= start)
+        result = await self.db.execute(query)
+        return result.scalars().all()
+
+    async def count_by_day(self, since: datetime | None, until: datetime) -> dict[date, dict[str, int]]:
+        """New users, reviews and books per day for rows created in [since, until); days without any are missing."""
+        counts = {}
+        for column, model in DAILY_COUNTS.items():
+            day = func.date(model.created_at, type_=Date)
+            query = select(day, func.count(model.id)).where(model.created_at < until)
+            if since is not None:
+                query = query.where(model.created_at >= since)
+            if model is Book:
+                query = query.where(Book.is_deleted == False)
+            result = await self.db.execute(query.group_by(day))
+            for row_day, count in result.tuples():
+                counts.setdefault(row_day, dict.fromkeys(DAILY_COUNTS, 0))[column] = count
+        return counts
+
+    async def orders_by_day(
+        self, since: datetime | None, until: datetime
+    ) -> list[tuple[date, OrderStatus, int, Decimal]]:
+        """Order count and revenue per day and status for orders created in [since, until)."""
+        day = func.date(Order.created_at, type_=Date)
+        query = select(day, Order.status, func.count(Order.id), func.sum(Order.total_amount)).where(
+            Order.created_at < until
+        )
+        if since is not None:
+            query = query.where(Order.created_at >= since)
+        result = await self.db.execute(query.group_by(day, Order.status))
+        return [
+            (row_day, status, count, revenue or Decimal("0.00"))
+            for row_day, status, count, revenue in result.tuples()
+        ]
+
+    async def move_order(self, order: Order, status: OrderStatus) -> None:
+        """Shift an order placed on a closed day from its current status bucket to ``status``."""
+        day = order.created_at.date()
+        if day >= utc_today() or order.status == status:
+            return
+        await self.db.execute(
+            update(DailyOrderStats)
+            .where(DailyOrderStats.day == day, DailyOrderStats.status == order.status)
+            .values(
+                order_count=DailyOrderStats.order_count - 1,
+                revenue=DailyOrderStats.revenue - order.total_amount,
+            )
+        )
+        await self.upsert(
+            [{"day": day, "status": status, "order_count": 1, "revenue": order.total_amount}],
+            ["day", "status"],
+            increment=["order_count", "revenue"],
+            model=DailyOrderStats,
+        )
+
+    async def remove(self, column: str, created_at: datetime) -> None:
+        """Take a deleted row created on a closed day out of its day's count."""
+        day = created_at.date()
+        if day >= utc_today():
+            return
+        await self.db.execute(
+            update(DailyStats)
+            .where(DailyStats.day == day)
+            .values({column: getattr(DailyStats, column) - 1})
+        )
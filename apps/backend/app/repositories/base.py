@@ -1,11 +1,60 @@
+import json
 from typing import Generic, TypeVar, Type, Sequence
-from sqlalchemy import select, func
+from sqlalchemy import Select, select, func, literal_column
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.base import Executable
+from sqlalchemy.sql.elements import ClauseElement
 
+from app.config import get_settings
 from app.database import Base
+from app.utils.cache import TTLCache
+from app.utils.pagination import TotalMode
 
 ModelType = TypeVar("ModelType", bound=Base)
 
+count_cache: TTLCache[tuple, int] = TTLCache(
+    "count_estimates", maxsize=1024, ttl=get_settings().count_cache_ttl_seconds
+)
+
+
+class explain(Executable, ClauseElement):
+    inherit_cache = False
+
+    def __init__(self, statement: Select):
+        self.statement = statement
+
+
+@compiles(explain, "postgresql")
+def _compile_explain(element: explain, compiler, **kw) -> str:
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+def dialect_insert(dialect_name: str):
+    """The dialect's INSERT construct, which supports ON CONFLICT clauses."""
+    return postgresql.insert if dialect_name == "postgresql" else sqlite.insert
+
+
+def estimate_query(count_query: Select) -> Select:
+    """The rows ``count_query`` counts, without the COUNT.
+
+    Explaining the aggregate itself is no use: for a large table the planner
+    picks Finalize Aggregate over Gather over Partial Aggregate, and the
+    nodes under the aggregate estimate rows per worker, not in the table.
+    """
+    return count_query.with_only_columns(literal_column("1"), maintain_column_froms=True)
+
+
+def planned_rows(plan: list[dict]) -> int | None:
+    """The planner's row estimate from EXPLAIN (FORMAT JSON) output of ``estimate_query``.
+
+    The top node yields every row, so its estimate is the total even when it
+    is a Gather over a parallel scan whose own estimate is per worker.
+    """
+    rows = plan[0]["Plan"].get("Plan Rows")
+    return int(rows) if rows is not None else None
+
 
 class BaseRepository(Generic[ModelType]):
     def __init__(self, model: Type[ModelType], db: AsyncSession):
@@ -26,6 +75,59 @@ class BaseRepository(Generic[ModelType]):
         result = await self.db.execute(select(func.count(self.model.id)))
         return result.scalar_one()
 
+    async def upsert(
+        self,
+        rows: list[dict],
+        index_elements: Sequence[str],
+        increment: Sequence[str] = (),
+        replace: Sequence[str] = (),
+        model: type[Base] | None = None,
+    ) -> None:
+        """Insert rows, resolving conflicts on ``index_elements`` in the database.
+
+        Conflicting rows add the new values to the ``increment`` columns and
+        overwrite the ``replace`` columns; with neither they are left as is.
+        ``model`` defaults to the repository's own.
+        """
+        if not rows:
+            return
+        model = model or self.model
+        statement = dialect_insert(self.db.bind.dialect.name)(model).values(rows)
+        columns = model.__table__.c
+        set_ = {name: columns[name] + statement.excluded[name] for name in increment}
+        set_.update({name: statement.excluded[name] for name in replace})
+        if set_:
+            statement = statement.on_conflict_do_update(index_elements=index_elements, set_=set_)
+        else:
+            statement = statement.on_conflict_do_nothing(index_elements=index_elements)
+        await self.db.execute(statement)
+
+    async def count_rows(self, count_query: Select, total_mode: TotalMode = TotalMode.EXACT) -> int | None:
+        if total_mode == TotalMode.NONE:
+            return None
+        if total_mode == TotalMode.EXACT:
+            return (await self.db.execute(count_query)).scalar_one()
+
+        if self.db.bind.dialect.name == "postgresql":
+            estimate = await self._planner_estimate(count_query)
+            if estimate is not None:
+                return estimate
+
+        compiled = count_query.compile(dialect=self.db.bind.dialect)
+        key = (str(compiled), repr(sorted(compiled.params.items())))
+        total = count_cache.get(key)
+        if total is None:
+            total = (await self.db.execute(count_query)).scalar_one()
+            count_cache.set(key, total)
+        return total
+
+    async def _planner_estimate(self, count_query: Select) -> int | None:
+        result = await self.db.execute(explain(estimate_query(count_query)))
+        plan = result.scalar_one()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return planned_rows(plan)
+
     async def create(self, obj_in: dict) -> ModelType:
         db_obj = self.model(**obj_in)
         self.db.add(db_obj)
@@ -1,16 +1,34 @@
+from datetime import datetime
 from decimal import Decimal
 from typing import Sequence
-from sqlalchemy import select, func, or_
+from sqlalchemy import Row, and_, case, select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.models.book import Book, book_categories
+from app.models.category import Category
+from app.repositories.analytics import AnalyticsRepository
 from app.repositories.base import BaseRepository
+from app.repositories.search import SearchBackend, get_search_backend
+from app.exceptions import BadRequestException
+from app.schemas.book import Facet
+from app.utils.pagination import TotalMode, paginate
+
+# Lower bounds of the price facet's buckets; the last one is open-ended
+PRICE_BUCKETS = (Decimal("0"), Decimal("10"), Decimal("20"), Decimal("50"), Decimal("100"))
+
+# What list responses show of a book; categories come from the category registry
+LIST_COLUMNS = (
+    Book.id, Book.title, Book.author, Book.price, Book.stock_quantity, Book.cover_image, Book.rating, Book.review_count,
+)
+
+SORTABLE_FIELDS = ("created_at", "updated_at", "title", "author", "price", "rating", "review_count", "stock_quantity")
 
 
 class BookRepository(BaseRepository[Book]):
-    def __init__(self, db: AsyncSession):
+    def __init__(self, db: AsyncSession, search_backend: SearchBackend | None = None):
         super().__init__(Book, db)
+        self.search_backend = search_backend or get_search_backend(db.bind.dialect.name)
 
     async def get_with_categories(self, book_id: int) -> Book | None:
         result = await self.db.execute(
@@ -20,6 +38,12 @@ class BookRepository(BaseRepository[Book]):
         )
         return result.scalar_one_or_none()
 
+    async def get_updated_at(self, book_id: int) -> datetime | None:
+        result = await self.db.execute(
+            select(Book.updated_at).where(Book.id == book_id, Book.is_deleted == False)
+        )
+        return result.scalar_one_or_none()
+
     async def get_by_isbn(self, isbn: str) -> Book | None:
         result = await self.db.execute(select(Book).where(Book.isbn == isbn))
         return result.scalar_one_or_none()
@@ -35,17 +59,20 @@ class BookRepository(BaseRepository[Book]):
         sort_order: str = "desc",
         offset: int = 0,
         limit: int = 20,
-    ) -> tuple[Sequence[Book], int]:
-        query = select(Book).options(selectinload(Book.categories)).where(Book.is_deleted == False)
+        cursor: str | None = None,
+        total_mode: TotalMode = TotalMode.EXACT,
+    ) -> tuple[Sequence[Row], int | None]:
+        """Rows of ``LIST_COLUMNS`` plus the sort column, which the next page's cursor needs."""
+        sort_column = getattr(Book, sort_by if sort_by in SORTABLE_FIELDS else "created_at")
+        query = select(*LIST_COLUMNS).where(Book.is_deleted == False)
+        if sort_column.key not in {column.key for column in LIST_COLUMNS}:
+            query = query.add_columns(sort_column)
         count_query = select(func.count(Book.id)).where(Book.is_deleted == False)
+        relevance = None
 
         if search:
-            search_filter = or_(
-                Book.title.ilike(f"%{search}%"),
-                Book.author.ilike(f"%{search}%")
-            )
-            query = query.where(search_filter)
-            count_query = count_query.where(search_filter)
+            query, relevance = self.search_backend.apply(query, search)
+            count_query, _ = self.search_backend.apply(count_query, search)
 
         if category_id:
             query = query.join(book_categories).where(book_categories.c.category_id == category_id)
@@ -63,18 +90,104 @@ class BookRepository(BaseRepository[Book]):
             query = query.where(Book.stock_quantity > 0)
             count_query = count_query.where(Book.stock_quantity > 0)
 
-        sort_column = getattr(Book, sort_by, Book.created_at)
-        if sort_order == "asc":
-            query = query.order_by(sort_column.asc())
+        if sort_by == "relevance" and relevance is not None:
+            if cursor:
+                raise BadRequestException("Cursor pagination is not supported for relevance sort")
+            query = query.order_by(relevance, Book.id.desc()).offset(offset).limit(limit)
         else:
-            query = query.order_by(sort_column.desc())
-
-        query = query.offset(offset).limit(limit)
+            if sort_by not in SORTABLE_FIELDS:
+                sort_by = "created_at"
+            query = paginate(
+                query,
+                getattr(Book, sort_by),
+                Book.id,
+                descending=sort_order != "asc",
+                sort_key=f"{sort_by}:{sort_order}",
+                cursor=cursor,
+                offset=offset,
+                limit=limit,
+            )
 
         result = await self.db.execute(query)
-        count_result = await self.db.execute(count_query)
+        total = await self.count_rows(count_query, total_mode)
+
+        return result.all(), total
 
-        return result.scalars().all(), count_result.scalar_one()
+    async def get_facets(
+        self,
+        facets: set[Facet],
+        search: str | None = None,
+        category_id: int | None = None,
+        min_price: Decimal | None = None,
+        max_price: Decimal | None = None,
+        in_stock: bool | None = None,
+    ) -> dict:
+        """Count the books matching the filters under each value of the requested facets.
+
+        Each facet ignores its own filter, so the counts show what selecting a
+        different value would return. Categories take one grouped query; price
+        buckets and availability share one pass of conditional counts.
+        """
+        filters = {Facet.CATEGORY: [], Facet.PRICE: [], Facet.AVAILABILITY: []}
+        if category_id:
+            filters[Facet.CATEGORY].append(
+                Book.id.in_(select(book_categories.c.book_id).where(book_categories.c.category_id == category_id))
+            )
+        if min_price is not None:
+            filters[Facet.PRICE].append(Book.price >= min_price)
+        if max_price is not None:
+            filters[Facet.PRICE].append(Book.price <= max_price)
+        if in_stock is True:
+            filters[Facet.AVAILABILITY].append(Book.stock_quantity > 0)
+
+        def other_filters(facet: Facet) -> list:
+            return [condition for other, conditions in filters.items() if other != facet for condition in conditions]
+
+        def count_where(*conditions):
+            return func.count(case((and_(*conditions), Book.id)))
+
+        def matching(query):
+            query = query.where(Book.is_deleted == False)
+            if search:
+                query, _ = self.search_backend.apply(query, search)
+            return query
+
+        result = {}
+        if Facet.CATEGORY in facets:
+            count = func.count(Book.id)
+            rows = await self.db.execute(
+                matching(
+                    select(Category.id, Category.name, count)
+                    .select_from(Book)
+                    .join(book_categories, book_categories.c.book_id == Book.id)
+                    .join(Category, Category.id == book_categories.c.category_id)
+                )
+                .where(*other_filters(Facet.CATEGORY))
+                .group_by(Category.id, Category.name)
+                .order_by(count.desc(), Category.name)
+            )
+            result["categories"] = [
+                {"id": facet_id, "name": name, "count": books} for facet_id, name, books in rows.tuples()
+            ]
+
+        columns = []
+        if Facet.PRICE in facets:
+            bounds = list(zip(PRICE_BUCKETS, PRICE_BUCKETS[1:] + (None,)))
+            for low, high in bounds:
+                bucket = [Book.price >= low] if high is None else [Book.price >= low, Book.price < high]
+                columns.append(count_where(*bucket, *other_filters(Facet.PRICE)))
+        if Facet.AVAILABILITY in facets:
+            columns.append(count_where(Book.stock_quantity > 0, *other_filters(Facet.AVAILABILITY)))
+            columns.append(count_where(Book.stock_quantity <= 0, *other_filters(Facet.AVAILABILITY)))
+
+        if columns:
+            counts = list((await self.db.execute(matching(select(*columns).select_from(Book)))).one())
+            if Facet.PRICE in facets:
+                result["price"] = [{"min": low, "max": high, "count": counts.pop(0)} for low, high in bounds]
+            if Facet.AVAILABILITY in facets:
+                result["availability"] = {"in_stock": counts[0], "out_of_stock": counts[1]}
+
+        return result
 
     async def update_stock(self, book_id: int, quantity_change: int) -> Book | None:
         result = await self.db.execute(
@@ -88,6 +201,8 @@ class BookRepository(BaseRepository[Book]):
         return book
 
     async def soft_delete(self, book: Book) -> Book:
+        if not book.is_deleted:
+            await AnalyticsRepository(self.db).remove("new_books", book.created_at)
         book.is_deleted = True
         await self.db.commit()
         await self.db.refresh(book)
@@ -1,19 +1,24 @@
 from datetime import datetime
 from typing import Sequence
-from sqlalchemy import select, delete
+from sqlalchemy import case, select, delete
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.models.cart import CartItem
 from app.models.book import Book
-from app.repositories.base import BaseRepository
+from app.repositories.base import BaseRepository, dialect_insert
 
 
 class CartRepository(BaseRepository[CartItem]):
     def __init__(self, db: AsyncSession):
         super().__init__(CartItem, db)
 
-    async def get_user_cart(self, user_id: int) -> Sequence[CartItem]:
+    async def get_user_cart(self, user_id: int, populate_existing: bool = False) -> Sequence[CartItem]:
+        """The user's live cart items with their books.
+
+        ``populate_existing`` overwrites items already in the session, for
+        callers that changed rows with bulk statements.
+        """
         result = await self.db.execute(
             select(CartItem)
             .options(selectinload(CartItem.book).selectinload(Book.categories))
@@ -22,19 +27,57 @@ class CartRepository(BaseRepository[CartItem]):
                 CartItem.expires_at > datetime.utcnow()
             )
             .order_by(CartItem.added_at.desc())
+            .execution_options(populate_existing=populate_existing)
         )
         return result.scalars().all()
 
-    async def get_cart_item(self, user_id: int, book_id: int) -> CartItem | None:
-        result = await self.db.execute(
-            select(CartItem)
-            .options(selectinload(CartItem.book).selectinload(Book.categories))
-            .where(
-                CartItem.user_id == user_id,
-                CartItem.book_id == book_id,
-                CartItem.expires_at > datetime.utcnow()
-            )
+    async def get_quantities(self, user_id: int, book_ids: list[int], lock: bool = False) -> dict[int, int]:
+        """Quantity of each of ``book_ids`` in the user's live cart; absent books are missing.
+
+        ``lock`` holds the user's cart rows until the transaction ends.
+        """
+        query = select(CartItem.book_id, CartItem.quantity).where(
+            CartItem.user_id == user_id,
+            CartItem.book_id.in_(book_ids),
+            CartItem.expires_at > datetime.utcnow()
+        )
+        if lock:
+            query = query.with_for_update()
+        result = await self.db.execute(query)
+        return dict(result.tuples().all())
+
+    async def add_quantities(
+        self, user_id: int, quantities: dict[int, int], added_at: datetime, expires_at: datetime
+    ) -> None:
+        """Add ``quantities`` to the user's cart in one statement, so concurrent adds all count.
+
+        A book not in the cart is inserted; an expired row starts over from the added quantity.
+        """
+        statement = dialect_insert(self.db.bind.dialect.name)(CartItem).values([
+            {"user_id": user_id, "book_id": book_id, "quantity": quantity,
+             "added_at": added_at, "expires_at": expires_at}
+            for book_id, quantity in quantities.items()
+        ])
+        columns, excluded = CartItem.__table__.c, statement.excluded
+        live = columns.expires_at > added_at
+        await self.db.execute(statement.on_conflict_do_update(
+            index_elements=["user_id", "book_id"],
+            set_={
+                "quantity": case((live, columns.quantity + excluded.quantity), else_=excluded.quantity),
+                "added_at": case((live, columns.added_at), else_=excluded.added_at),
+                "expires_at": excluded.expires_at,
+            },
+        ))
+
+    async def get_cart_item(self, user_id: int, book_id: int, load_book: bool = True) -> CartItem | None:
+        query = select(CartItem).where(
+            CartItem.user_id == user_id,
+            CartItem.book_id == book_id,
+            CartItem.expires_at > datetime.utcnow()
         )
+        if load_book:
+            query = query.options(selectinload(CartItem.book).selectinload(Book.categories))
+        result = await self.db.execute(query)
         return result.scalar_one_or_none()
 
     async def get_cart_item_by_id(self, item_id: int, user_id: int) -> CartItem | None:
@@ -49,6 +92,11 @@ class CartRepository(BaseRepository[CartItem]):
         )
         return result.scalar_one_or_none()
 
+    async def remove_books(self, user_id: int, book_ids: list[int]) -> None:
+        await self.db.execute(
+            delete(CartItem).where(CartItem.user_id == user_id, CartItem.book_id.in_(book_ids))
+        )
+
     async def clear_user_cart(self, user_id: int) -> None:
         await self.db.execute(
             delete(CartItem).where(CartItem.user_id == user_id)
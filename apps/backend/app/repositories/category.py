@@ -1,6 +1,7 @@
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.models.book import book_categories
 from app.models.category import Category
 from app.repositories.base import BaseRepository
 
@@ -18,3 +19,15 @@ class CategoryRepository(BaseRepository[Category]):
             return []
         result = await self.db.execute(select(Category).where(Category.id.in_(ids)))
         return list(result.scalars().all())
+
+    async def list_all(self) -> list[Category]:
+        result = await self.db.execute(select(Category).order_by(Category.id))
+        return list(result.scalars().all())
+
+    async def get_memberships(self, book_ids: list[int] | None = None) -> list[tuple[int, int]]:
+        """Every (book_id, category_id) pair, or those of ``book_ids``, ordered by book."""
+        query = select(book_categories.c.book_id, book_categories.c.category_id)
+        if book_ids is not None:
+            query = query.where(book_categories.c.book_id.in_(book_ids))
+        result = await self.db.execute(query.order_by(book_categories.c.book_id, book_categories.c.category_id))
+        return list(result.tuples())
@@ -1,10 +1,16 @@
 from typing import Sequence
-from sqlalchemy import select, func
+from sqlalchemy import Row, Select, select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.models.order import Order, OrderItem, OrderStatusHistory, OrderStatus
+from app.models.user import User
+from app.repositories.analytics import AnalyticsRepository
 from app.repositories.base import BaseRepository
+from app.utils.pagination import TotalMode, paginate
+
+# What list responses show of an order
+LIST_COLUMNS = (Order.id, Order.user_id, Order.status, Order.total_amount, Order.created_at)
 
 
 class OrderRepository(BaseRepository[Order]):
@@ -34,46 +40,76 @@ class OrderRepository(BaseRepository[Order]):
         )
         return result.scalar_one_or_none()
 
+    @staticmethod
+    def _list_query(with_user_email: bool = False) -> Select:
+        """Order list columns, with the item count summed in SQL instead of loading the items.
+
+        The count is a correlated subquery rather than a grouped join, so the
+        database can walk an index in page order and sum items for the page's
+        orders only.
+        """
+        item_count = (
+            select(func.coalesce(func.sum(OrderItem.quantity), 0))
+            .where(OrderItem.order_id == Order.id)
+            .scalar_subquery()
+        )
+        query = select(*LIST_COLUMNS, item_count.label("item_count"))
+        if with_user_email:
+            query = query.add_columns(User.email.label("user_email")).outerjoin(User, User.id == Order.user_id)
+        return query
+
     async def get_user_orders(
         self,
         user_id: int,
         status: OrderStatus | None = None,
         offset: int = 0,
-        limit: int = 20
-    ) -> tuple[Sequence[Order], int]:
-        query = select(Order).options(selectinload(Order.items)).where(Order.user_id == user_id)
+        limit: int = 20,
+        cursor: str | None = None,
+        total_mode: TotalMode = TotalMode.EXACT,
+    ) -> tuple[Sequence[Row], int | None]:
+        """Rows of ``LIST_COLUMNS`` and ``item_count`` for the user's orders."""
+        query = self._list_query().where(Order.user_id == user_id)
         count_query = select(func.count(Order.id)).where(Order.user_id == user_id)
 
         if status:
             query = query.where(Order.status == status)
             count_query = count_query.where(Order.status == status)
 
-        query = query.order_by(Order.created_at.desc()).offset(offset).limit(limit)
+        query = paginate(
+            query, Order.created_at, Order.id, descending=True, sort_key="created_at:desc",
+            cursor=cursor, offset=offset, limit=limit,
+        )
 
         result = await self.db.execute(query)
-        count_result = await self.db.execute(count_query)
+        total = await self.count_rows(count_query, total_mode)
 
-        return result.scalars().all(), count_result.scalar_one()
+        return result.all(), total
 
     async def get_all_orders(
         self,
         status: OrderStatus | None = None,
         offset: int = 0,
-        limit: int = 20
-    ) -> tuple[Sequence[Order], int]:
-        query = select(Order).options(selectinload(Order.items), selectinload(Order.user))
+        limit: int = 20,
+        cursor: str | None = None,
+        total_mode: TotalMode = TotalMode.EXACT,
+    ) -> tuple[Sequence[Row], int | None]:
+        """Rows of ``LIST_COLUMNS``, ``item_count`` and ``user_email`` for every order."""
+        query = self._list_query(with_user_email=True)
         count_query = select(func.count(Order.id))
 
         if status:
             query = query.where(Order.status == status)
             count_query = count_query.where(Order.status == status)
 
-        query = query.order_by(Order.created_at.desc()).offset(offset).limit(limit)
+        query = paginate(
+            query, Order.created_at, Order.id, descending=True, sort_key="created_at:desc",
+            cursor=cursor, offset=offset, limit=limit,
+        )
 
         result = await self.db.execute(query)
-        count_result = await self.db.execute(count_query)
+        total = await self.count_rows(count_query, total_mode)
 
-        return result.scalars().all(), count_result.scalar_one()
+        return result.all(), total
 
     async def add_status_history(
         self,
@@ -87,6 +123,7 @@ class OrderRepository(BaseRepository[Order]):
             note=note
         )
         self.db.add(history)
+        await AnalyticsRepository(self.db).move_order(order, status)
         order.status = status
         await self.db.commit()
         await self.db.refresh(history)
@@ -1,12 +1,29 @@
 from typing import Sequence
-from decimal import Decimal
-from sqlalchemy import select, func
+from decimal import Decimal, ROUND_HALF_UP
+from sqlalchemy import Row, case, literal_column, select, func, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.util import identity_key
 
 from app.models.review import Review
 from app.models.book import Book
+from app.models.user import User
 from app.repositories.base import BaseRepository
+from app.utils.pagination import TotalMode, paginate
+
+RATING_COUNTS = {stars: getattr(Book, f"rating_{stars}_count") for stars in range(1, 6)}
+RATING_COLUMNS = (Book.rating, Book.review_count, Book.rating_sum, *RATING_COUNTS.values())
+
+# What list responses show of a review
+LIST_COLUMNS = (Review.id, Review.rating, Review.comment, Review.is_verified_purchase, Review.created_at)
+
+
+def average_rating(rating_sum: int, review_count: int) -> Decimal:
+    """Mean rating rounded half-up to two places, as SQL ROUND does."""
+    if not review_count:
+        return Decimal("0.00")
+    return (Decimal(rating_sum) / review_count).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
 
 
 class ReviewRepository(BaseRepository[Review]):
@@ -26,62 +43,118 @@ class ReviewRepository(BaseRepository[Review]):
         book_id: int,
         approved_only: bool = True,
         offset: int = 0,
-        limit: int = 20
-    ) -> tuple[Sequence[Review], int]:
-        query = select(Review).options(selectinload(Review.user)).where(Review.book_id == book_id)
+        limit: int = 20,
+        cursor: str | None = None,
+        total_mode: TotalMode = TotalMode.EXACT,
+    ) -> tuple[Sequence[Row], int | None]:
+        """Rows of ``LIST_COLUMNS`` and ``reviewer_name`` for the book's reviews."""
+        query = (
+            select(*LIST_COLUMNS, func.coalesce(User.full_name, "Anonymous").label("reviewer_name"))
+            .outerjoin(User, User.id == Review.user_id)
+            .where(Review.book_id == book_id)
+        )
         count_query = select(func.count(Review.id)).where(Review.book_id == book_id)
 
         if approved_only:
             query = query.where(Review.is_approved == True)
             count_query = count_query.where(Review.is_approved == True)
 
-        query = query.order_by(Review.created_at.desc()).offset(offset).limit(limit)
+        query = paginate(
+            query, Review.created_at, Review.id, descending=True, sort_key="created_at:desc",
+            cursor=cursor, offset=offset, limit=limit,
+        )
 
         result = await self.db.execute(query)
-        count_result = await self.db.execute(count_query)
+        total = await self.count_rows(count_query, total_mode)
 
-        return result.scalars().all(), count_result.scalar_one()
+        return result.all(), total
 
     async def get_pending_reviews(
         self,
         offset: int = 0,
-        limit: int = 20
-    ) -> tuple[Sequence[Review], int]:
+        limit: int = 20,
+        cursor: str | None = None,
+        total_mode: TotalMode = TotalMode.EXACT,
+    ) -> tuple[Sequence[Review], int | None]:
         query = (
             select(Review)
             .options(selectinload(Review.user), selectinload(Review.book))
             .where(Review.is_approved == False)
-            .order_by(Review.created_at.desc())
-            .offset(offset)
-            .limit(limit)
+        )
+        query = paginate(
+            query, Review.created_at, Review.id, descending=True, sort_key="created_at:desc",
+            cursor=cursor, offset=offset, limit=limit,
         )
         count_query = select(func.count(Review.id)).where(Review.is_approved == False)
 
         result = await self.db.execute(query)
-        count_result = await self.db.execute(count_query)
+        total = await self.count_rows(count_query, total_mode)
+
+        return result.scalars().all(), total
+
+    async def apply_rating_change(self, book_id: int, removed: int | None, added: int | None) -> None:
+        """Move one approved rating in or out of the book's running aggregates.
+
+        ``removed`` and ``added`` are the star values the review contributed
+        before and after the change (None when it did not count). The book row
+        is updated relative to its current values in the caller's transaction.
+        """
+        if removed == added:
+            return
 
-        return result.scalars().all(), count_result.scalar_one()
+        review_count = Book.review_count + (added is not None) - (removed is not None)
+        rating_sum = Book.rating_sum + (added or 0) - (removed or 0)
+        values = {
+            Book.review_count: review_count,
+            Book.rating_sum: rating_sum,
+            Book.rating: case(
+                (review_count > 0, func.round(rating_sum * literal_column("1.0") / review_count, 2)),
+                else_=Decimal("0.00"),
+            ),
+        }
+        if removed is not None:
+            values[RATING_COUNTS[removed]] = RATING_COUNTS[removed] - 1
+        if added is not None:
+            values[RATING_COUNTS[added]] = RATING_COUNTS[added] + 1
 
-    async def calculate_book_rating(self, book_id: int) -> tuple[Decimal, int]:
         result = await self.db.execute(
-            select(
-                func.avg(Review.rating),
-                func.count(Review.id)
-            ).where(Review.book_id == book_id, Review.is_approved == True)
+            update(Book)
+            .where(Book.id == book_id)
+            .values(values)
+            .returning(*RATING_COLUMNS)
+            .execution_options(synchronize_session=False)
         )
-        row = result.one()
-        avg_rating = Decimal(str(row[0])) if row[0] else Decimal("0.00")
-        count = row[1] or 0
-        return round(avg_rating, 2), count
-
-    async def update_book_rating(self, book_id: int) -> None:
-        avg_rating, count = await self.calculate_book_rating(book_id)
+        row = result.one_or_none()
+        book = self.db.identity_map.get(identity_key(Book, book_id))
+        if row is not None and book is not None:
+            for column, value in zip(RATING_COLUMNS, row):
+                set_committed_value(book, column.key, value)
 
+    async def get_rating_histograms(self, book_ids: Sequence[int]) -> dict[int, dict[int, int]]:
+        """Count approved reviews per star for each book, recomputed from the reviews table."""
         result = await self.db.execute(
-            select(Book).where(Book.id == book_id)
+            select(Review.book_id, Review.rating, func.count(Review.id))
+            .where(Review.book_id.in_(book_ids), Review.is_approved == True)
+            .group_by(Review.book_id, Review.rating)
+        )
+        histograms = {book_id: dict.fromkeys(RATING_COUNTS, 0) for book_id in book_ids}
+        for book_id, rating, count in result.tuples():
+            histograms[book_id][rating] = count
+        return histograms
+
+    async def set_rating_aggregates(self, book_id: int, histogram: dict[int, int]) -> None:
+        review_count = sum(histogram.values())
+        rating_sum = sum(stars * count for stars, count in histogram.items())
+        await self.db.execute(
+            update(Book)
+            .where(Book.id == book_id)
+            .values(
+                {
+                    Book.review_count: review_count,
+                    Book.rating_sum: rating_sum,
+                    Book.rating: average_rating(rating_sum, review_count),
+                    **{RATING_COUNTS[stars]: count for stars, count in histogram.items()},
+                }
+            )
+            .execution_options(synchronize_session=False)
         )
-        book = result.scalar_one_or_none()
-        if book:
-            book.rating = avg_rating
-            book.review_count = count
-            await self.db.commit()
@@ -0,0 +1,73 @@
+import re
+from sqlalchemy import Select, func, or_, literal_column
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.config import get_settings
+from app.models.book import Book, books_fts
+
+TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(term: str) -> list[str]:
+    return TOKEN_PATTERN.findall(term.lower())
+
+
+class SearchBackend:
+    """Applies a free-text search term to a book query.
+
+    ``apply`` returns the filtered query together with an ORDER BY clause that
+    ranks the best matches first, or ``None`` when the backend cannot rank.
+    """
+
+    name = "like"
+
+    def apply(self, query: Select, term: str) -> tuple[Select, ColumnElement | None]:
+        search_filter = or_(
+            Book.title.ilike(f"%{term}%"),
+            Book.author.ilike(f"%{term}%")
+        )
+        return query.where(search_filter), None
+
+
+class SqliteFtsBackend(SearchBackend):
+    name = "sqlite_fts"
+
+    def apply(self, query: Select, term: str) -> tuple[Select, ColumnElement | None]:
+        tokens = tokenize(term)
+        if not tokens:
+            return super().apply(query, term)
+
+        match_query = " ".join(f'"{token}"*' for token in tokens)
+        query = (
+            query.join(books_fts, books_fts.c.rowid == Book.id)
+            .where(books_fts.c.books_fts.match(match_query))
+        )
+        # FTS5 rank is bm25(), where more negative means more relevant
+        return query, books_fts.c.rank.asc()
+
+
+class PostgresFtsBackend(SearchBackend):
+    name = "postgres_fts"
+
+    def apply(self, query: Select, term: str) -> tuple[Select, ColumnElement | None]:
+        tokens = tokenize(term)
+        if not tokens:
+            return super().apply(query, term)
+
+        search_vector = literal_column("books.search_vector")
+        ts_query = func.to_tsquery(
+            literal_column("'simple'"), " & ".join(f"{token}:*" for token in tokens)
+        )
+        query = query.where(search_vector.op("@@")(ts_query))
+        return query, func.ts_rank_cd(search_vector, ts_query).desc()
+
+
+def get_search_backend(dialect_name: str) -> SearchBackend:
+    setting = get_settings().search_backend
+    if setting == "like":
+        return SearchBackend()
+    if dialect_name == "sqlite":
+        return SqliteFtsBackend()
+    if dialect_name == "postgresql":
+        return PostgresFtsBackend()
+    return SearchBackend()
@@ -1,8 +1,11 @@
-from sqlalchemy import select
+from datetime import datetime
+from typing import Sequence
+from sqlalchemy import delete, select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.user import User, TokenBlacklist
 from app.repositories.base import BaseRepository
+from app.utils.pagination import TotalMode, paginate
 
 
 class UserRepository(BaseRepository[User]):
@@ -17,13 +20,58 @@ class UserRepository(BaseRepository[User]):
         result = await self.db.execute(select(User).where(User.google_id == google_id))
         return result.scalar_one_or_none()
 
-    async def blacklist_token(self, token: str) -> None:
-        blacklisted = TokenBlacklist(token=token)
+    async def list_users(
+        self,
+        role: str | None = None,
+        is_active: bool | None = None,
+        offset: int = 0,
+        limit: int = 20,
+        cursor: str | None = None,
+        total_mode: TotalMode = TotalMode.EXACT,
+    ) -> tuple[Sequence[User], int | None]:
+        query = select(User)
+        count_query = select(func.count(User.id))
+
+        if role is not None:
+            query = query.where(User.role == role)
+            count_query = count_query.where(User.role == role)
+        if is_active is not None:
+            query = query.where(User.is_active == is_active)
+            count_query = count_query.where(User.is_active == is_active)
+
+        query = paginate(
+            query, User.created_at, User.id, descending=True, sort_key="created_at:desc",
+            cursor=cursor, offset=offset, limit=limit,
+        )
+
+        result = await self.db.execute(query)
+        total = await self.count_rows(count_query, total_mode)
+
+        return result.scalars().all(), total
+
+    async def blacklist_token(self, jti: str, expires_at: datetime) -> None:
+        blacklisted = TokenBlacklist(jti=jti, expires_at=expires_at)
         self.db.add(blacklisted)
         await self.db.commit()
 
-    async def is_token_blacklisted(self, token: str) -> bool:
+    async def is_token_blacklisted(self, jti: str) -> bool:
         result = await self.db.execute(
-            select(TokenBlacklist).where(TokenBlacklist.token == token)
+            select(TokenBlacklist.id).where(TokenBlacklist.jti == jti)
         )
         return result.scalar_one_or_none() is not None
+
+    async def get_blacklisted_tokens(
+        self, now: datetime, since: datetime | None = None
+    ) -> Sequence[tuple[str, datetime]]:
+        query = select(TokenBlacklist.jti, TokenBlacklist.expires_at).where(TokenBlacklist.expires_at > now)
+        if since is not None:
+            query = query.where(TokenBlacklist.blacklisted_at >= since)
+        result = await self.db.execute(query)
+        return result.tuples().all()
+
+    async def delete_expired_tokens(self, now: datetime) -> int:
+        result = await self.db.execute(
+            delete(TokenBlacklist).where(TokenBlacklist.expires_at <= now)
+        )
+        await self.db.commit()
+        return result.rowcount
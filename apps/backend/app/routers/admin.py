@@ -1,27 +1,37 @@
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
 from app.models.user import User, UserRole
-from app.models.order import Order, OrderStatus
-from app.models.book import Book
-from app.models.review import Review
+from app.models.order import OrderStatus
 from app.schemas.order import OrderDetailResponse, OrderListResponse, OrderStatusUpdate
 from app.schemas.review import ReviewResponse
 from app.schemas.user import UserResponse
+from app.services.analytics import AnalyticsService, Granularity
 from app.services.order import OrderService
 from app.services.review import ReviewService
 from app.repositories.user import UserRepository
-from app.dependencies import get_admin_user
-from app.utils.pagination import PaginatedResponse
+from app.dependencies import get_admin_user, get_read_db
+from app.utils.auth_cache import invalidate_user
+from app.utils.cache import cache_stats
+from app.utils.pagination import PaginatedResponse, TotalMode, next_cursor, split_page
 from pydantic import BaseModel
+from datetime import date
 from decimal import Decimal
 
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
 
 
+class AnalyticsPoint(BaseModel):
+    period: date
+    orders: int
+    revenue: Decimal
+    new_users: int
+    new_reviews: int
+    new_books: int
+
+
 class AnalyticsResponse(BaseModel):
     total_orders: int
     total_revenue: Decimal
@@ -29,6 +39,7 @@ class AnalyticsResponse(BaseModel):
     total_books: int
     total_users: int
     total_reviews: int
+    series: list[AnalyticsPoint] = []
 
 
 class RoleUpdate(BaseModel):
@@ -39,17 +50,28 @@ class StatusUpdate(BaseModel):
     is_active: bool
 
 
+class CacheStatsResponse(BaseModel):
+    name: str
+    hits: int
+    misses: int
+    hit_ratio: float
+    size: int
+    maxsize: int
+
+
 @router.get("/orders", response_model=PaginatedResponse[OrderListResponse])
 async def list_all_orders(
     status: OrderStatus | None = Query(None, description="Filter by status"),
     page: int = Query(1, ge=1),
     size: int = Query(20, ge=1, le=100),
+    cursor: str | None = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    include_total: TotalMode = Query(TotalMode.EXACT, description="exact, estimate, or false to skip the count"),
     admin: User = Depends(get_admin_user),
     db: AsyncSession = Depends(get_db),
 ):
     """List all orders (Admin only)."""
     service = OrderService(db)
-    return await service.get_all_orders(status, page, size)
+    return await service.get_all_orders(status, page, size, cursor, include_total)
 
 
 @router.get("/orders/{order_id}", response_model=OrderDetailResponse)
@@ -104,12 +126,14 @@ async def update_order_status(
 async def list_pending_reviews(
     page: int = Query(1, ge=1),
     size: int = Query(20, ge=1, le=100),
+    cursor: str | None = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    include_total: TotalMode = Query(TotalMode.EXACT, description="exact, estimate, or false to skip the count"),
     admin: User = Depends(get_admin_user),
     db: AsyncSession = Depends(get_db),
 ):
     """List pending reviews for moderation (Admin only)."""
     service = ReviewService(db)
-    return await service.get_pending_reviews(page, size)
+    return await service.get_pending_reviews(page, size, cursor, include_total)
 
 
 @router.put("/reviews/{review_id}/approve", response_model=ReviewResponse)
@@ -126,43 +150,15 @@ async def approve_review(
 
 @router.get("/analytics", response_model=AnalyticsResponse)
 async def get_analytics(
+    from_date: date | None = Query(None, alias="from", description="First day to include (UTC)"),
+    to_date: date | None = Query(None, alias="to", description="Last day to include (UTC)"),
+    granularity: Granularity | None = Query(None, description="day, week or month to add a time series"),
     admin: User = Depends(get_admin_user),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get basic analytics (Admin only)."""
-    total_orders_result = await db.execute(select(func.count(Order.id)))
-    total_orders = total_orders_result.scalar_one()
-
-    revenue_result = await db.execute(
-        select(func.sum(Order.total_amount))
-        .where(Order.status.in_([OrderStatus.PAID, OrderStatus.SHIPPED, OrderStatus.COMPLETED]))
-    )
-    total_revenue = revenue_result.scalar_one() or Decimal("0.00")
-
-    pending_result = await db.execute(
-        select(func.count(Order.id)).where(Order.status == OrderStatus.PENDING)
-    )
-    pending_orders = pending_result.scalar_one()
-
-    books_result = await db.execute(
-        select(func.count(Book.id)).where(Book.is_deleted == False)
-    )
-    total_books = books_result.scalar_one()
-
-    users_result = await db.execute(select(func.count(User.id)))
-    total_users = users_result.scalar_one()
-
-    reviews_result = await db.execute(select(func.count(Review.id)))
-    total_reviews = reviews_result.scalar_one()
-
-    return AnalyticsResponse(
-        total_orders=total_orders,
-        total_revenue=total_revenue,
-        pending_orders=pending_orders,
-        total_books=total_books,
-        total_users=total_users,
-        total_reviews=total_reviews,
-    )
+    service = AnalyticsService(db)
+    return await service.get_analytics(from_date, to_date, granularity)
 
 
 # ===== User Management =====
@@ -174,29 +170,21 @@ async def list_users(
     is_active: bool | None = Query(None, description="Filter by active status"),
     page: int = Query(1, ge=1),
     size: int = Query(20, ge=1, le=100),
+    cursor: str | None = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    include_total: TotalMode = Query(TotalMode.EXACT, description="exact, estimate, or false to skip the count"),
     admin: User = Depends(get_admin_user),
     db: AsyncSession = Depends(get_db),
 ):
     """List all users (Admin only)."""
-    query = select(User)
-    count_query = select(func.count(User.id))
-
-    if role is not None:
-        query = query.where(User.role == role)
-        count_query = count_query.where(User.role == role)
-    if is_active is not None:
-        query = query.where(User.is_active == is_active)
-        count_query = count_query.where(User.is_active == is_active)
-
-    total_result = await db.execute(count_query)
-    total = total_result.scalar_one()
-
+    user_repo = UserRepository(db)
     offset = (page - 1) * size
-    query = query.order_by(User.created_at.desc()).offset(offset).limit(size)
-    result = await db.execute(query)
-    users = result.scalars().all()
+    rows, total = await user_repo.list_users(role, is_active, offset, size + 1, cursor, include_total)
+    users, has_more = split_page(rows, size)
 
-    return PaginatedResponse.create(items=users, total=total, page=page, size=size)
+    return PaginatedResponse.create(
+        items=users, total=total, page=page, size=size, has_more=has_more,
+        next_cursor=next_cursor(users, has_more, "created_at:desc", "created_at"),
+    )
 
 
 @router.get("/users/{user_id}", response_model=UserResponse)
@@ -234,6 +222,7 @@ async def update_user_role(
         raise HTTPException(status_code=400, detail=f"Invalid role: {role_update.role}")
 
     user = await user_repo.update(user, {"role": new_role})
+    invalidate_user(user.id)
     return user
 
 
@@ -253,4 +242,26 @@ async def update_user_status(
         raise HTTPException(status_code=400, detail="Cannot change your own status")
 
     user = await user_repo.update(user, {"is_active": status_update.is_active})
+    invalidate_user(user.id)
     return user
+
+
+# ===== Caches =====
+
+
+@router.get("/cache/stats", response_model=list[CacheStatsResponse])
+async def get_cache_stats(
+    admin: User = Depends(get_admin_user),
+):
+    """Get hit rates of the in-process caches (Admin only)."""
+    return [
+        CacheStatsResponse(
+            name=stats.name,
+            hits=stats.hits,
+            misses=stats.misses,
+            hit_ratio=stats.hit_ratio,
+            size=stats.size,
+            maxsize=stats.maxsize,
+        )
+        for stats in cache_stats()
+    ]
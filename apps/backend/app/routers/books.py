@@ -1,7 +1,8 @@
 from decimal import Decimal
-from fastapi import APIRouter, Depends, Query, status
+from fastapi import APIRouter, Depends, Query, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import get_settings
 from app.database import get_db
 from app.models.user import User
 from app.schemas.book import (
@@ -9,28 +10,53 @@ from app.schemas.book import (
     BookUpdate,
     BookResponse,
     BookListResponse,
+    BookListPage,
     BookSearchParams,
+    Facet,
 )
 from app.services.book import BookService
 from app.services.recommendation import RecommendationService
-from app.dependencies import get_admin_user, get_optional_user
-from app.utils.pagination import PaginatedResponse
+from app.dependencies import get_admin_user, get_optional_user, get_read_db
+from app.utils.pagination import TotalMode
+from app.utils.serialization import FastJSONResponse
+from app.utils.response_cache import (
+    BOOKS,
+    CATEGORIES,
+    RATINGS,
+    STOCK,
+    book_key,
+    cache_response,
+    cached_route,
+    depends_on,
+    http_date,
+    not_modified,
+    not_modified_response,
+    response_cache,
+)
+
+router = APIRouter(prefix="/books", tags=["Books"], route_class=cached_route(get_settings().books_cache_control))
 
-router = APIRouter(prefix="/books", tags=["Books"])
+# Orders and reviews change these fields without bumping BOOKS, so listings sorted by them depend on more
+SORT_DEPENDS = {"stock_quantity": STOCK, "rating": RATINGS, "review_count": RATINGS}
 
 
-@router.get("", response_model=PaginatedResponse[BookListResponse])
+@router.get("", response_model=BookListPage)
+@cache_response(depends=(BOOKS, CATEGORIES))
 async def list_books(
-    search: str | None = Query(None, description="Search in title or author"),
+    request: Request,
+    search: str | None = Query(None, description="Full-text search in title, author, description or ISBN"),
     category_id: int | None = Query(None, description="Filter by category"),
     min_price: Decimal | None = Query(None, description="Minimum price"),
     max_price: Decimal | None = Query(None, description="Maximum price"),
     in_stock: bool | None = Query(None, description="Only show in-stock items"),
-    sort_by: str = Query("created_at", description="Sort field"),
+    sort_by: str = Query("created_at", description="Sort field, or 'relevance' when searching"),
     sort_order: str = Query("desc", description="Sort order (asc/desc)"),
     page: int = Query(1, ge=1, description="Page number"),
     size: int = Query(20, ge=1, le=100, description="Page size"),
-    db: AsyncSession = Depends(get_db),
+    cursor: str | None = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    include_total: TotalMode = Query(TotalMode.EXACT, description="exact, estimate, or false to skip the count"),
+    facets: list[Facet] = Query([], description="Facet counts to include: category, price, availability"),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """List books with filtering, sorting, and pagination."""
     params = BookSearchParams(
@@ -43,13 +69,28 @@ async def list_books(
         sort_order=sort_order,
     )
     service = BookService(db)
-    return await service.search_books(params, page, size)
+    result = await service.search_book_page(params, page, size, cursor, include_total, set(facets))
+    book_keys = [book_key(item["id"]) for item in result["items"]]
+    depends_on(request, *book_keys, *([SORT_DEPENDS[sort_by]] if sort_by in SORT_DEPENDS else []))
+    if get_settings().fast_list_responses:
+        return FastJSONResponse(result)
+    return BookListPage(**result)
 
 
 @router.get("/{book_id}", response_model=BookResponse)
-async def get_book(book_id: int, db: AsyncSession = Depends(get_db)):
+@cache_response(depends=(CATEGORIES,), version_etag=False)
+async def get_book(book_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_read_db)):
     """Get a book by ID."""
+    depends_on(request, book_key(book_id))
     service = BookService(db)
+    # Books embed their categories, which can be renamed without touching the book
+    updated_at = await service.get_book_updated_at(book_id)
+    etag = f'"book-{book_id}-{updated_at:%Y%m%d%H%M%S%f}-{await response_cache.version(CATEGORIES)}"'
+    headers = {"ETag": etag, "Last-Modified": http_date(updated_at)}
+    if not_modified(request, etag, updated_at):
+        return not_modified_response(headers)
+
+    response.headers.update(headers)
     return await service.get_book(book_id)
 
 
@@ -57,7 +98,7 @@ async def get_book(book_id: int, db: AsyncSession = Depends(get_db)):
 async def get_book_recommendations(
     book_id: int,
     limit: int = Query(5, ge=1, le=20),
-    db: AsyncSession = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get book recommendations (customers also bought)."""
     service = RecommendationService(db)
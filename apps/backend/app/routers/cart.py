@@ -3,7 +3,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
 from app.models.user import User
-from app.schemas.cart import CartItemCreate, CartItemUpdate, CartResponse, CartItemResponse
+from app.schemas.cart import CartBatchRequest, CartItemCreate, CartItemUpdate, CartResponse, CartItemResponse
 from app.services.cart import CartService
 from app.dependencies import get_current_active_user
 
@@ -31,6 +31,17 @@ async def add_to_cart(
     return await service.add_item(current_user.id, item_data)
 
 
+@router.post("/items:batch", response_model=CartResponse)
+async def batch_update_cart(
+    batch: CartBatchRequest,
+    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """Add, set or remove many items at once; all of them apply or none do."""
+    service = CartService(db)
+    return await service.apply_batch(current_user.id, batch)
+
+
 @router.put("/items/{item_id}", response_model=CartItemResponse)
 async def update_cart_item(
     item_id: int,
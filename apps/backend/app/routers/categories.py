@@ -1,24 +1,28 @@
 from fastapi import APIRouter, Depends, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import get_settings
 from app.database import get_db
 from app.models.user import User
 from app.schemas.category import CategoryCreate, CategoryUpdate, CategoryResponse
 from app.services.category import CategoryService
-from app.dependencies import get_admin_user
+from app.dependencies import get_admin_user, get_read_db
+from app.utils.response_cache import CATEGORIES, cache_response, cached_route
 
-router = APIRouter(prefix="/categories", tags=["Categories"])
+router = APIRouter(prefix="/categories", tags=["Categories"], route_class=cached_route(get_settings().categories_cache_control))
 
 
 @router.get("", response_model=list[CategoryResponse])
-async def list_categories(db: AsyncSession = Depends(get_db)):
+@cache_response(depends=(CATEGORIES,))
+async def list_categories(db: AsyncSession = Depends(get_read_db)):
     """List all categories."""
     service = CategoryService(db)
     return await service.get_all_categories()
 
 
 @router.get("/{category_id}", response_model=CategoryResponse)
-async def get_category(category_id: int, db: AsyncSession = Depends(get_db)):
+@cache_response(depends=(CATEGORIES,))
+async def get_category(category_id: int, db: AsyncSession = Depends(get_read_db)):
     """Get a category by ID."""
     service = CategoryService(db)
     return await service.get_category(category_id)
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import get_settings
 from app.database import get_db
 from app.models.user import User
 from app.models.order import OrderStatus
@@ -13,7 +14,8 @@ from app.schemas.order import (
 )
 from app.services.order import OrderService
 from app.dependencies import get_current_active_user
-from app.utils.pagination import PaginatedResponse
+from app.utils.pagination import PaginatedResponse, TotalMode
+from app.utils.serialization import FastJSONResponse
 
 router = APIRouter(prefix="/orders", tags=["Orders"])
 
@@ -34,12 +36,18 @@ async def list_orders(
     status: OrderStatus | None = Query(None, description="Filter by status"),
     page: int = Query(1, ge=1),
     size: int = Query(20, ge=1, le=100),
+    cursor: str | None = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    include_total: TotalMode = Query(TotalMode.EXACT, description="exact, estimate, or false to skip the count"),
     current_user: User = Depends(get_current_active_user),
     db: AsyncSession = Depends(get_db),
 ):
     """List current user's orders."""
     service = OrderService(db)
-    return await service.get_user_orders(current_user.id, status, page, size)
+    if get_settings().fast_list_responses:
+        return FastJSONResponse(
+            await service.get_user_order_page(current_user.id, status, page, size, cursor, include_total)
+        )
+    return await service.get_user_orders(current_user.id, status, page, size, cursor, include_total)
 
 
 @router.get("/{order_id}", response_model=OrderDetailResponse)
@@ -21,8 +21,9 @@ async def complete_order(
 ):
     """Complete an order without payment processing."""
     from app.repositories.order import OrderRepository
-    from app.models.order import OrderStatus, OrderStatusHistory
+    from app.models.order import OrderStatus
     from app.services.inventory import InventoryService
+    from app.services.copurchase import copurchase_index
     import logging
 
     logger = logging.getLogger(__name__)
@@ -45,17 +46,9 @@ async def complete_order(
         from app.exceptions import BadRequestException
         raise BadRequestException("Order is not in pending status")
 
-    order.status = OrderStatus.PAID
     order.payment_reference = "completed_without_payment"
-
-    history = OrderStatusHistory(
-        order_id=order.id,
-        status=OrderStatus.PAID,
-        note="Order completed without payment processing"
-    )
-    db.add(history)
-
-    await db.commit()
+    await order_repo.add_status_history(order, OrderStatus.PAID, "Order completed without payment processing")
+    await copurchase_index.catch_up(db)
 
     return {
         "order_id": order.id,
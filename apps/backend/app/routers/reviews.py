@@ -1,14 +1,17 @@
-from fastapi import APIRouter, Depends, Query, status
+from fastapi import APIRouter, Depends, Query, Request, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import get_settings
 from app.database import get_db
 from app.models.user import User
 from app.schemas.review import ReviewCreate, ReviewUpdate, ReviewResponse, ReviewListResponse
 from app.services.review import ReviewService
-from app.dependencies import get_current_active_user
-from app.utils.pagination import PaginatedResponse
+from app.dependencies import get_current_active_user, get_read_db
+from app.utils.pagination import PaginatedResponse, TotalMode
+from app.utils.response_cache import REVIEWS, cache_response, cached_route, depends_on, reviews_key
+from app.utils.serialization import FastJSONResponse
 
-router = APIRouter(tags=["Reviews"])
+router = APIRouter(tags=["Reviews"], route_class=cached_route(get_settings().reviews_cache_control))
 
 
 @router.post("/books/{book_id}/reviews", response_model=ReviewResponse, status_code=status.HTTP_201_CREATED)
@@ -24,15 +27,22 @@ async def create_review(
 
 
 @router.get("/books/{book_id}/reviews", response_model=PaginatedResponse[ReviewListResponse])
+@cache_response(depends=(REVIEWS,))
 async def get_book_reviews(
     book_id: int,
+    request: Request,
     page: int = Query(1, ge=1),
     size: int = Query(20, ge=1, le=100),
-    db: AsyncSession = Depends(get_db),
+    cursor: str | None = Query(None, description="Opaque cursor from a previous page's next_cursor"),
+    include_total: TotalMode = Query(TotalMode.EXACT, description="exact, estimate, or false to skip the count"),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """Get reviews for a book."""
+    depends_on(request, reviews_key(book_id))
     service = ReviewService(db)
-    return await service.get_book_reviews(book_id, page, size)
+    if get_settings().fast_list_responses:
+        return FastJSONResponse(await service.get_book_review_page(book_id, page, size, cursor, include_total))
+    return await service.get_book_reviews(book_id, page, size, cursor, include_total)
 
 
 @router.put("/reviews/{review_id}", response_model=ReviewResponse)
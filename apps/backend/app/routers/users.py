@@ -6,7 +6,9 @@ from app.models.user import User
 from app.schemas.user import UserResponse, UserUpdate
 from app.dependencies import get_current_active_user
 from app.repositories.user import UserRepository
-from app.utils.security import get_password_hash
+from app.utils.auth_cache import invalidate_user
+from app.utils.response_cache import invalidate_reviewer_names
+from app.utils.security import get_password_hash_async
 
 router = APIRouter(prefix="/users", tags=["Users"])
 
@@ -33,9 +35,13 @@ async def update_current_user_profile(
         update_data["full_name"] = user_update.full_name
 
     if user_update.password is not None:
-        update_data["hashed_password"] = get_password_hash(user_update.password)
+        update_data["hashed_password"] = await get_password_hash_async(user_update.password)
 
     if update_data:
         current_user = await user_repo.update(current_user, update_data)
+        invalidate_user(current_user.id)
+        if "full_name" in update_data:
+            # Reviews show the author's name
+            await invalidate_reviewer_names()
 
     return current_user
@@ -1,8 +1,10 @@
 from datetime import datetime
 from decimal import Decimal
+from enum import Enum
 from pydantic import BaseModel, Field
 
 from app.schemas.category import CategoryResponse
+from app.utils.pagination import PaginatedResponse
 
 
 class BookBase(BaseModel):
@@ -33,6 +35,7 @@ class BookResponse(BookBase):
     id: int
     rating: Decimal
     review_count: int
+    rating_histogram: dict[int, int] = {}
     is_deleted: bool
     created_at: datetime
     updated_at: datetime
@@ -57,6 +60,39 @@ class BookListResponse(BaseModel):
         from_attributes = True
 
 
+class Facet(str, Enum):
+    CATEGORY = "category"
+    PRICE = "price"
+    AVAILABILITY = "availability"
+
+
+class CategoryFacet(BaseModel):
+    id: int
+    name: str
+    count: int
+
+
+class PriceFacet(BaseModel):
+    min: Decimal
+    max: Decimal | None
+    count: int
+
+
+class AvailabilityFacet(BaseModel):
+    in_stock: int
+    out_of_stock: int
+
+
+class BookFacets(BaseModel):
+    categories: list[CategoryFacet] | None = None
+    price: list[PriceFacet] | None = None
+    availability: AvailabilityFacet | None = None
+
+
+class BookListPage(PaginatedResponse[BookListResponse]):
+    facets: BookFacets | None = None
+
+
 class BookSearchParams(BaseModel):
     search: str | None = None
     category_id: int | None = None
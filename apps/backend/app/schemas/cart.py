@@ -1,5 +1,6 @@
 from datetime import datetime
 from decimal import Decimal
+from enum import Enum
 from pydantic import BaseModel, Field
 
 from app.schemas.book import BookListResponse
@@ -18,6 +19,23 @@ class CartItemUpdate(BaseModel):
     quantity: int = Field(..., ge=1)
 
 
+class CartAction(str, Enum):
+    ADD = "add"
+    SET = "set"
+    REMOVE = "remove"
+
+
+class CartBatchItem(BaseModel):
+    book_id: int
+    action: CartAction = CartAction.ADD
+    # Ignored when removing
+    quantity: int = Field(default=1, ge=1)
+
+
+class CartBatchRequest(BaseModel):
+    items: list[CartBatchItem] = Field(..., min_length=1, max_length=100)
+
+
 class CartItemResponse(BaseModel):
     id: int
     book_id: int
@@ -22,3 +22,4 @@ class CategoryResponse(CategoryBase):
 
     class Config:
         from_attributes = True
+        frozen = True
@@ -0,0 +1,133 @@
+from datetime import date, timedelta
+from decimal import Decimal
+from enum import Enum
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.order import OrderStatus
+from app.repositories.analytics import DAILY_COUNTS, AnalyticsRepository, start_of, utc_today
+from app.exceptions import BadRequestException
+
+REVENUE_STATUSES = (OrderStatus.PAID, OrderStatus.SHIPPED, OrderStatus.COMPLETED)
+
+
+class Granularity(str, Enum):
+    DAY = "day"
+    WEEK = "week"
+    MONTH = "month"
+
+
+def bucket_of(day: date, granularity: Granularity) -> date:
+    if granularity == Granularity.WEEK:
+        return day - timedelta(days=day.weekday())
+    if granularity == Granularity.MONTH:
+        return day.replace(day=1)
+    return day
+
+
+def next_bucket(bucket: date, granularity: Granularity) -> date:
+    if granularity == Granularity.WEEK:
+        return bucket + timedelta(days=7)
+    if granularity == Granularity.MONTH:
+        return (bucket + timedelta(days=32)).replace(day=1)
+    return bucket + timedelta(days=1)
+
+
+class AnalyticsService:
+    """Dashboard figures from daily rollups plus a live count of the days after them.
+
+    Closed days are rolled up by a background task (``roll_up_closed_days``)
+    and then kept current by the order, review and book write paths. Reads
+    write nothing: rows created after the latest rolled-up day, today's and
+    any the task has not reached yet, are counted from the base tables.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.analytics_repo = AnalyticsRepository(db)
+
+    async def roll_up_closed_days(self) -> None:
+        today = utc_today()
+        latest = await self.analytics_repo.get_latest_day()
+        start = latest + timedelta(days=1) if latest else await self.analytics_repo.get_first_day()
+        if start is not None and start < today:
+            await self.analytics_repo.roll_up(start, today)
+            await self.db.commit()
+
+    async def get_analytics(
+        self,
+        from_date: date | None = None,
+        to_date: date | None = None,
+        granularity: Granularity | None = None,
+    ) -> dict:
+        if from_date and to_date and from_date > to_date:
+            raise BadRequestException("'from' must not be after 'to'")
+
+        today = utc_today()
+        last_day = min(to_date, today) if to_date else today
+        end = last_day + timedelta(days=1)
+        # The rollups and the live counts meet at the same day, whichever rollups this session sees
+        latest = await self.analytics_repo.get_latest_day()
+        live_from = latest + timedelta(days=1) if latest else None
+        # (day, new_users, new_reviews, new_books) and (day, status, count, revenue)
+        daily, orders = [], []
+        if live_from is not None:
+            rolled_end = min(end, live_from)
+            daily = [
+                (row.day, row.new_users, row.new_reviews, row.new_books)
+                for row in await self.analytics_repo.get_daily_stats(from_date, rolled_end)
+            ]
+            orders = [
+                (row.day, row.status, row.order_count, row.revenue)
+                for row in await self.analytics_repo.get_daily_order_stats(from_date, rolled_end)
+            ]
+        live_start = max(filter(None, (from_date, live_from)), default=None)
+        if live_start is None or live_start < end:
+            since, until = start_of(live_start) if live_start else None, start_of(end)
+            counts = await self.analytics_repo.count_by_day(since, until)
+            daily.extend((day, *(counts[day][column] for column in DAILY_COUNTS)) for day in sorted(counts))
+            orders.extend(await self.analytics_repo.orders_by_day(since, until))
+
+        analytics = {
+            "total_orders": sum(count for _, _, count, _ in orders),
+            "total_revenue": sum(
+                (revenue for _, status, _, revenue in orders if status in REVENUE_STATUSES), Decimal("0.00")
+            ),
+            "pending_orders": sum(count for _, status, count, _ in orders if status == OrderStatus.PENDING),
+            "total_books": sum(books for _, _, _, books in daily),
+            "total_users": sum(users for _, users, _, _ in daily),
+            "total_reviews": sum(reviews for _, _, reviews, _ in daily),
+            "series": [],
+        }
+        if granularity:
+            analytics["series"] = self._series(daily, orders, from_date, last_day, granularity)
+        return analytics
+
+    @staticmethod
+    def _series(
+        daily: list[tuple],
+        orders: list[tuple],
+        from_date: date | None,
+        last_day: date,
+        granularity: Granularity,
+    ) -> list[dict]:
+        first_day = from_date or min((row[0] for row in daily), default=last_day)
+        buckets = {}
+        bucket = bucket_of(first_day, granularity)
+        while bucket <= last_day:
+            buckets[bucket] = {
+                "period": bucket, "orders": 0, "revenue": Decimal("0.00"),
+                "new_users": 0, "new_reviews": 0, "new_books": 0,
+            }
+            bucket = next_bucket(bucket, granularity)
+
+        for day, users, reviews, books in daily:
+            point = buckets[bucket_of(day, granularity)]
+            point["new_users"] += users
+            point["new_reviews"] += reviews
+            point["new_books"] += books
+        for day, status, count, revenue in orders:
+            point = buckets[bucket_of(day, granularity)]
+            point["orders"] += count
+            if status in REVENUE_STATUSES:
+                point["revenue"] += revenue
+        return list(buckets.values())
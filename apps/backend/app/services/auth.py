@@ -1,15 +1,28 @@
+from datetime import datetime, timedelta
+from typing import Any
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import get_settings
+
 from app.models.user import User, UserRole
 from app.schemas.user import UserCreate, UserLogin, Token
 from app.repositories.user import UserRepository
 from app.utils.security import (
-    get_password_hash,
-    verify_password,
+    get_password_hash_async,
+    verify_password_async,
     create_access_token,
     create_refresh_token,
     decode_token,
+    token_identifier,
+)
+from app.utils.auth_cache import (
+    UserSnapshot,
+    access_claims,
+    forget_token,
+    invalidate_user,
+    user_cache,
 )
+from app.utils.revocation import revocations
 from app.exceptions import (
     ConflictException,
     UnauthorizedException,
@@ -29,7 +42,7 @@ class AuthService:
 
         user_dict = {
             "email": user_data.email,
-            "hashed_password": get_password_hash(user_data.password),
+            "hashed_password": await get_password_hash_async(user_data.password),
             "full_name": user_data.full_name,
             "role": UserRole.USER,
         }
@@ -43,7 +56,7 @@ class AuthService:
         if user.hashed_password is None:
             raise UnauthorizedException("User uses OAuth authentication only")
 
-        if not verify_password(credentials.password, user.hashed_password):
+        if not await verify_password_async(credentials.password, user.hashed_password):
             raise UnauthorizedException("Invalid email or password")
 
         if not user.is_active:
@@ -55,19 +68,18 @@ class AuthService:
         return Token(access_token=access_token, refresh_token=refresh_token)
 
     async def refresh_token(self, refresh_token: str) -> Token:
-        if await self.user_repo.is_token_blacklisted(refresh_token):
-            raise UnauthorizedException("Token has been revoked")
-
         payload = decode_token(refresh_token)
         if not payload or payload.get("type") != "refresh":
             raise UnauthorizedException("Invalid refresh token")
+        if await self._is_revoked(refresh_token, payload):
+            raise UnauthorizedException("Token has been revoked")
 
         user_id = int(payload.get("sub"))
         user = await self.user_repo.get(user_id)
         if not user or not user.is_active:
             raise UnauthorizedException("User not found or inactive")
 
-        await self.user_repo.blacklist_token(refresh_token)
+        await self._revoke(refresh_token, payload)
 
         new_access_token = create_access_token(user.id)
         new_refresh_token = create_refresh_token(user.id)
@@ -75,25 +87,65 @@ class AuthService:
         return Token(access_token=new_access_token, refresh_token=new_refresh_token)
 
     async def logout(self, access_token: str, refresh_token: str | None = None) -> None:
-        await self.user_repo.blacklist_token(access_token)
-        if refresh_token:
-            await self.user_repo.blacklist_token(refresh_token)
+        forget_token(access_token)
+        for token in (access_token, refresh_token):
+            # Tokens that no longer decode are already unusable
+            payload = decode_token(token) if token else None
+            if payload and not await self._is_revoked(token, payload):
+                await self._revoke(token, payload)
+
+    async def get_current_user(self, token: str, payload: dict[str, Any] | None = None) -> User:
+        """The active user ``token`` belongs to; ``payload`` is its access claims when already decoded."""
+        payload = payload or access_claims(token)
+        if payload is None:
+            raise UnauthorizedException("Invalid access token")
 
-    async def get_current_user(self, token: str) -> User:
-        if await self.user_repo.is_token_blacklisted(token):
+        if await self._is_revoked(token, payload):
             raise UnauthorizedException("Token has been revoked")
 
-        payload = decode_token(token)
-        if not payload or payload.get("type") != "access":
-            raise UnauthorizedException("Invalid access token")
+        user = await self._get_user(int(payload.get("sub")))
+        if not user.is_active:
+            raise UnauthorizedException("User account is disabled")
+
+        return user
+
+    async def _is_revoked(self, token: str, payload: dict[str, Any]) -> bool:
+        jti = token_identifier(token, payload)
+        if revocations.loaded:
+            return jti in revocations
+        return await self.user_repo.is_token_blacklisted(jti)
+
+    async def _revoke(self, token: str, payload: dict[str, Any]) -> None:
+        jti = token_identifier(token, payload)
+        expires_at = datetime.utcfromtimestamp(payload["exp"])
+        await self.user_repo.blacklist_token(jti, expires_at)
+        revocations.add(jti, expires_at)
+
+    async def load_revocations(self) -> None:
+        now = datetime.utcnow()
+        revocations.load(await self.user_repo.get_blacklisted_tokens(now), synced_at=now)
+
+    async def sweep_revocations(self) -> int:
+        """Delete expired blacklist rows and pull in tokens revoked by other workers."""
+        now = datetime.utcnow()
+        deleted = await self.user_repo.delete_expired_tokens(now)
+        revocations.prune(now)
+        # Overlap the window so rows committed late by another worker are not missed
+        since = None
+        if revocations.synced_at is not None:
+            since = revocations.synced_at - timedelta(seconds=get_settings().revocation_sync_seconds)
+        revocations.load(await self.user_repo.get_blacklisted_tokens(now, since), synced_at=now)
+        return deleted
+
+    async def _get_user(self, user_id: int) -> User:
+        snapshot = user_cache.get(user_id)
+        if snapshot is not None:
+            return await self.db.merge(snapshot.to_user(), load=False)
 
-        user_id = int(payload.get("sub"))
         user = await self.user_repo.get(user_id)
         if not user:
             raise NotFoundException("User")
-        if not user.is_active:
-            raise UnauthorizedException("User account is disabled")
-
+        user_cache.set(user_id, UserSnapshot.from_user(user))
         return user
 
     async def get_or_create_oauth_user(self, email: str, name: str, google_id: str) -> User:
@@ -106,6 +158,7 @@ class AuthService:
             if user_by_email.google_id is None:
                 user_by_email.google_id = google_id
                 await self.db.commit()
+                invalidate_user(user_by_email.id)
                 await self.db.refresh(user_by_email)
                 return user_by_email
             else:
@@ -130,5 +183,6 @@ class AuthService:
 
         user.google_id = google_id
         await self.db.commit()
+        invalidate_user(user.id)
         await self.db.refresh(user)
         return user
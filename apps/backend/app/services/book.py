@@ -1,12 +1,26 @@
+from datetime import datetime
 from decimal import Decimal
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.book import Book
-from app.schemas.book import BookCreate, BookUpdate, BookSearchParams
-from app.repositories.book import BookRepository
+from app.schemas.book import (
+    BookCreate,
+    BookUpdate,
+    BookSearchParams,
+    BookFacets,
+    BookListPage,
+    BookListResponse,
+    Facet,
+)
+from app.repositories.book import BookRepository, SORTABLE_FIELDS
 from app.repositories.category import CategoryRepository
 from app.exceptions import NotFoundException, ConflictException
-from app.utils.pagination import PaginatedResponse
+from app.utils.pagination import TotalMode, next_cursor, split_page
+from app.services.category_registry import category_registry
+from app.utils.response_cache import invalidate_book, invalidate_book_categories, invalidate_listings
+
+# BookListResponse fields read straight off the search row; categories come from the registry
+LIST_FIELDS = tuple(name for name in BookListResponse.model_fields if name != "categories")
 
 
 class BookService:
@@ -28,9 +42,14 @@ class BookService:
 
         self.db.add(book)
         await self.db.commit()
-        await self.db.refresh(book)
+        if categories:
+            await invalidate_book_categories(book.id)
+            category_registry.set_categories(book.id, [category.id for category in categories])
+        else:
+            await invalidate_listings()
 
-        return await self.book_repo.get_with_categories(book.id)
+        # Defaults are filled in client-side and the session keeps them past the commit
+        return book
 
     async def get_book(self, book_id: int) -> Book:
         book = await self.book_repo.get_with_categories(book_id)
@@ -38,6 +57,12 @@ class BookService:
             raise NotFoundException("Book")
         return book
 
+    async def get_book_updated_at(self, book_id: int) -> datetime:
+        updated_at = await self.book_repo.get_updated_at(book_id)
+        if updated_at is None:
+            raise NotFoundException("Book")
+        return updated_at
+
     async def update_book(self, book_id: int, book_data: BookUpdate) -> Book:
         book = await self.book_repo.get_with_categories(book_id)
         if not book:
@@ -50,9 +75,16 @@ class BookService:
         if book_data.category_ids is not None:
             categories = await self.category_repo.get_by_ids(book_data.category_ids)
             book.categories = categories
+            # The book's ETag and Last-Modified come from updated_at, and the row itself may not change
+            book.updated_at = datetime.utcnow()
 
         await self.db.commit()
         await self.db.refresh(book)
+        if book_data.category_ids is not None:
+            await invalidate_book_categories(book.id)
+            category_registry.set_categories(book.id, [category.id for category in categories])
+        else:
+            await invalidate_book(book.id)
 
         return await self.book_repo.get_with_categories(book.id)
 
@@ -61,15 +93,17 @@ class BookService:
         if not book:
             raise NotFoundException("Book")
         await self.book_repo.soft_delete(book)
+        await invalidate_book(book.id)
 
-    async def search_books(
+    async def _search(
         self,
         params: BookSearchParams,
-        page: int = 1,
-        size: int = 20,
-    ) -> PaginatedResponse:
-        offset = (page - 1) * size
-        books, total = await self.book_repo.search(
+        page: int,
+        size: int,
+        cursor: str | None,
+        total_mode: TotalMode,
+    ) -> tuple[list, int | None, bool, str | None]:
+        rows, total = await self.book_repo.search(
             search=params.search,
             category_id=params.category_id,
             min_price=params.min_price,
@@ -77,7 +111,62 @@ class BookService:
             in_stock=params.in_stock,
             sort_by=params.sort_by,
             sort_order=params.sort_order,
-            offset=offset,
-            limit=size,
+            offset=(page - 1) * size,
+            limit=size + 1,
+            cursor=cursor,
+            total_mode=total_mode,
+        )
+        rows, has_more = split_page(rows, size)
+
+        cursor_token = None
+        if params.sort_by != "relevance" or not params.search:
+            sort_by = params.sort_by if params.sort_by in SORTABLE_FIELDS else "created_at"
+            cursor_token = next_cursor(rows, has_more, f"{sort_by}:{params.sort_order}", sort_by)
+        return rows, total, has_more, cursor_token
+
+    async def _facets(self, params: BookSearchParams, facets: set[Facet]) -> BookFacets:
+        counts = await self.book_repo.get_facets(
+            facets,
+            search=params.search,
+            category_id=params.category_id,
+            min_price=params.min_price,
+            max_price=params.max_price,
+            in_stock=params.in_stock,
+        )
+        return BookFacets(**counts)
+
+    async def search_books(
+        self,
+        params: BookSearchParams,
+        page: int = 1,
+        size: int = 20,
+        cursor: str | None = None,
+        total_mode: TotalMode = TotalMode.EXACT,
+        facets: set[Facet] | None = None,
+    ) -> BookListPage:
+        return BookListPage(**await self.search_book_page(params, page, size, cursor, total_mode, facets))
+
+    async def search_book_page(
+        self,
+        params: BookSearchParams,
+        page: int = 1,
+        size: int = 20,
+        cursor: str | None = None,
+        total_mode: TotalMode = TotalMode.EXACT,
+        facets: set[Facet] | None = None,
+    ) -> dict:
+        """``search_books`` as plain JSON-ready data, for ``FastJSONResponse``."""
+        rows, total, has_more, cursor_token = await self._search(params, page, size, cursor, total_mode)
+        snapshot = await category_registry.sync(self.db)
+        items = [
+            {
+                **{name: getattr(row, name) for name in LIST_FIELDS},
+                "categories": category_registry.category_dicts_of(row.id, snapshot),
+            }
+            for row in rows
+        ]
+        content = BookListPage.fields(
+            items, total=total, page=page, size=size, has_more=has_more, next_cursor=cursor_token
         )
-        return PaginatedResponse.create(items=list(books), total=total, page=page, size=size)
+        content["facets"] = (await self._facets(params, facets)).model_dump() if facets else None
+        return content
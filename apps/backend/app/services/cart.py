@@ -1,9 +1,12 @@
 from datetime import datetime, timedelta
 from decimal import Decimal
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
 
 from app.models.cart import CartItem
-from app.schemas.cart import CartItemCreate, CartItemUpdate, CartResponse, CartItemResponse
+from app.schemas.cart import (
+    CartAction, CartBatchRequest, CartItemCreate, CartItemUpdate, CartResponse, CartItemResponse,
+)
 from app.repositories.cart import CartRepository
 from app.repositories.book import BookRepository
 from app.services.inventory import InventoryService
@@ -17,8 +20,8 @@ class CartService:
         self.book_repo = BookRepository(db)
         self.inventory_service = InventoryService(db)
 
-    async def get_cart(self, user_id: int) -> CartResponse:
-        items = await self.cart_repo.get_user_cart(user_id)
+    async def get_cart(self, user_id: int, populate_existing: bool = False) -> CartResponse:
+        items = await self.cart_repo.get_user_cart(user_id, populate_existing)
         cart_items = []
         subtotal = Decimal("0.00")
         total_items = 0
@@ -36,37 +39,103 @@ class CartService:
         )
 
     async def add_item(self, user_id: int, item_data: CartItemCreate) -> CartItemResponse:
+        # The book loaded here answers the stock checks and is the response's book
         book = await self.book_repo.get_with_categories(item_data.book_id)
         if not book:
             raise NotFoundException("Book")
 
-        if not await self.inventory_service.check_stock(item_data.book_id, item_data.quantity):
+        if book.stock_quantity < item_data.quantity:
             raise BadRequestException(f"Only {book.stock_quantity} items available")
 
-        existing_item = await self.cart_repo.get_cart_item(user_id, item_data.book_id)
+        existing_item = await self.cart_repo.get_cart_item(user_id, item_data.book_id, load_book=False)
 
         if existing_item:
             new_quantity = existing_item.quantity + item_data.quantity
-            if not await self.inventory_service.check_stock(item_data.book_id, new_quantity):
+            if book.stock_quantity < new_quantity:
                 raise BadRequestException(f"Only {book.stock_quantity} items available")
 
             existing_item.quantity = new_quantity
             existing_item.expires_at = datetime.utcnow() + timedelta(days=7)
+            cart_item = existing_item
+        else:
+            cart_item = CartItem(
+                user_id=user_id,
+                book_id=item_data.book_id,
+                quantity=item_data.quantity,
+                expires_at=datetime.utcnow() + timedelta(days=7)
+            )
+            self.db.add(cart_item)
+
+        await self.db.commit()
+        set_committed_value(cart_item, "book", book)
+        return cart_item
+
+    async def apply_batch(self, user_id: int, batch: CartBatchRequest) -> CartResponse:
+        """Apply many adds, sets and removals in one transaction and return the cart.
+
+        Operations on the same book apply in order, and either every operation
+        lands or, on a missing book or short stock, none does. A batch of only
+        adds is written as one increment per book, so concurrent adds all
+        count, and stock is checked against the quantities that result. Any
+        other batch locks the cart rows it reads and writes their final
+        quantities with a single upsert.
+        """
+        book_ids = list(dict.fromkeys(item.book_id for item in batch.items))
+        now = datetime.utcnow()
+        expires_at = now + timedelta(days=7)
+
+        if all(item.action == CartAction.ADD for item in batch.items):
+            added = dict.fromkeys(book_ids, 0)
+            for item in batch.items:
+                added[item.book_id] += item.quantity
+            stocks = await self.inventory_service.get_stocks(book_ids)
+            await self.cart_repo.add_quantities(user_id, added, now, expires_at)
+            # Read after the write, on the writer, so the check sees other batches' adds
+            quantities = await self.cart_repo.get_quantities(user_id, book_ids)
+            try:
+                self._check_stock(quantities, stocks)
+            except BadRequestException:
+                await self.db.rollback()
+                raise
             await self.db.commit()
-            await self.db.refresh(existing_item)
-            return existing_item
-
-        cart_item = CartItem(
-            user_id=user_id,
-            book_id=item_data.book_id,
-            quantity=item_data.quantity,
-            expires_at=datetime.utcnow() + timedelta(days=7)
+            return await self.get_cart(user_id, populate_existing=True)
+
+        quantities = await self.cart_repo.get_quantities(user_id, book_ids, lock=True)
+        for item in batch.items:
+            if item.action == CartAction.REMOVE:
+                quantities.pop(item.book_id, None)
+            elif item.action == CartAction.SET:
+                quantities[item.book_id] = item.quantity
+            else:
+                quantities[item.book_id] = quantities.get(item.book_id, 0) + item.quantity
+
+        kept = [book_id for book_id in book_ids if book_id in quantities]
+        self._check_stock(quantities, await self.inventory_service.get_stocks(kept) if kept else {})
+
+        # Expired rows still hold (user_id, book_id), so they are overwritten as if new
+        await self.cart_repo.upsert(
+            [
+                {
+                    "user_id": user_id, "book_id": book_id, "quantity": quantities[book_id],
+                    "added_at": now, "expires_at": expires_at,
+                }
+                for book_id in kept
+            ],
+            index_elements=["user_id", "book_id"],
+            replace=["quantity", "added_at", "expires_at"],
         )
-        self.db.add(cart_item)
+        removed = [book_id for book_id in book_ids if book_id not in quantities]
+        if removed:
+            await self.cart_repo.remove_books(user_id, removed)
         await self.db.commit()
-        await self.db.refresh(cart_item)
 
-        return await self.cart_repo.get_cart_item_by_id(cart_item.id, user_id)
+        return await self.get_cart(user_id, populate_existing=True)
+
+    @staticmethod
+    def _check_stock(quantities: dict[int, int], stocks: dict[int, int]) -> None:
+        for book_id, quantity in quantities.items():
+            if stocks[book_id] < quantity:
+                raise BadRequestException(f"Only {stocks[book_id]} items of book {book_id} available")
 
     async def update_item(self, user_id: int, item_id: int, item_data: CartItemUpdate) -> CartItemResponse:
         item = await self.cart_repo.get_cart_item_by_id(item_id, user_id)
@@ -99,8 +168,9 @@ class CartService:
         if not cart.items:
             raise BadRequestException("Cart is empty")
 
+        stocks = await self.inventory_service.get_stocks([item.book_id for item in cart.items])
         for item in cart.items:
-            stock = await self.inventory_service.get_stock(item.book_id)
+            stock = stocks[item.book_id]
             if stock < item.quantity:
                 raise BadRequestException(
                     f"Insufficient stock for '{item.book.title}'. Available: {stock}"
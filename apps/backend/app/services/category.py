@@ -1,9 +1,11 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.category import Category
-from app.schemas.category import CategoryCreate, CategoryUpdate
+from app.schemas.category import CategoryCreate, CategoryUpdate, CategoryResponse
 from app.repositories.category import CategoryRepository
 from app.exceptions import NotFoundException, ConflictException
+from app.services.category_registry import category_registry
+from app.utils.response_cache import invalidate_categories
 
 
 class CategoryService:
@@ -16,16 +18,21 @@ class CategoryService:
         if existing:
             raise ConflictException("Category with this name already exists")
 
-        return await self.category_repo.create(category_data.model_dump())
+        category = await self.category_repo.create(category_data.model_dump())
+        await invalidate_categories()
+        await category_registry.load(self.db)
+        return category
 
-    async def get_category(self, category_id: int) -> Category:
-        category = await self.category_repo.get(category_id)
+    async def get_category(self, category_id: int) -> CategoryResponse:
+        snapshot = await category_registry.sync(self.db)
+        category = snapshot.by_id.get(category_id)
         if not category:
             raise NotFoundException("Category")
         return category
 
-    async def get_all_categories(self) -> list[Category]:
-        return list(await self.category_repo.get_all(limit=1000))
+    async def get_all_categories(self) -> list[CategoryResponse]:
+        snapshot = await category_registry.sync(self.db)
+        return list(snapshot.categories)
 
     async def update_category(self, category_id: int, category_data: CategoryUpdate) -> Category:
         category = await self.category_repo.get(category_id)
@@ -38,10 +45,15 @@ class CategoryService:
                 raise ConflictException("Category with this name already exists")
 
         update_data = category_data.model_dump(exclude_unset=True)
-        return await self.category_repo.update(category, update_data)
+        category = await self.category_repo.update(category, update_data)
+        await invalidate_categories()
+        await category_registry.load(self.db)
+        return category
 
     async def delete_category(self, category_id: int) -> None:
         category = await self.category_repo.get(category_id)
         if not category:
             raise NotFoundException("Category")
         await self.category_repo.delete(category)
+        await invalidate_categories()
+        await category_registry.load(self.db)
@@ -0,0 +1,165 @@
+import asyncio
+import logging
+import time
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass, field, replace
+from types import MappingProxyType
+from typing import Iterable, Mapping
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import get_settings
+from app.repositories.category import CategoryRepository
+from app.schemas.category import CategoryResponse
+from app.utils.response_cache import CATEGORIES, MEMBERSHIPS, response_cache
+
+logger = logging.getLogger(__name__)
+
+# Further behind than this, a full reload is cheaper than replaying changes book by book
+MAX_REPLAY = 100
+
+
+@dataclass(frozen=True)
+class CategorySnapshot:
+    """Every category plus each book's category ids, as of one load.
+
+    Memberships are stored in compressed sparse row form: ``rows`` holds
+    the sorted ids of books that have categories, and the categories of
+    ``rows[i]`` are ``indices[indptr[i]:indptr[i + 1]]``. ``overrides``
+    holds the books whose categories changed since the load, and wins.
+    """
+
+    categories: tuple[CategoryResponse, ...] = ()
+    by_id: Mapping[int, CategoryResponse] = field(default_factory=lambda: MappingProxyType({}))
+    # The same categories dumped to dicts, for responses serialized without Pydantic
+    dumped: Mapping[int, dict] = field(default_factory=lambda: MappingProxyType({}))
+    rows: array = field(default_factory=lambda: array("q"))
+    indptr: array = field(default_factory=lambda: array("q", [0]))
+    indices: array = field(default_factory=lambda: array("q"))
+    overrides: Mapping[int, array] = field(default_factory=lambda: MappingProxyType({}))
+
+    def category_ids_of(self, book_id: int) -> array:
+        if book_id in self.overrides:
+            return self.overrides[book_id]
+        position = bisect_left(self.rows, book_id)
+        if position < len(self.rows) and self.rows[position] == book_id:
+            return self.indices[self.indptr[position]:self.indptr[position + 1]]
+        return array("q")
+
+
+class CategoryRegistry:
+    """Process-wide, read-only view of the categories and book memberships.
+
+    Readers get an immutable ``CategorySnapshot`` that is replaced on every
+    change. ``sync`` reloads when the shared categories version has moved
+    (category writes bump it, see ``invalidate_categories``) or, as a
+    backstop for versions that are per process, when the snapshot is older
+    than ``category_registry_ttl_seconds``. Changes to a book's categories
+    only append the book to the memberships change log (see
+    ``invalidate_book_categories``); ``sync`` re-reads just those books.
+    """
+
+    def __init__(self):
+        self._lock = asyncio.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        self.snapshot = CategorySnapshot()
+        self.version: int | None = None
+        self.memberships: int | None = None
+        self.loaded_at = 0.0
+
+    @property
+    def ready(self) -> bool:
+        return self.version is not None
+
+    async def load(self, db: AsyncSession) -> None:
+        # Read the versions first, so a write that lands during the load is picked up by the next sync
+        versions = await response_cache.versions([CATEGORIES, MEMBERSHIPS])
+        repo = CategoryRepository(db)
+        categories = tuple(
+            CategoryResponse.model_validate(category) for category in await repo.list_all()
+        )
+        rows, indptr, indices = array("q"), array("q", [0]), array("q")
+        for book_id, category_id in await repo.get_memberships():
+            if not rows or rows[-1] != book_id:
+                if rows:
+                    indptr.append(len(indices))
+                rows.append(book_id)
+            indices.append(category_id)
+        if rows:
+            indptr.append(len(indices))
+
+        self.snapshot = CategorySnapshot(
+            categories=categories,
+            by_id=MappingProxyType({category.id: category for category in categories}),
+            dumped=MappingProxyType({category.id: category.model_dump() for category in categories}),
+            rows=rows,
+            indptr=indptr,
+            indices=indices,
+        )
+        self.version = versions[CATEGORIES]
+        self.memberships = versions[MEMBERSHIPS]
+        self.loaded_at = time.monotonic()
+        logger.info(f"Loaded {len(categories)} categories for {len(rows)} books")
+
+    def _is_loaded(self, version: int) -> bool:
+        if not self.ready:
+            return False
+        if time.monotonic() - self.loaded_at >= get_settings().category_registry_ttl_seconds:
+            return False
+        return self.version == version
+
+    async def _replay(self, db: AsyncSession, memberships: int) -> bool:
+        """Re-read the books whose categories changed since the snapshot; False when a reload is needed."""
+        if memberships == self.memberships:
+            return True
+        if not 0 < memberships - self.memberships <= MAX_REPLAY:
+            return False
+        changes = await response_cache.changes(MEMBERSHIPS, self.memberships, memberships)
+        if changes is None:
+            return False
+        book_ids = sorted({int(book_id) for book_id in changes})
+        category_ids: dict[int, list[int]] = {book_id: [] for book_id in book_ids}
+        for book_id, category_id in await CategoryRepository(db).get_memberships(book_ids):
+            category_ids[book_id].append(category_id)
+        for book_id, ids in category_ids.items():
+            self.set_categories(book_id, ids)
+        self.memberships = memberships
+        return True
+
+    async def sync(self, db: AsyncSession) -> CategorySnapshot:
+        """Reload or replay changes if stale and return the current snapshot."""
+        versions = await response_cache.versions([CATEGORIES, MEMBERSHIPS])
+        if self._is_loaded(versions[CATEGORIES]) and versions[MEMBERSHIPS] == self.memberships:
+            return self.snapshot
+        async with self._lock:
+            versions = await response_cache.versions([CATEGORIES, MEMBERSHIPS])
+            if not self._is_loaded(versions[CATEGORIES]) or not await self._replay(db, versions[MEMBERSHIPS]):
+                await self.load(db)
+        return self.snapshot
+
+    def set_categories(self, book_id: int, category_ids: Iterable[int]) -> None:
+        """Record one book's current categories without reloading the rest."""
+        overrides = {**self.snapshot.overrides, book_id: array("q", sorted(category_ids))}
+        self.snapshot = replace(self.snapshot, overrides=MappingProxyType(overrides))
+
+    def categories_of(self, book_id: int, snapshot: CategorySnapshot | None = None) -> list[CategoryResponse]:
+        snapshot = snapshot or self.snapshot
+        return [
+            snapshot.by_id[category_id]
+            for category_id in snapshot.category_ids_of(book_id)
+            if category_id in snapshot.by_id
+        ]
+
+    def category_dicts_of(self, book_id: int, snapshot: CategorySnapshot | None = None) -> list[dict]:
+        snapshot = snapshot or self.snapshot
+        return [
+            snapshot.dumped[category_id]
+            for category_id in snapshot.category_ids_of(book_id)
+            if category_id in snapshot.dumped
+        ]
+
+
+category_registry = CategoryRegistry()
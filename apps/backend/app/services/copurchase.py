@@ -0,0 +1,307 @@
+import asyncio
+import heapq
+import logging
+import os
+import struct
+import tempfile
+from array import array
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from itertools import combinations
+from pathlib import Path
+from typing import Iterable
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.order import OrderItem, OrderStatus, OrderStatusHistory
+
+logger = logging.getLogger(__name__)
+
+FILE_MAGIC = b"CPIX"
+FILE_VERSION = 2
+HEADER = struct.Struct("<4sHqqqq")
+
+# Distinct neighbours a book's delta may gather before catch_up compacts early; top() merges
+# at most this many entries beyond the k it returns
+MAX_DELTA = 256
+
+# History ids below the watermark that catch_up reads again. On PostgreSQL ids
+# are handed out before commit, so a PAID row can become visible after rows
+# with higher ids; this bounds how far out of order it may land
+LATE_COMMIT_WINDOW = 1000
+
+
+def ranked(neighbours: Counter) -> list[tuple[int, int]]:
+    return sorted(neighbours.items(), key=lambda item: (-item[1], item[0]))
+
+
+def merge_rows(
+    rows: array, indptr: array, indices: array, counts: array, delta: dict[int, Counter]
+) -> tuple[array, array, array, array]:
+    """New CSR arrays with ``delta`` added; rows without a delta are copied as they are."""
+    new_rows, new_indptr, new_indices, new_counts = array("q"), array("q", [0]), array("q"), array("q")
+
+    def copy(first: int, last: int) -> None:
+        # Rows [first, last) move as whole slices, their offsets shifted by how far the output has grown
+        if first >= last:
+            return
+        shift = len(new_indices) - indptr[first]
+        new_rows.extend(rows[first:last])
+        new_indices.extend(indices[indptr[first]:indptr[last]])
+        new_counts.extend(counts[indptr[first]:indptr[last]])
+        new_indptr.extend(offset + shift for offset in indptr[first + 1:last + 1])
+
+    position = 0
+    for book_id in sorted(delta):
+        found = bisect_left(rows, book_id, position)
+        copy(position, found)
+        neighbours = Counter(delta[book_id])
+        if found < len(rows) and rows[found] == book_id:
+            start, end = indptr[found], indptr[found + 1]
+            neighbours.update(dict(zip(indices[start:end], counts[start:end])))
+            found += 1
+        new_rows.append(book_id)
+        for other, count in ranked(neighbours):
+            new_indices.append(other)
+            new_counts.append(count)
+        new_indptr.append(len(new_indices))
+        position = found
+    copy(position, len(rows))
+    return new_rows, new_indptr, new_indices, new_counts
+
+
+def write_snapshot(
+    path: str, arrays: tuple[array, array, array, array], watermark: int, applied: dict[int, int]
+) -> None:
+    rows, indptr, indices, counts = arrays
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    # Workers sharing the path each write their own file and swap it in whole
+    descriptor, temporary = tempfile.mkstemp(dir=target.parent, prefix=f"{target.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(descriptor, "wb") as handle:
+            handle.write(HEADER.pack(FILE_MAGIC, FILE_VERSION, len(rows), len(indices), watermark, len(applied)))
+            for values in arrays:
+                values.tofile(handle)
+            array("q", applied.keys()).tofile(handle)
+            array("q", applied.values()).tofile(handle)
+        os.replace(temporary, target)
+    except BaseException:
+        Path(temporary).unlink(missing_ok=True)
+        raise
+
+
+class CoPurchaseIndex:
+    """Item-to-item co-purchase counts over every order that has been paid.
+
+    Counts are stored in compressed sparse row form: ``rows`` holds the
+    sorted book ids, and the neighbours of ``rows[i]`` are
+    ``indices[indptr[i]:indptr[i + 1]]`` with matching ``counts``, ordered
+    by count descending so the top k is a slice. Orders paid since the last
+    ``compact`` are kept in a small per-book delta until they are folded in.
+    Compaction merges only the rows with a delta, on a worker thread, and
+    swaps the new arrays in whole; the arrays are never changed in place.
+    ``top`` merges a book's delta with only the head of its row, and a
+    delta larger than ``MAX_DELTA`` brings the next compaction forward.
+
+    ``watermark`` is the highest ``order_status_history`` id of a PAID
+    transition already counted. ``catch_up`` reads from ``LATE_COMMIT_WINDOW``
+    ids below it and skips the orders in ``applied``, the ones counted
+    within that window, so a late-committing row is counted exactly once.
+    """
+
+    def __init__(self):
+        self._lock = asyncio.Lock()
+        self._compacting = asyncio.Lock()
+        self._compaction: asyncio.Task | None = None
+        self._builds = 0
+        self.reset()
+
+    def reset(self) -> None:
+        self.rows = array("q")
+        self.indptr = array("q", [0])
+        self.indices = array("q")
+        self.counts = array("q")
+        self.watermark = 0
+        self.applied: dict[int, int] = {}
+        self.ready = False
+        self._delta: dict[int, Counter] = defaultdict(Counter)
+        # Set once some book's delta outgrows MAX_DELTA, so catch_up compacts without waiting for the refresh
+        self.compact_due = False
+        # Orders applied so far, and how many of them the file at the last save or load holds
+        self.changes = 0
+        self._saved_changes: int | None = None
+        # Compactions started before a reset must not swap their arrays in after it
+        self._builds += 1
+
+    def _row(self, book_id: int) -> tuple[int, int]:
+        position = bisect_left(self.rows, book_id)
+        if position < len(self.rows) and self.rows[position] == book_id:
+            return self.indptr[position], self.indptr[position + 1]
+        return 0, 0
+
+    def top(self, book_id: int, k: int) -> list[int]:
+        start, end = self._row(book_id)
+        delta = self._delta.get(book_id)
+        if not delta:
+            return self.indices[start:min(end, start + k)].tolist()
+
+        # Only the books in the delta change rank, so the rest of the top k is
+        # among the first k + len(delta) entries of the row
+        window = min(end, start + k + len(delta))
+        merged = dict(zip(self.indices[start:window], self.counts[start:window]))
+        for other, count in delta.items():
+            if other not in merged:
+                try:
+                    merged[other] = self.counts[self.indices.index(other, window, end)]
+                except ValueError:
+                    merged[other] = 0
+            merged[other] += count
+        return [other for other, _ in heapq.nsmallest(k, merged.items(), key=lambda item: (-item[1], item[0]))]
+
+    def add_order(self, book_ids: Iterable[int]) -> None:
+        for first, second in combinations(sorted(set(book_ids)), 2):
+            self._delta[first][second] += 1
+            self._delta[second][first] += 1
+            if len(self._delta[first]) > MAX_DELTA or len(self._delta[second]) > MAX_DELTA:
+                self.compact_due = True
+
+    def _compact_soon(self) -> None:
+        """Start a compaction in the background unless one is already running."""
+        if self._compaction is None or self._compaction.done():
+            self._compaction = asyncio.get_running_loop().create_task(self.compact())
+
+    async def compact(self) -> None:
+        """Fold pending deltas into the CSR arrays, off the event loop."""
+        async with self._compacting:
+            self.compact_due = False
+            await self._compact()
+
+    async def _compact(self) -> tuple[tuple[array, array, array, array], int, dict[int, int], int] | None:
+        """Compact and return the new arrays with the watermark, applied orders and changes they hold.
+
+        Orders applied while the thread runs stay in the delta. Returns None
+        when a build or load replaced the index in the meantime.
+        """
+        builds = self._builds
+        delta = {book_id: Counter(neighbours) for book_id, neighbours in self._delta.items()}
+        state = (self.watermark, dict(self.applied), self.changes)
+        if delta:
+            arrays = await asyncio.to_thread(merge_rows, self.rows, self.indptr, self.indices, self.counts, delta)
+            if builds != self._builds:
+                return None
+            self.rows, self.indptr, self.indices, self.counts = arrays
+            for book_id, folded in delta.items():
+                pending = self._delta[book_id]
+                pending.subtract(folded)
+                remaining = +pending
+                if remaining:
+                    self._delta[book_id] = remaining
+                else:
+                    del self._delta[book_id]
+        return (self.rows, self.indptr, self.indices, self.counts), *state
+
+    async def _paid_orders(self, db: AsyncSession, after: int) -> dict[int, tuple[int, list[int]]]:
+        """History id of the PAID transition and the books of each order paid after ``after``."""
+        paid = (
+            select(OrderStatusHistory.order_id, func.max(OrderStatusHistory.id).label("history_id"))
+            .where(OrderStatusHistory.status == OrderStatus.PAID, OrderStatusHistory.id > after)
+            .group_by(OrderStatusHistory.order_id)
+            .subquery()
+        )
+        result = await db.execute(
+            select(OrderItem.order_id, OrderItem.book_id, paid.c.history_id)
+            .join(paid, paid.c.order_id == OrderItem.order_id)
+            .order_by(OrderItem.order_id)
+        )
+        orders: dict[int, tuple[int, list[int]]] = {}
+        for order_id, book_id, history_id in result.tuples():
+            orders.setdefault(order_id, (history_id, []))[1].append(book_id)
+        return orders
+
+    def _apply(self, orders: dict[int, tuple[int, list[int]]]) -> int:
+        applied = 0
+        for order_id, (history_id, book_ids) in orders.items():
+            if order_id in self.applied:
+                continue
+            self.add_order(book_ids)
+            self.changes += 1
+            self.applied[order_id] = history_id
+            self.watermark = max(self.watermark, history_id)
+            applied += 1
+        horizon = self.watermark - LATE_COMMIT_WINDOW
+        self.applied = {order_id: history_id for order_id, history_id in self.applied.items() if history_id > horizon}
+        return applied
+
+    async def build(self, db: AsyncSession) -> None:
+        async with self._lock:
+            self.reset()
+            self._apply(await self._paid_orders(db, after=0))
+            await self.compact()
+            self.ready = True
+
+    async def catch_up(self, db: AsyncSession) -> int:
+        """Count orders paid since the watermark, including those paid by other workers.
+
+        Checkouts, status updates and the periodic refresh all call this, so
+        runs are serialized and each reads the watermark its predecessor left.
+        """
+        async with self._lock:
+            if not self.ready:
+                return 0
+            orders = await self._paid_orders(db, after=max(self.watermark - LATE_COMMIT_WINDOW, 0))
+            applied = self._apply(orders)
+            if self.compact_due:
+                self._compact_soon()
+            return applied
+
+    async def save(self, path: str) -> None:
+        """Compact and write the index to ``path``, unless no order was applied since the last save or load."""
+        async with self._compacting:
+            if self.changes == self._saved_changes:
+                return
+            compacted = await self._compact()
+            if compacted is None:
+                return
+            arrays, watermark, applied, changes = compacted
+            await asyncio.to_thread(write_snapshot, path, arrays, watermark, applied)
+            self._saved_changes = changes
+
+    def load(self, path: str) -> bool:
+        try:
+            with open(path, "rb") as handle:
+                magic, version, row_count, nnz, watermark, applied_count = HEADER.unpack(handle.read(HEADER.size))
+                if magic != FILE_MAGIC or version != FILE_VERSION:
+                    return False
+                arrays = []
+                for length in (row_count, row_count + 1, nnz, nnz, applied_count, applied_count):
+                    values = array("q")
+                    values.fromfile(handle, length)
+                    arrays.append(values)
+        except (OSError, EOFError, struct.error):
+            return False
+        self.reset()
+        self.rows, self.indptr, self.indices, self.counts = arrays[:4]
+        self.applied = dict(zip(arrays[4], arrays[5]))
+        self.watermark = watermark
+        self._saved_changes = self.changes
+        self.ready = True
+        return True
+
+    async def warm(self, db: AsyncSession, path: str | None) -> None:
+        if path and self.load(path):
+            caught_up = await self.catch_up(db)
+            logger.info(f"Loaded co-purchase index from {path}, {caught_up} newly paid orders applied")
+        else:
+            await self.build(db)
+            logger.info(f"Built co-purchase index for {len(self.rows)} books")
+        if path:
+            try:
+                await self.save(path)
+            except OSError:
+                # The index in memory is complete; only the next restart loses the head start
+                logger.exception(f"Could not save co-purchase index to {path}")
+
+
+copurchase_index = CoPurchaseIndex()
@@ -1,5 +1,7 @@
-from sqlalchemy import select
+from sqlalchemy import case, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlalchemy.orm.util import identity_key
 
 from app.models.book import Book
 from app.exceptions import NotFoundException, InsufficientStockException
@@ -53,3 +55,62 @@ class InventoryService:
         if stock is None:
             raise NotFoundException("Book")
         return stock
+
+    async def get_stocks(self, book_ids: list[int]) -> dict[int, int]:
+        result = await self.db.execute(
+            select(Book.id, Book.stock_quantity).where(Book.id.in_(book_ids), Book.is_deleted == False)
+        )
+        stocks = dict(result.tuples().all())
+        if len(stocks) < len(set(book_ids)):
+            raise NotFoundException("Book")
+        return stocks
+
+    async def reserve_stock_bulk(self, quantities: dict[int, int]) -> dict[int, int]:
+        """Decrement stock for every book in one conditional UPDATE and return the new levels.
+
+        Books without enough stock are left untouched and reported by raising,
+        so the caller must roll back the transaction on error.
+        """
+        quantity = case(quantities, value=Book.id)
+        result = await self.db.execute(
+            update(Book)
+            .where(
+                Book.id.in_(quantities),
+                Book.is_deleted == False,
+                Book.stock_quantity >= quantity,
+            )
+            .values(stock_quantity=Book.stock_quantity - quantity)
+            .returning(Book.id, Book.stock_quantity)
+            .execution_options(synchronize_session=False)
+        )
+        reserved = self._sync_stock(result.tuples().all())
+
+        shortfall = [book_id for book_id in quantities if book_id not in reserved]
+        if shortfall:
+            result = await self.db.execute(
+                select(Book.title).where(Book.id.in_(shortfall), Book.is_deleted == False)
+            )
+            title = result.scalars().first()
+            if title is None:
+                raise NotFoundException("Book")
+            raise InsufficientStockException(title)
+        return reserved
+
+    async def release_stock_bulk(self, quantities: dict[int, int]) -> dict[int, int]:
+        quantity = case(quantities, value=Book.id)
+        result = await self.db.execute(
+            update(Book)
+            .where(Book.id.in_(quantities))
+            .values(stock_quantity=Book.stock_quantity + quantity)
+            .returning(Book.id, Book.stock_quantity)
+            .execution_options(synchronize_session=False)
+        )
+        return self._sync_stock(result.tuples().all())
+
+    def _sync_stock(self, rows: list[tuple[int, int]]) -> dict[int, int]:
+        """Apply RETURNING values to Book objects already loaded in the session."""
+        for book_id, stock_quantity in rows:
+            book = self.db.identity_map.get(identity_key(Book, book_id))
+            if book is not None:
+                set_committed_value(book, "stock_quantity", stock_quantity)
+        return dict(rows)
@@ -1,13 +1,18 @@
 from decimal import Decimal
+from sqlalchemy import insert
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm.attributes import set_committed_value
 
+from app.models.cart import CartItem
 from app.models.order import Order, OrderItem, OrderStatus, OrderStatusHistory
 from app.schemas.order import OrderCreate, OrderStatusUpdate
 from app.repositories.order import OrderRepository
 from app.services.cart import CartService
+from app.services.copurchase import copurchase_index
 from app.services.inventory import InventoryService
 from app.exceptions import NotFoundException, BadRequestException, ForbiddenException
-from app.utils.pagination import PaginatedResponse
+from app.utils.pagination import PaginatedResponse, TotalMode, next_cursor, split_page
+from app.utils.response_cache import invalidate_stock
 
 
 class OrderService:
@@ -29,16 +34,21 @@ class OrderService:
         self.db.add(order)
         await self.db.flush()
 
-        for cart_item in cart.items:
-            await self.inventory_service.reserve_stock(cart_item.book_id, cart_item.quantity)
-
-            order_item = OrderItem(
-                order_id=order.id,
-                book_id=cart_item.book_id,
-                quantity=cart_item.quantity,
-                price_at_purchase=cart_item.book.price
-            )
-            self.db.add(order_item)
+        try:
+            stocks = await self.inventory_service.reserve_stock_bulk(self._item_quantities(cart.items))
+        except Exception:
+            await self.db.rollback()
+            raise
+
+        items = await self.db.scalars(insert(OrderItem).returning(OrderItem), [
+            {
+                "order_id": order.id,
+                "book_id": cart_item.book_id,
+                "quantity": cart_item.quantity,
+                "price_at_purchase": cart_item.book.price,
+            }
+            for cart_item in cart.items
+        ])
 
         status_history = OrderStatusHistory(
             order_id=order.id,
@@ -50,9 +60,12 @@ class OrderService:
         await self.cart_service.clear_cart(user_id)
 
         await self.db.commit()
-        await self.db.refresh(order)
+        await invalidate_stock(stocks, availability_changed=0 in stocks.values())
 
-        return await self.order_repo.get_with_details(order.id)
+        # Everything the response shows was just written, so attach it rather than reload it
+        set_committed_value(order, "items", items.all())
+        set_committed_value(order, "status_history", [status_history])
+        return order
 
     async def get_order(self, order_id: int, user_id: int) -> Order:
         order = await self.order_repo.get_user_order(order_id, user_id)
@@ -71,45 +84,47 @@ class OrderService:
         user_id: int,
         status: OrderStatus | None = None,
         page: int = 1,
-        size: int = 20
+        size: int = 20,
+        cursor: str | None = None,
+        total_mode: TotalMode = TotalMode.EXACT,
     ) -> PaginatedResponse:
-        offset = (page - 1) * size
-        orders, total = await self.order_repo.get_user_orders(user_id, status, offset, size)
-
-        order_list = []
-        for order in orders:
-            order_list.append({
-                "id": order.id,
-                "status": order.status,
-                "total_amount": order.total_amount,
-                "created_at": order.created_at,
-                "item_count": sum(item.quantity for item in order.items)
-            })
+        return PaginatedResponse(**await self.get_user_order_page(user_id, status, page, size, cursor, total_mode))
 
-        return PaginatedResponse.create(items=order_list, total=total, page=page, size=size)
+    async def get_user_order_page(
+        self,
+        user_id: int,
+        status: OrderStatus | None = None,
+        page: int = 1,
+        size: int = 20,
+        cursor: str | None = None,
+        total_mode: TotalMode = TotalMode.EXACT,
+    ) -> dict:
+        """``get_user_orders`` as plain JSON-ready data, for ``FastJSONResponse``."""
+        rows, total = await self.order_repo.get_user_orders(
+            user_id, status, (page - 1) * size, size + 1, cursor, total_mode
+        )
+        orders, has_more = split_page(rows, size)
+        return PaginatedResponse.fields(
+            [{**row._asdict(), "user_email": None} for row in orders],
+            total=total, page=page, size=size, has_more=has_more,
+            next_cursor=next_cursor(orders, has_more, "created_at:desc", "created_at"),
+        )
 
     async def get_all_orders(
         self,
         status: OrderStatus | None = None,
         page: int = 1,
-        size: int = 20
+        size: int = 20,
+        cursor: str | None = None,
+        total_mode: TotalMode = TotalMode.EXACT,
     ) -> PaginatedResponse:
         offset = (page - 1) * size
-        orders, total = await self.order_repo.get_all_orders(status, offset, size)
-
-        order_list = []
-        for order in orders:
-            order_list.append({
-                "id": order.id,
-                "user_id": order.user_id,
-                "status": order.status,
-                "total_amount": order.total_amount,
-                "created_at": order.created_at,
-                "item_count": sum(item.quantity for item in order.items),
-                "user_email": order.user.email if order.user else None
-            })
-
-        return PaginatedResponse.create(items=order_list, total=total, page=page, size=size)
+        rows, total = await self.order_repo.get_all_orders(status, offset, size + 1, cursor, total_mode)
+        orders, has_more = split_page(rows, size)
+        return PaginatedResponse.create(
+            items=[row._asdict() for row in orders], total=total, page=page, size=size, has_more=has_more,
+            next_cursor=next_cursor(orders, has_more, "created_at:desc", "created_at"),
+        )
 
     async def cancel_order(self, order_id: int, user_id: int) -> Order:
         order = await self.order_repo.get_user_order(order_id, user_id)
@@ -119,10 +134,11 @@ class OrderService:
         if order.status not in [OrderStatus.PENDING]:
             raise BadRequestException("Only pending orders can be cancelled")
 
-        for item in order.items:
-            await self.inventory_service.release_stock(item.book_id, item.quantity)
+        quantities = self._item_quantities(order.items)
+        stocks = await self.inventory_service.release_stock_bulk(quantities)
 
         await self.order_repo.add_status_history(order, OrderStatus.CANCELLED, "Cancelled by user")
+        await invalidate_stock(stocks, availability_changed=self._restocked(stocks, quantities))
 
         return await self.order_repo.get_with_details(order.id)
 
@@ -148,14 +164,34 @@ class OrderService:
                 f"Cannot transition from {order.status.value} to {status_update.status.value}"
             )
 
-        if status_update.status == OrderStatus.CANCELLED and order.status in [OrderStatus.PENDING, OrderStatus.PAID]:
-            for item in order.items:
-                await self.inventory_service.release_stock(item.book_id, item.quantity)
+        releases_stock = (
+            status_update.status == OrderStatus.CANCELLED
+            and order.status in [OrderStatus.PENDING, OrderStatus.PAID]
+        )
+        if releases_stock:
+            quantities = self._item_quantities(order.items)
+            stocks = await self.inventory_service.release_stock_bulk(quantities)
 
         await self.order_repo.add_status_history(order, status_update.status, status_update.note)
+        if releases_stock:
+            await invalidate_stock(stocks, availability_changed=self._restocked(stocks, quantities))
+        if status_update.status == OrderStatus.PAID:
+            await copurchase_index.catch_up(self.db)
 
         return await self.order_repo.get_with_details(order.id)
 
+    @staticmethod
+    def _restocked(stocks: dict[int, int], released: dict[int, int]) -> bool:
+        """Whether a release brought a sold-out book back into stock."""
+        return any(stock == released[book_id] for book_id, stock in stocks.items())
+
+    @staticmethod
+    def _item_quantities(items: list[OrderItem] | list[CartItem]) -> dict[int, int]:
+        quantities: dict[int, int] = {}
+        for item in items:
+            quantities[item.book_id] = quantities.get(item.book_id, 0) + item.quantity
+        return quantities
+
     async def get_order_tracking(self, order_id: int, user_id: int) -> list[OrderStatusHistory]:
         order = await self.order_repo.get_user_order(order_id, user_id)
         if not order:
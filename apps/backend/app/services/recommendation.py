@@ -4,7 +4,8 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from app.models.book import Book, book_categories
-from app.models.order import Order, OrderItem, OrderStatus
+from app.models.order import Order, OrderItem, OrderStatus, OrderStatusHistory
+from app.services.copurchase import copurchase_index
 
 
 class RecommendationService:
@@ -12,34 +13,49 @@ class RecommendationService:
         self.db = db
 
     async def get_also_bought(self, book_id: int, limit: int = 5) -> Sequence[Book]:
+        if copurchase_index.ready:
+            # Over-fetch so deleted books can be dropped without a second round trip
+            book_ids = copurchase_index.top(book_id, limit * 2)
+        else:
+            book_ids = await self._query_also_bought(book_id, limit)
+
+        if not book_ids:
+            return await self.get_category_recommendations(book_id, limit)
+
+        result = await self.db.execute(
+            select(Book)
+            .options(selectinload(Book.categories))
+            .where(Book.id.in_(book_ids), Book.is_deleted == False)
+        )
+        rank = {other_id: position for position, other_id in enumerate(book_ids)}
+        return sorted(result.scalars().all(), key=lambda book: rank[book.id])[:limit]
+
+    async def _query_also_bought(self, book_id: int, limit: int) -> list[int]:
+        # Ranked like the co-purchase index: paid orders only, each counted once, ties by book id
+        paid = (
+            select(OrderStatusHistory.id)
+            .where(OrderStatusHistory.order_id == OrderItem.order_id, OrderStatusHistory.status == OrderStatus.PAID)
+            .exists()
+        )
         orders_with_book = (
             select(OrderItem.order_id)
-            .where(OrderItem.book_id == book_id)
+            .where(OrderItem.book_id == book_id, paid)
         )
 
+        count = func.count(func.distinct(OrderItem.order_id))
         other_books = (
-            select(OrderItem.book_id, func.count(OrderItem.book_id).label("count"))
+            select(OrderItem.book_id, count.label("count"))
             .where(
                 OrderItem.order_id.in_(orders_with_book),
                 OrderItem.book_id != book_id
             )
             .group_by(OrderItem.book_id)
-            .order_by(func.count(OrderItem.book_id).desc())
+            .order_by(count.desc(), OrderItem.book_id)
             .limit(limit)
         )
 
         other_book_ids = await self.db.execute(other_books)
-        book_ids = [row[0] for row in other_book_ids.fetchall()]
-
-        if not book_ids:
-            return await self.get_category_recommendations(book_id, limit)
-
-        result = await self.db.execute(
-            select(Book)
-            .options(selectinload(Book.categories))
-            .where(Book.id.in_(book_ids), Book.is_deleted == False)
-        )
-        return result.scalars().all()
+        return [row[0] for row in other_book_ids.fetchall()]
 
     async def get_category_recommendations(
         self,
@@ -1,13 +1,16 @@
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.models.book import Book
 from app.models.review import Review
 from app.models.order import Order, OrderItem, OrderStatus
 from app.schemas.review import ReviewCreate, ReviewUpdate
-from app.repositories.review import ReviewRepository
+from app.repositories.analytics import AnalyticsRepository
+from app.repositories.review import RATING_COLUMNS, ReviewRepository, average_rating
 from app.repositories.book import BookRepository
 from app.exceptions import NotFoundException, ConflictException, ForbiddenException
-from app.utils.pagination import PaginatedResponse
+from app.utils.pagination import PaginatedResponse, TotalMode, next_cursor, split_page
+from app.utils.response_cache import invalidate_ratings, invalidate_reviews
 
 
 SENSITIVE_KEYWORDS = [
@@ -27,11 +30,17 @@ def contains_sensitive_content(text: str | None) -> bool:
     return any(keyword in lower for keyword in SENSITIVE_KEYWORDS)
 
 
+def rating_contribution(review: Review) -> int | None:
+    """The star value a review adds to its book's aggregates, if any."""
+    return review.rating if review.is_approved else None
+
+
 class ReviewService:
     def __init__(self, db: AsyncSession):
         self.db = db
         self.review_repo = ReviewRepository(db)
         self.book_repo = BookRepository(db)
+        self.analytics_repo = AnalyticsRepository(db)
 
     async def has_purchased_book(self, user_id: int, book_id: int) -> bool:
         result = await self.db.execute(
@@ -70,11 +79,12 @@ class ReviewService:
             is_approved=not contains_sensitive_content(review_data.comment)
         )
         self.db.add(review)
+        await self.db.flush()
+        await self.review_repo.apply_rating_change(book_id, None, rating_contribution(review))
         await self.db.commit()
+        await invalidate_reviews(book_id)
         await self.db.refresh(review)
 
-        await self.review_repo.update_book_rating(book_id)
-
         result = await self.db.execute(
             select(Review)
             .where(Review.id == review.id)
@@ -85,27 +95,33 @@ class ReviewService:
         self,
         book_id: int,
         page: int = 1,
-        size: int = 20
+        size: int = 20,
+        cursor: str | None = None,
+        total_mode: TotalMode = TotalMode.EXACT,
     ) -> PaginatedResponse:
-        book = await self.book_repo.get_with_categories(book_id)
-        if not book:
-            raise NotFoundException("Book")
-
-        offset = (page - 1) * size
-        reviews, total = await self.review_repo.get_book_reviews(book_id, True, offset, size)
+        return PaginatedResponse(**await self.get_book_review_page(book_id, page, size, cursor, total_mode))
 
-        review_list = []
-        for review in reviews:
-            review_list.append({
-                "id": review.id,
-                "rating": review.rating,
-                "comment": review.comment,
-                "is_verified_purchase": review.is_verified_purchase,
-                "created_at": review.created_at,
-                "reviewer_name": review.user.full_name if review.user else "Anonymous"
-            })
+    async def get_book_review_page(
+        self,
+        book_id: int,
+        page: int = 1,
+        size: int = 20,
+        cursor: str | None = None,
+        total_mode: TotalMode = TotalMode.EXACT,
+    ) -> dict:
+        """``get_book_reviews`` as plain JSON-ready data, for ``FastJSONResponse``."""
+        if await self.book_repo.get_updated_at(book_id) is None:
+            raise NotFoundException("Book")
 
-        return PaginatedResponse.create(items=review_list, total=total, page=page, size=size)
+        rows, total = await self.review_repo.get_book_reviews(
+            book_id, True, (page - 1) * size, size + 1, cursor, total_mode
+        )
+        reviews, has_more = split_page(rows, size)
+        return PaginatedResponse.fields(
+            [row._asdict() for row in reviews],
+            total=total, page=page, size=size, has_more=has_more,
+            next_cursor=next_cursor(reviews, has_more, "created_at:desc", "created_at"),
+        )
 
     async def update_review(
         self,
@@ -124,6 +140,7 @@ class ReviewService:
         if review.user_id != user_id:
             raise ForbiddenException("You can only edit your own reviews")
 
+        before = rating_contribution(review)
         if review_data.rating is not None:
             review.rating = review_data.rating
         if review_data.comment is not None:
@@ -131,11 +148,11 @@ class ReviewService:
             if contains_sensitive_content(review_data.comment):
                 review.is_approved = False
 
+        await self.review_repo.apply_rating_change(review.book_id, before, rating_contribution(review))
         await self.db.commit()
+        await invalidate_reviews(review.book_id)
         await self.db.refresh(review)
 
-        await self.review_repo.update_book_rating(review.book_id)
-
         return review
 
     async def delete_review(self, user_id: int, review_id: int) -> None:
@@ -151,8 +168,10 @@ class ReviewService:
             raise ForbiddenException("You can only delete your own reviews")
 
         book_id = review.book_id
+        await self.review_repo.apply_rating_change(book_id, rating_contribution(review), None)
+        await self.analytics_repo.remove("new_reviews", review.created_at)
         await self.review_repo.delete(review)
-        await self.review_repo.update_book_rating(book_id)
+        await invalidate_reviews(book_id)
 
     async def approve_review(self, review_id: int, approved: bool = True) -> Review:
         result = await self.db.execute(
@@ -163,17 +182,25 @@ class ReviewService:
         if not review:
             raise NotFoundException("Review")
 
+        before = rating_contribution(review)
         review.is_approved = approved
+        await self.review_repo.apply_rating_change(review.book_id, before, rating_contribution(review))
         await self.db.commit()
+        await invalidate_reviews(review.book_id)
         await self.db.refresh(review)
 
-        await self.review_repo.update_book_rating(review.book_id)
-
         return review
 
-    async def get_pending_reviews(self, page: int = 1, size: int = 20) -> PaginatedResponse:
+    async def get_pending_reviews(
+        self,
+        page: int = 1,
+        size: int = 20,
+        cursor: str | None = None,
+        total_mode: TotalMode = TotalMode.EXACT,
+    ) -> PaginatedResponse:
         offset = (page - 1) * size
-        reviews, total = await self.review_repo.get_pending_reviews(offset, size)
+        rows, total = await self.review_repo.get_pending_reviews(offset, size + 1, cursor, total_mode)
+        reviews, has_more = split_page(rows, size)
 
         review_list = []
         for review in reviews:
@@ -191,4 +218,51 @@ class ReviewService:
                 "user_name": review.user.full_name if review.user else "Anonymous",
             })
 
-        return PaginatedResponse.create(items=review_list, total=total, page=page, size=size)
+        return PaginatedResponse.create(
+            items=review_list, total=total, page=page, size=size, has_more=has_more,
+            next_cursor=next_cursor(reviews, has_more, "created_at:desc", "created_at"),
+        )
+
+    async def rebuild_book_ratings(self, batch_size: int = 500, repair: bool = True) -> list[int]:
+        """Recompute every book's rating aggregates from its reviews, a batch of books at a time.
+
+        Returns the ids of books whose stored aggregates had drifted. With
+        ``repair`` those books are rewritten and each batch is committed.
+        """
+        drifted = []
+        last_id = 0
+        while True:
+            result = await self.db.execute(
+                select(Book.id, *RATING_COLUMNS)
+                .where(Book.id > last_id)
+                .order_by(Book.id)
+                .limit(batch_size)
+            )
+            rows = result.all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+
+            histograms = await self.review_repo.get_rating_histograms([row.id for row in rows])
+            for row in rows:
+                histogram = histograms[row.id]
+                review_count = sum(histogram.values())
+                rating_sum = sum(stars * count for stars, count in histogram.items())
+                stored = {stars: getattr(row, f"rating_{stars}_count") for stars in histogram}
+                if (
+                    stored != histogram
+                    or row.review_count != review_count
+                    or row.rating_sum != rating_sum
+                    or row.rating != average_rating(rating_sum, review_count)
+                ):
+                    drifted.append(row.id)
+                    if repair:
+                        await self.review_repo.set_rating_aggregates(row.id, histogram)
+
+            if repair:
+                await self.db.commit()
+
+        if repair and drifted:
+            await invalidate_ratings(drifted)
+
+        return drifted
@@ -0,0 +1,70 @@
+import time
+from dataclasses import dataclass, fields
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy.orm import make_transient_to_detached
+
+from app.config import get_settings
+from app.models.user import User, UserRole
+from app.utils.cache import TTLCache
+from app.utils.security import decode_token
+
+settings = get_settings()
+
+# Entries are only invalidated in the process that made the change, so the
+# TTL bounds how long other workers may see a revoked token or stale user.
+token_cache: TTLCache[str, dict[str, Any]] = TTLCache(
+    "auth_tokens", maxsize=settings.auth_cache_size, ttl=settings.auth_cache_ttl_seconds
+)
+user_cache: TTLCache[int, "UserSnapshot"] = TTLCache(
+    "auth_users", maxsize=settings.auth_cache_size, ttl=settings.auth_cache_ttl_seconds
+)
+
+
+@dataclass(frozen=True, slots=True)
+class UserSnapshot:
+    id: int
+    email: str
+    hashed_password: str | None
+    full_name: str
+    role: UserRole
+    is_active: bool
+    google_id: str | None
+    created_at: datetime
+    updated_at: datetime
+
+    @classmethod
+    def from_user(cls, user: User) -> "UserSnapshot":
+        return cls(**{field.name: getattr(user, field.name) for field in fields(cls)})
+
+    def to_user(self) -> User:
+        """Rebuild a detached User that can be merged into a session without a SELECT."""
+        user = User(**{field.name: getattr(self, field.name) for field in fields(self)})
+        make_transient_to_detached(user)
+        return user
+
+
+def cache_token_claims(token: str, claims: dict[str, Any]) -> None:
+    remaining = claims.get("exp", 0) - time.time()
+    if remaining > 0:
+        token_cache.set(token, claims, ttl=min(token_cache.ttl, remaining))
+
+
+def access_claims(token: str) -> dict[str, Any] | None:
+    """The claims of a valid access token, from the cache when it was seen recently."""
+    claims = token_cache.get(token)
+    if claims is None:
+        claims = decode_token(token)
+        if not claims or claims.get("type") != "access":
+            return None
+        cache_token_claims(token, claims)
+    return claims
+
+
+def forget_token(token: str) -> None:
+    token_cache.pop(token)
+
+
+def invalidate_user(user_id: int) -> None:
+    user_cache.pop(user_id)
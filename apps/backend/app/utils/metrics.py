@@ -0,0 +1,154 @@
+import bisect
+from typing import Callable, Iterable
+
+from app.utils.cache import cache_stats
+
+# Prometheus text exposition format 0.0.4
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+REQUEST_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+
+_registry: list["Metric"] = []
+_collectors: list[Callable[[], Iterable[str]]] = []
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Metric:
+    """A named family of series keyed by label values, rendered by ``render``.
+
+    Instances register themselves on creation. Series are updated in place
+    from the event loop thread, so there is no locking.
+    """
+
+    type = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._values: dict[tuple, float] = {}
+        _registry.append(self)
+
+    def samples(self) -> Iterable[str]:
+        for labels, value in self._values.items():
+            yield f"{self.name}{_labels(self.labelnames, labels)} {value}"
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} {self.type}"
+        yield from self.samples()
+
+    def clear(self) -> None:
+        self._values.clear()
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def dec(self, *labels, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) - amount
+
+
+class Histogram(Metric):
+    """Cumulative buckets, sum and count per label set, as Prometheus expects."""
+
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = (), buckets: tuple[float, ...] = REQUEST_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = buckets
+        # Per label set: one count per bucket plus +Inf, then the sum
+        self._series: dict[tuple, list[float]] = {}
+
+    def observe(self, value: float, *labels) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [0] * (len(self.buckets) + 2)
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def samples(self) -> Iterable[str]:
+        for labels, series in self._series.items():
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), series):
+                cumulative += count
+                le = 'le="%s"' % bound
+                yield f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labelnames, labels)} {series[-1]}"
+            yield f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}"
+
+    def clear(self) -> None:
+        self._series.clear()
+
+
+def collector(collect: Callable[[], Iterable[str]]) -> Callable[[], Iterable[str]]:
+    """Register a function that renders metrics read at scrape time, like pool sizes."""
+    _collectors.append(collect)
+    return collect
+
+
+def family(name: str, type: str, help: str, labelnames: tuple[str, ...], values: dict[tuple, float]) -> Iterable[str]:
+    """Render one metric family from values read at scrape time."""
+    yield f"# HELP {name} {help}"
+    yield f"# TYPE {name} {type}"
+    for labels, value in values.items():
+        yield f"{name}{_labels(labelnames, labels)} {value}"
+
+
+@collector
+def _cache_metrics() -> Iterable[str]:
+    stats = cache_stats()
+    yield from family("cache_hits_total", "counter", "Lookups that found a live entry", ("cache",), {(s.name,): s.hits for s in stats})
+    yield from family("cache_misses_total", "counter", "Lookups that found nothing", ("cache",), {(s.name,): s.misses for s in stats})
+    yield from family("cache_hit_ratio", "gauge", "Hits over lookups", ("cache",), {(s.name,): s.hit_ratio for s in stats})
+    yield from family("cache_entries", "gauge", "Entries held", ("cache",), {(s.name,): s.size for s in stats})
+
+
+def render() -> str:
+    lines = [line for metric in _registry for line in metric.render()]
+    for collect in _collectors:
+        lines.extend(collect())
+    return "\n".join(lines) + "\n"
+
+
+def clear_metrics() -> None:
+    for metric in _registry:
+        metric.clear()
+
+
+http_requests = Counter(
+    "http_requests_total", "Requests served", ("method", "route", "status")
+)
+http_request_duration = Histogram(
+    "http_request_duration_seconds", "Time to produce the response", ("method", "route")
+)
+http_requests_in_progress = Gauge(
+    "http_requests_in_progress", "Requests being served", ("method",)
+)
+db_query_duration = Histogram(
+    "db_query_duration_seconds", "Time the database took to execute a statement", ("operation",), QUERY_BUCKETS
+)
+db_checkout_wait = Histogram(
+    "db_pool_checkout_wait_seconds", "Time a transaction waited for a pooled connection", ("engine",), QUERY_BUCKETS
+)
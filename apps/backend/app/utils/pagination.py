@@ -1,5 +1,15 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from decimal import Decimal
+from enum import Enum
 from pydantic import BaseModel
-from typing import Generic, TypeVar, Sequence
+from sqlalchemy import Select, tuple_
+from sqlalchemy.orm import InstrumentedAttribute
+from typing import Any, Generic, TypeVar, Sequence
+
+from app.exceptions import BadRequestException
 
 T = TypeVar("T")
 
@@ -7,22 +17,128 @@ T = TypeVar("T")
 class PaginationParams(BaseModel):
     page: int = 1
     size: int = 20
+    cursor: str | None = None
 
     @property
     def offset(self) -> int:
         return (self.page - 1) * self.size
 
 
+class TotalMode(str, Enum):
+    NONE = "false"
+    EXACT = "exact"
+    ESTIMATE = "estimate"
+
+
 class PaginatedResponse(BaseModel, Generic[T]):
     items: Sequence[T]
-    total: int
+    total: int | None
     page: int
     size: int
-    pages: int
+    pages: int | None
+    has_more: bool
+    next_cursor: str | None = None
+
+    @staticmethod
+    def fields(
+        items: Sequence[T],
+        total: int | None,
+        page: int,
+        size: int,
+        next_cursor: str | None = None,
+        has_more: bool | None = None,
+    ) -> dict[str, Any]:
+        """The page's fields as a plain dict, for responses that skip model validation."""
+        pages = None
+        if total is not None:
+            pages = (total + size - 1) // size if size > 0 else 0
+        if has_more is None:
+            has_more = total is not None and page * size < total
+        return {
+            "items": items, "total": total, "page": page, "size": size, "pages": pages,
+            "has_more": has_more, "next_cursor": next_cursor,
+        }
 
     @classmethod
     def create(
-        cls, items: Sequence[T], total: int, page: int, size: int
+        cls,
+        items: Sequence[T],
+        total: int | None,
+        page: int,
+        size: int,
+        next_cursor: str | None = None,
+        has_more: bool | None = None,
     ) -> "PaginatedResponse[T]":
-        pages = (total + size - 1) // size if size > 0 else 0
-        return cls(items=items, total=total, page=page, size=size, pages=pages)
+        return cls(**cls.fields(items, total, page, size, next_cursor, has_more))
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _decode_value(value: Any, column: InstrumentedAttribute) -> Any:
+    python_type = column.type.python_type
+    if python_type is datetime:
+        return datetime.fromisoformat(value)
+    if python_type is Decimal:
+        return Decimal(value)
+    return python_type(value)
+
+
+def encode_cursor(sort_key: str, value: Any, row_id: int) -> str:
+    payload = json.dumps({"s": sort_key, "v": _encode_value(value), "id": row_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_key: str, column: InstrumentedAttribute) -> tuple[Any, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if payload["s"] != sort_key:
+            raise ValueError("cursor was issued for a different sort order")
+        return _decode_value(payload["v"], column), int(payload["id"])
+    except (binascii.Error, ValueError, KeyError, TypeError, UnicodeDecodeError):
+        raise BadRequestException("Invalid cursor")
+
+
+def paginate(
+    query: Select,
+    sort_column: InstrumentedAttribute,
+    id_column: InstrumentedAttribute,
+    descending: bool,
+    sort_key: str,
+    cursor: str | None = None,
+    offset: int = 0,
+    limit: int = 20,
+) -> Select:
+    """Order by (sort_column, id) and page either by OFFSET or by seeking past a cursor."""
+    if descending:
+        query = query.order_by(sort_column.desc(), id_column.desc())
+    else:
+        query = query.order_by(sort_column.asc(), id_column.asc())
+
+    if cursor:
+        value, row_id = decode_cursor(cursor, sort_key, sort_column)
+        key = tuple_(sort_column, id_column)
+        query = query.where(key < (value, row_id) if descending else key > (value, row_id))
+    else:
+        query = query.offset(offset)
+
+    return query.limit(limit)
+
+
+def split_page(rows: Sequence[T], size: int) -> tuple[list[T], bool]:
+    """Trim a result fetched with ``limit=size + 1`` and report whether more rows exist."""
+    rows = list(rows)
+    return rows[:size], len(rows) > size
+
+
+def next_cursor(items: Sequence[Any], has_more: bool, sort_key: str, sort_attr: str) -> str | None:
+    if not has_more or not items:
+        return None
+    last = items[-1]
+    return encode_cursor(sort_key, getattr(last, sort_attr), last.id)
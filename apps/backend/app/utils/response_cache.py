@@ -0,0 +1,367 @@
+import hashlib
+import json
+import logging
+import time
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Callable, Iterable
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+
+from app.config import get_settings
+from app.utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+CATALOG = "catalog"
+
+# Version names. A cached response records the versions it was built from
+# and is served only while none of them has moved.
+CATEGORIES = "categories"  # category rows, embedded in books
+# Change log of the books whose categories changed, replayed by the category registry
+MEMBERSHIPS = "memberships"
+BOOKS = "books"  # which books a listing holds and in what order, and the facet counts
+STOCK = "stock"  # any stock level, for listings sorted by stock
+RATINGS = "ratings"  # any rating aggregate, for listings sorted by rating
+REVIEWS = "reviews"  # reviewer names, shown on every review list
+# Bumped with every other version, so a response built while a write landed is not stored
+GENERATION = "generation"
+
+
+def book_key(book_id: int) -> str:
+    """Version of one book's own fields, including stock and rating."""
+    return f"book:{book_id}"
+
+
+def reviews_key(book_id: int) -> str:
+    """Version of one book's reviews."""
+    return f"reviews:{book_id}"
+
+
+class CacheBackend:
+    """Storage shared by every worker: cached bodies plus version counters.
+
+    This base class keeps both in process memory. It is the default when no
+    shared backend is configured and stands in for one in tests. Counters
+    start at the time the storage was created, in nanoseconds, so values
+    handed out before a restart, and ETags built from them, never come back.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 300.0):
+        self._entries: TTLCache[str, bytes] = TTLCache("responses_shared", maxsize=maxsize, ttl=ttl)
+        self.epoch = time.time_ns()
+        self._versions: dict[str, int] = {}
+
+    async def get(self, key: str) -> bytes | None:
+        return self._entries.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        self._entries.set(key, value, ttl)
+
+    async def get_versions(self, names: list[str]) -> list[int]:
+        return [self._versions.get(name, self.epoch) for name in names]
+
+    async def bump_versions(self, names: list[str]) -> list[int]:
+        for name in names:
+            self._versions[name] = self._versions.get(name, self.epoch) + 1
+        return [self._versions[name] for name in names]
+
+
+class RedisBackend(CacheBackend):
+    EPOCH = "version:epoch"
+
+    def __init__(self, url: str):
+        import redis.asyncio as redis
+
+        self._redis = redis.from_url(url)
+
+    async def _epoch(self) -> int:
+        """Start of the counters, set by whichever worker first finds redis empty."""
+        await self._redis.set(self.EPOCH, time.time_ns(), nx=True)
+        return int(await self._redis.get(self.EPOCH))
+
+    async def get(self, key: str) -> bytes | None:
+        return await self._redis.get(f"response:{key}")
+
+    async def set(self, key: str, value: bytes, ttl: float) -> None:
+        await self._redis.set(f"response:{key}", value, ex=int(ttl))
+
+    async def get_versions(self, names: list[str]) -> list[int]:
+        epoch, *values = await self._redis.mget([self.EPOCH, *(f"version:{name}" for name in names)])
+        epoch = int(epoch) if epoch is not None else await self._epoch()
+        return [int(value) if value is not None else epoch for value in values]
+
+    async def bump_versions(self, names: list[str]) -> list[int]:
+        epoch = await self._epoch()
+        async with self._redis.pipeline(transaction=False) as pipe:
+            for name in names:
+                pipe.set(f"version:{name}", epoch, nx=True)
+                pipe.incr(f"version:{name}")
+            return (await pipe.execute())[1::2]
+
+
+class ResponseCache:
+    """Caches serialized GET responses together with the versions they depend on.
+
+    Writers bump the versions of what they changed after committing, and an
+    entry is served only while every version it recorded is unchanged, so a
+    write drops just the responses built from what it changed; the TTL only
+    bounds memory. Entries are looked up in a per-process LRU first and then
+    in the backend, which is shared when one is configured.
+    """
+
+    def __init__(self, maxsize: int = 2048, ttl: float = 300.0, backend: CacheBackend | None = None):
+        self.ttl = ttl
+        self.local: TTLCache[str, bytes] = TTLCache("responses", maxsize=maxsize, ttl=ttl)
+        self.backend = backend
+        # As in CacheBackend, so that a restarted worker cannot validate an ETag from before
+        self.epoch = time.time_ns()
+        self._versions: dict[str, int] = {}
+
+    async def versions(self, names: Iterable[str]) -> dict[str, int]:
+        names = list(names)
+        if self.backend:
+            return dict(zip(names, await self.backend.get_versions(names)))
+        return {name: self._versions.get(name, self.epoch) for name in names}
+
+    async def version(self, name: str) -> int:
+        return (await self.versions([name]))[name]
+
+    async def bump(self, *names: str) -> dict[str, int]:
+        """Move the versions and return their new values."""
+        names = [*dict.fromkeys(names), GENERATION]
+        if self.backend:
+            return dict(zip(names, await self.backend.bump_versions(names)))
+        for name in names:
+            self._versions[name] = self._versions.get(name, self.epoch) + 1
+        return {name: self._versions[name] for name in names}
+
+    async def append(self, name: str, value: str, *names: str) -> None:
+        """Bump ``name``, along with ``names``, and keep ``value`` as the entry for its new version.
+
+        The version then counts the entries of a change log that readers
+        replay with ``changes``. Entries live as long as cached responses.
+        """
+        position = (await self.bump(name, *names))[name]
+        await self.set(f"{name}@{position}", value.encode())
+
+    async def changes(self, name: str, start: int, stop: int) -> list[str] | None:
+        """Entries appended to ``name`` after version ``start`` up to ``stop``, or None if any has expired."""
+        values = [await self.get(f"{name}@{position}") for position in range(start + 1, stop + 1)]
+        if None in values:
+            return None
+        return [value.decode() for value in values]
+
+    async def is_current(self, depends: dict[str, int]) -> bool:
+        return await self.versions(depends) == depends
+
+    async def get(self, key: str) -> bytes | None:
+        value = self.local.get(key)
+        if value is None and self.backend:
+            value = await self.backend.get(key)
+            if value is not None:
+                self.local.set(key, value)
+        return value
+
+    async def set(self, key: str, value: bytes) -> None:
+        self.local.set(key, value)
+        if self.backend:
+            await self.backend.set(key, value, self.ttl)
+
+
+def _build_response_cache() -> ResponseCache:
+    backend = None
+    if settings.response_cache_url:
+        try:
+            backend = RedisBackend(settings.response_cache_url)
+        except ImportError:
+            logger.warning("redis is not installed; response cache versions are per process")
+    return ResponseCache(settings.response_cache_size, settings.response_cache_ttl_seconds, backend)
+
+
+response_cache = _build_response_cache()
+
+
+async def invalidate_categories() -> None:
+    """Drop every response showing categories, which includes every book; call after committing a category change."""
+    await response_cache.bump(CATEGORIES)
+
+
+async def invalidate_listings() -> None:
+    """Drop every book listing, e.g. after a book was added."""
+    await response_cache.bump(BOOKS)
+
+
+async def invalidate_book_categories(book_id: int) -> None:
+    """Drop the book's own responses and every listing, and log the change for the category registry."""
+    await response_cache.append(MEMBERSHIPS, str(book_id), BOOKS, book_key(book_id))
+
+
+async def invalidate_book(book_id: int) -> None:
+    """Drop the book's own responses and every listing, since its fields can move it between pages."""
+    await response_cache.bump(BOOKS, book_key(book_id))
+
+
+async def invalidate_stock(book_ids: Iterable[int], availability_changed: bool) -> None:
+    """Drop the responses showing these books' stock.
+
+    ``availability_changed`` means one of them sold out or came back into
+    stock, which also moves in-stock filters and counts, so every listing goes.
+    """
+    await response_cache.bump(STOCK, *map(book_key, book_ids), *([BOOKS] if availability_changed else []))
+
+
+async def invalidate_ratings(book_ids: Iterable[int]) -> None:
+    await response_cache.bump(RATINGS, *map(book_key, book_ids))
+
+
+async def invalidate_reviews(book_id: int) -> None:
+    """Drop the book's review lists and the responses showing its rating."""
+    await response_cache.bump(RATINGS, book_key(book_id), reviews_key(book_id))
+
+
+async def invalidate_reviewer_names() -> None:
+    await response_cache.bump(REVIEWS)
+
+
+def depends_on(request: Request, *names: str) -> None:
+    """Record versions a cacheable response depends on beyond those its route declares."""
+    request.state.cache_depends = [*getattr(request.state, "cache_depends", ()), *names]
+
+
+def cache_response(
+    endpoint: Callable | None = None, *, depends: tuple[str, ...] = (), version_etag: bool = True,
+) -> Callable:
+    """Mark a GET endpoint as cacheable by ``CachedRoute``.
+
+    Only for endpoints whose response depends on nothing but the path, the
+    query string and the versions in ``depends`` plus any the endpoint
+    adds with ``depends_on``. With ``version_etag`` the response's ETag is
+    derived from those versions; otherwise the endpoint sets its own ETag.
+    """
+    def mark(endpoint: Callable) -> Callable:
+        endpoint.cache_response = True
+        endpoint.cache_depends = depends
+        endpoint.version_etag = version_etag
+        return endpoint
+
+    return mark(endpoint) if endpoint else mark
+
+
+def cache_key(request: Request) -> str:
+    query = "&".join(f"{name}={value}" for name, value in sorted(request.query_params.multi_items()))
+    return f"{CATALOG}:{request.url.path}?{query}"
+
+
+def versions_etag(depends: dict[str, int]) -> str:
+    digest = hashlib.blake2b(json.dumps(depends, sort_keys=True).encode(), digest_size=12)
+    return f'"{digest.hexdigest()}"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in candidates or etag in candidates
+
+
+def http_date(value: datetime) -> str:
+    return format_datetime(value.replace(tzinfo=timezone.utc, microsecond=0), usegmt=True)
+
+
+def not_modified(request: Request, etag: str, last_modified: datetime | None = None) -> bool:
+    """Evaluate If-None-Match, or If-Modified-Since when no If-None-Match was sent."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        return etag_matches(if_none_match, etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        return last_modified.replace(tzinfo=timezone.utc, microsecond=0) <= since
+    return False
+
+
+def not_modified_response(headers: dict[str, str]) -> Response:
+    return Response(status_code=304, headers=headers)
+
+
+def _pack(headers: dict[str, str], depends: dict[str, int], body: bytes) -> bytes:
+    return json.dumps({"headers": headers, "depends": depends}).encode() + b"\n" + body
+
+
+def _unpack(entry: bytes) -> tuple[dict[str, str], dict[str, int], bytes]:
+    meta, body = entry.split(b"\n", 1)
+    meta = json.loads(meta)
+    return meta["headers"], meta["depends"], body
+
+
+VALIDATORS = ("etag", "last-modified")
+
+
+def cached_route(cache_control: str | None = None) -> type[APIRoute]:
+    """Route class for a router whose endpoints are marked with ``cache_response``.
+
+    Marked GET endpoints are served from the response cache: a current hit
+    returns the stored body, or a 304 when the client's validators match,
+    before dependencies are resolved, so no session is opened and nothing
+    is re-serialized. Their responses carry ``cache_control`` when given.
+    """
+
+    class CachedRoute(APIRoute):
+        def get_route_handler(self) -> Callable:
+            handler = super().get_route_handler()
+            if not getattr(self.endpoint, "cache_response", False):
+                return handler
+            route_depends = self.endpoint.cache_depends
+            use_version_etag = self.endpoint.version_etag
+            extra_headers = {"Cache-Control": cache_control} if cache_control else {}
+
+            async def cached_handler(request: Request) -> Response:
+                if request.method != "GET":
+                    return await handler(request)
+
+                key = cache_key(request)
+                entry = await response_cache.get(key) if settings.response_cache_enabled else None
+                if entry is not None:
+                    headers, depends, body = _unpack(entry)
+                    if await response_cache.is_current(depends):
+                        headers.update(extra_headers)
+                        last_modified = headers.get("last-modified")
+                        if not_modified(request, headers["etag"], last_modified and parsedate_to_datetime(last_modified)):
+                            return not_modified_response(headers)
+                        return Response(body, media_type="application/json", headers={**headers, "X-Cache": "HIT"})
+
+                generation = await response_cache.version(GENERATION)
+                response = await handler(request)
+                if response.status_code not in (200, 304):
+                    return response
+
+                depends = await response_cache.versions(
+                    [*route_depends, *getattr(request.state, "cache_depends", ()), GENERATION]
+                )
+                # A write that landed while the response was built may be newer than what it shows
+                settled = depends.pop(GENERATION) == generation
+                if use_version_etag and settled:
+                    response.headers["ETag"] = versions_etag(depends)
+                response.headers.update(extra_headers)
+                if response.status_code == 304:
+                    return response
+
+                validators = {name: response.headers[name] for name in VALIDATORS if name in response.headers}
+                body = getattr(response, "body", None)
+                if settings.response_cache_enabled and settled and body is not None and "etag" in validators:
+                    await response_cache.set(key, _pack(validators, depends, bytes(body)))
+                    response.headers["X-Cache"] = "MISS"
+                if use_version_etag and "etag" in validators and not_modified(request, validators["etag"]):
+                    return not_modified_response({**validators, **extra_headers})
+                return response
+
+            return cached_handler
+
+    return CachedRoute
@@ -0,0 +1,45 @@
+from datetime import datetime
+from typing import Iterable
+
+
+class RevocationList:
+    """In-memory mirror of ``token_blacklist``: revoked token ids and when they expire.
+
+    Entries are dropped once the token expires, so the set only ever holds
+    tokens that could still be presented. Until ``load`` has run, callers
+    must fall back to the database.
+    """
+
+    def __init__(self):
+        self._expires: dict[str, datetime] = {}
+        self.loaded = False
+        self.synced_at: datetime | None = None
+
+    def add(self, jti: str, expires_at: datetime) -> None:
+        self._expires[jti] = expires_at
+
+    def load(self, entries: Iterable[tuple[str, datetime]], synced_at: datetime) -> None:
+        for jti, expires_at in entries:
+            self._expires[jti] = expires_at
+        self.synced_at = synced_at
+        self.loaded = True
+
+    def prune(self, now: datetime) -> int:
+        expired = [jti for jti, expires_at in self._expires.items() if expires_at <= now]
+        for jti in expired:
+            del self._expires[jti]
+        return len(expired)
+
+    def reset(self) -> None:
+        self._expires.clear()
+        self.loaded = False
+        self.synced_at = None
+
+    def __contains__(self, jti: str) -> bool:
+        return jti in self._expires
+
+    def __len__(self) -> int:
+        return len(self._expires)
+
+
+revocations = RevocationList()
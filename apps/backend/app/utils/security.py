@@ -1,14 +1,22 @@
+import asyncio
+import hashlib
+import os
+import uuid
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Any
+from typing import Any, Callable, TypeVar
 
 from jose import jwt, JWTError
 from passlib.context import CryptContext
 
 from app.config import get_settings
+from app.exceptions import ServiceUnavailableException
 
 settings = get_settings()
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+T = TypeVar("T")
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
@@ -18,13 +26,65 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+class PasswordHasher:
+    """Runs bcrypt in a worker pool so it does not block the event loop.
+
+    At most ``max_pending`` calls may be queued or running; beyond that callers
+    get a 503 instead of piling up behind a login storm.
+    """
+
+    def __init__(self, workers: int, max_pending: int, executor: str = "thread"):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.executor_type = executor
+        self.pending = 0
+        self._executor: Executor | None = None
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_type == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        return self._executor
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        if self.pending >= self.max_pending:
+            raise ServiceUnavailableException("Too many authentication requests, please retry")
+        self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._get_executor(), func, *args)
+        finally:
+            self.pending -= 1
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    workers=settings.password_hash_workers or max((os.cpu_count() or 1) - 1, 1),
+    max_pending=settings.password_hash_max_pending,
+    executor=settings.password_hash_executor,
+)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await password_hasher.run(verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    return await password_hasher.run(get_password_hash, password)
+
+
 def create_access_token(subject: int, expires_delta: timedelta | None = None) -> str:
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.access_token_expire_minutes)
 
-    to_encode = {"sub": str(subject), "exp": expire, "type": "access"}
+    to_encode = {"sub": str(subject), "exp": expire, "type": "access", "jti": uuid.uuid4().hex}
     return jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
 
 
@@ -34,7 +94,7 @@ def create_refresh_token(subject: int, expires_delta: timedelta | None = None) -
     else:
         expire = datetime.utcnow() + timedelta(days=settings.refresh_token_expire_days)
 
-    to_encode = {"sub": str(subject), "exp": expire, "type": "refresh"}
+    to_encode = {"sub": str(subject), "exp": expire, "type": "refresh", "jti": uuid.uuid4().hex}
     return jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
 
 
@@ -44,3 +104,8 @@ def decode_token(token: str) -> dict[str, Any] | None:
         return payload
     except JWTError:
         return None
+
+
+def token_identifier(token: str, payload: dict[str, Any]) -> str:
+    """Revocation key of a token: its jti, or a digest for tokens issued before jti existed."""
+    return payload.get("jti") or hashlib.sha256(token.encode()).hexdigest()
@@ -0,0 +1,29 @@
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+
+def _default(value: Any) -> Any:
+    # Pydantic writes Decimals as strings; match it so both paths produce the same JSON
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Serialize plain dicts, lists, datetimes, Decimals and str enums the way the response models would."""
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class FastJSONResponse(JSONResponse):
+    """A JSON response rendered by orjson from content that is already shaped like the response model.
+
+    FastAPI passes a returned Response through untouched, so the endpoint's
+    ``response_model`` is neither validated nor used to serialize; callers
+    are responsible for producing exactly the documented fields.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,334 @@
+"""Drive the API with concurrent virtual users and gate on latency regressions.
+
+Each virtual user repeatedly runs a scenario picked from the profile's mix:
+anonymous browsing and search, logins, adding to the cart, checkout, or an
+admin polling the dashboard. Latencies are recorded per route template and
+reported as throughput and p50/p95/p99.
+
+By default the app runs in-process on a throwaway SQLite database filled by
+seeds/generate_data.py. With --url the harness drives a running server
+instead, whose database must have been filled by the same generator (its
+users are user{n}@example.com with password123, user1 being the admin).
+
+Results can be written as JSON and compared against an earlier run: a route
+whose p95 grew, or whose throughput fell, by more than --tolerance fails the
+run with exit status 1.
+
+Usage:
+    python benchmarks/http_load.py --profile mixed --users 20 --duration 30 --output run.json
+    python benchmarks/http_load.py --profile browse --baseline run.json --tolerance 0.15
+    python benchmarks/http_load.py --url http://localhost:8000 --profile checkout --users 50
+"""
+import argparse
+import asyncio
+import json
+import logging
+import math
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from httpx import ASGITransport, AsyncClient, Limits
+
+PASSWORD = "password123"
+SEARCH_TERMS = ["river", "garden", "winter shadow", "golden", "lantern", "storm"]
+SORTS = ["created_at", "price", "rating", "title"]
+
+# Scenario weights of each profile
+PROFILES = {
+    "browse": {"browse": 1},
+    "login": {"login": 1},
+    "cart": {"cart": 1},
+    "checkout": {"checkout": 1},
+    "admin": {"admin": 1},
+    "mixed": {"browse": 70, "login": 5, "cart": 12, "checkout": 5, "admin": 3},
+}
+
+
+class Recorder:
+    """Latencies and error counts per route label, kept only once warm-up is over."""
+
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+        self.recording = False
+
+    async def call(self, client: AsyncClient, method: str, label: str, url: str, **kwargs):
+        start = time.perf_counter()
+        response = await client.request(method, url, **kwargs)
+        elapsed = (time.perf_counter() - start) * 1000
+        if self.recording:
+            self.latencies[label].append(elapsed)
+            if response.status_code >= 400:
+                self.errors[label] += 1
+        return response
+
+
+def percentile(ordered: list[float], q: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    return ordered[max(math.ceil(q * len(ordered)) - 1, 0)]
+
+
+def summarize(latencies: list[float], errors: int, seconds: float) -> dict:
+    ordered = sorted(latencies)
+    return {
+        "requests": len(ordered),
+        "errors": errors,
+        "rps": round(len(ordered) / seconds, 2),
+        "p50_ms": round(percentile(ordered, 0.50), 2),
+        "p95_ms": round(percentile(ordered, 0.95), 2),
+        "p99_ms": round(percentile(ordered, 0.99), 2),
+    }
+
+
+class VirtualUser:
+    def __init__(self, client: AsyncClient, recorder: Recorder, rng: random.Random, books: int, users: int):
+        self.client = client
+        self.recorder = recorder
+        self.rng = rng
+        self.books = books
+        self.users = users
+        self.user_id = rng.randint(2, users)
+        self.headers: dict[str, str] = {}
+
+    async def login(self, user_id: int, label: str = "POST /auth/login") -> dict[str, str]:
+        response = await self.recorder.call(
+            self.client, "POST", label, "/auth/login",
+            json={"email": f"user{user_id}@example.com", "password": PASSWORD},
+        )
+        response.raise_for_status()
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    def book_id(self) -> int:
+        # Skew towards a popular head without knowing the generator's popularity ranks
+        return min(int(self.rng.paretovariate(1.2)), self.books) if self.rng.random() < 0.8 else self.rng.randint(1, self.books)
+
+    async def browse(self) -> None:
+        call, rng = self.recorder.call, self.rng
+        sort = rng.choice(SORTS)
+        await call(self.client, "GET", "GET /books", f"/books?sort_by={sort}&page={rng.randint(1, 5)}&size=20")
+        if rng.random() < 0.3:
+            await call(self.client, "GET", "GET /books?search", f"/books?search={rng.choice(SEARCH_TERMS)}&size=20")
+        if rng.random() < 0.2:
+            await call(self.client, "GET", "GET /categories", "/categories")
+        book_id = self.book_id()
+        await call(self.client, "GET", "GET /books/{id}", f"/books/{book_id}")
+        await call(self.client, "GET", "GET /books/{id}/reviews", f"/books/{book_id}/reviews?size=10")
+        if rng.random() < 0.5:
+            await call(self.client, "GET", "GET /books/{id}/recommendations", f"/books/{book_id}/recommendations")
+
+    async def login_storm(self) -> None:
+        await self.login(self.rng.randint(2, self.users))
+
+    async def ensure_login(self) -> None:
+        if not self.headers:
+            self.headers = await self.login(self.user_id, label="POST /auth/login (session)")
+
+    async def cart(self) -> None:
+        await self.ensure_login()
+        call = self.recorder.call
+        response = await call(
+            self.client, "POST", "POST /cart/items", "/cart/items",
+            json={"book_id": self.book_id(), "quantity": 1}, headers=self.headers,
+        )
+        cart = await call(self.client, "GET", "GET /cart", "/cart", headers=self.headers)
+        # Keep carts small so later iterations measure the same work
+        if response.status_code < 400 and len(cart.json().get("items", [])) > 5:
+            await call(self.client, "DELETE", "DELETE /cart", "/cart", headers=self.headers)
+
+    async def checkout(self) -> None:
+        await self.ensure_login()
+        call = self.recorder.call
+        await call(self.client, "DELETE", "DELETE /cart", "/cart", headers=self.headers)
+        for _ in range(self.rng.randint(1, 2)):
+            # Any book, so that stock of the popular ones lasts the run
+            await call(
+                self.client, "POST", "POST /cart/items", "/cart/items",
+                json={"book_id": self.rng.randint(1, self.books), "quantity": 1}, headers=self.headers,
+            )
+        response = await call(
+            self.client, "POST", "POST /orders", "/orders",
+            json={"shipping_address": "1 Benchmark Road, Testville"}, headers=self.headers,
+        )
+        if response.status_code < 400:
+            await call(
+                self.client, "POST", "POST /payments/checkout", "/payments/checkout",
+                json={"order_id": response.json()["id"]}, headers=self.headers,
+            )
+
+    async def admin(self) -> None:
+        if not self.headers:
+            self.headers = await self.login(1, label="POST /auth/login (session)")
+        call = self.recorder.call
+        await call(self.client, "GET", "GET /admin/analytics", "/admin/analytics", headers=self.headers)
+        await call(self.client, "GET", "GET /admin/orders", "/admin/orders?size=20&include_total=false", headers=self.headers)
+        await call(self.client, "GET", "GET /admin/reviews/pending", "/admin/reviews/pending?size=20", headers=self.headers)
+
+    async def run(self, mix: dict[str, int], stop: asyncio.Event) -> None:
+        scenarios = {
+            "browse": self.browse, "login": self.login_storm, "cart": self.cart,
+            "checkout": self.checkout, "admin": self.admin,
+        }
+        # Admins only ever poll the dashboard, so a share of the users are admins
+        names = [name for name in mix if name != "admin"]
+        if "admin" in mix and (not names or self.rng.random() < mix["admin"] / sum(mix.values())):
+            names = ["admin"]
+        weights = [mix[name] for name in names]
+        while not stop.is_set():
+            await scenarios[self.rng.choices(names, weights)[0]]()
+
+
+@asynccontextmanager
+async def in_process_client(args: argparse.Namespace):
+    """The app on its own SQLite database, filled by the synthetic generator."""
+    tmp = tempfile.TemporaryDirectory()
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite+aiosqlite:///{tmp.name}/load.db"
+
+    from sqlalchemy import func, select
+
+    from app.database import AsyncSessionLocal, Base, engine
+    from app.main import app
+    from app.models.book import Book
+    from seeds.generate_data import Generator, Volumes, load
+
+    # The app logs every request at INFO
+    logging.getLogger().setLevel(logging.WARNING)
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncSessionLocal() as session:
+        existing = (await session.execute(select(func.count(Book.id)))).scalar()
+    if not existing:
+        print(f"Generating {args.books} books and {args.accounts} users...")
+        volumes = Volumes(20, args.books, args.accounts, args.books * 2, args.books * 3, args.accounts)
+        async with engine.begin() as conn:
+            await load(conn, Generator(volumes, seed=args.seed, zipf_s=1.1), batch_size=10_000)
+
+    async with app.router.lifespan_context(app):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://load") as client:
+            yield client
+    await engine.dispose()
+    tmp.cleanup()
+
+
+@asynccontextmanager
+async def remote_client(args: argparse.Namespace):
+    limits = Limits(max_connections=args.users, max_keepalive_connections=args.users)
+    async with AsyncClient(base_url=args.url, limits=limits, timeout=30) as client:
+        yield client
+
+
+async def run(args: argparse.Namespace) -> dict:
+    recorder = Recorder()
+    client_context = remote_client(args) if args.url else in_process_client(args)
+    async with client_context as client:
+        stop = asyncio.Event()
+        users = [
+            VirtualUser(client, recorder, random.Random(f"{args.seed}:{n}"), args.books, args.accounts)
+            for n in range(args.users)
+        ]
+        tasks = [asyncio.create_task(user.run(PROFILES[args.profile], stop)) for user in users]
+        await asyncio.sleep(args.warmup)
+        recorder.recording = True
+        started = time.perf_counter()
+        await asyncio.sleep(args.duration)
+        recorder.recording = False
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    all_latencies = [latency for latencies in recorder.latencies.values() for latency in latencies]
+    return {
+        "meta": {
+            "profile": args.profile,
+            "users": args.users,
+            "duration_s": args.duration,
+            "target": args.url or "in-process",
+            "commit": git_commit(),
+            "recorded_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        },
+        "total": summarize(all_latencies, sum(recorder.errors.values()), elapsed) if all_latencies else {},
+        "routes": {
+            label: summarize(latencies, recorder.errors[label], elapsed)
+            for label, latencies in sorted(recorder.latencies.items())
+        },
+    }
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(result: dict, baseline: dict, tolerance: float, min_requests: int) -> list[str]:
+    """Regressions of each route present in both runs: p95 up or throughput down by more than ``tolerance``.
+
+    Routes with fewer than ``min_requests`` samples in either run are too noisy to judge.
+    """
+    regressions = []
+    for label, current in result["routes"].items():
+        before = baseline["routes"].get(label)
+        if not before or min(before["requests"], current["requests"]) < min_requests:
+            continue
+        if current["p95_ms"] > before["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{label}: p95 {before['p95_ms']}ms -> {current['p95_ms']}ms")
+        if current["rps"] < before["rps"] * (1 - tolerance):
+            regressions.append(f"{label}: throughput {before['rps']}/s -> {current['rps']}/s")
+    return regressions
+
+
+def report(result: dict) -> None:
+    print(f"\n{'route':<36} {'req':>7} {'err':>5} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for label, stats in [*result["routes"].items(), ("total", result["total"])]:
+        if stats:
+            print(
+                f"{label:<36} {stats['requests']:>7} {stats['errors']:>5} {stats['rps']:>8.1f} "
+                f"{stats['p50_ms']:>8.2f} {stats['p95_ms']:>8.2f} {stats['p99_ms']:>8.2f}"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--profile", choices=PROFILES, default="mixed")
+    parser.add_argument("--users", type=int, default=10, help="concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=20, help="seconds recorded")
+    parser.add_argument("--warmup", type=float, default=3, help="seconds run before recording")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--url", help="base URL of a running server instead of the in-process app")
+    parser.add_argument("--database-url", help="in-process only: use this database instead of a throwaway one")
+    parser.add_argument("--books", type=int, default=5000, help="books in the generated catalog")
+    parser.add_argument("--accounts", type=int, default=500, help="users in the generated catalog")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--baseline", help="JSON results of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed relative regression")
+    parser.add_argument("--min-requests", type=int, default=20, help="routes with fewer samples are not compared")
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+    report(result)
+    if args.output:
+        Path(args.output).write_text(json.dumps(result, indent=2) + "\n")
+    if args.baseline:
+        regressions = compare(result, json.loads(Path(args.baseline).read_text()), args.tolerance, args.min_requests)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print(f"\nNo route regressed by more than {args.tolerance:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
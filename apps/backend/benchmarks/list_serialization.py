@@ -0,0 +1,133 @@
+"""Compare CPU per 100-item page of the orjson list path against response-model validation.
+
+Runs the app in-process with the response cache off and requests full pages
+of books, a user's orders and a book's reviews in both modes.
+
+Usage:
+    python benchmarks/list_serialization.py --requests 200
+"""
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+_tmp = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_tmp.name}/lists.db"
+os.environ["RESPONSE_CACHE_ENABLED"] = "false"
+
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import insert, select
+
+from app.config import get_settings
+from app.database import AsyncSessionLocal, create_tables
+from app.main import app
+from app.models.book import Book, book_categories
+from app.models.category import Category
+from app.models.order import Order, OrderItem, OrderStatus
+from app.models.review import Review
+from app.models.user import User
+from app.utils.security import create_access_token
+
+PAGE = 100
+
+
+async def populate() -> tuple[int, int]:
+    """500 books in five categories, 200 orders of three items for one user and 150 reviews of one book."""
+    await create_tables()
+    async with AsyncSessionLocal() as session:
+        session.add_all(Category(name=f"Category {i}") for i in range(5))
+        await session.execute(insert(User), [
+            {"email": f"reader{i}@example.com", "full_name": f"Reader {i}"} for i in range(150)
+        ])
+        await session.execute(insert(Book), [
+            {
+                "title": f"Book {i}",
+                "author": f"Author {i % 50}",
+                "description": "A long description. " * 50,
+                "isbn": f"{9780000000000 + i}",
+                "price": Decimal("9.99") + i,
+                "stock_quantity": i % 7,
+            }
+            for i in range(500)
+        ])
+        await session.flush()
+        book_ids = (await session.execute(select(Book.id).order_by(Book.id))).scalars().all()
+        category_ids = (await session.execute(select(Category.id))).scalars().all()
+        user_ids = (await session.execute(select(User.id).order_by(User.id))).scalars().all()
+        await session.execute(insert(book_categories), [
+            {"book_id": book_id, "category_id": category_ids[i % len(category_ids)]}
+            for i, book_id in enumerate(book_ids)
+        ])
+
+        now = datetime.utcnow()
+        for i in range(200):
+            order = Order(
+                user_id=user_ids[0], total_amount=Decimal("29.97"), shipping_address="1 Benchmark Road",
+                status=OrderStatus.PAID, created_at=now - timedelta(hours=i),
+            )
+            order.items = [
+                OrderItem(book_id=book_ids[(i + j) % len(book_ids)], quantity=1, price_at_purchase=Decimal("9.99"))
+                for j in range(3)
+            ]
+            session.add(order)
+        await session.execute(insert(Review), [
+            {"user_id": user_id, "book_id": book_ids[0], "rating": 1 + i % 5, "comment": "Worth reading. " * 10}
+            for i, user_id in enumerate(user_ids)
+        ])
+        await session.commit()
+        return user_ids[0], book_ids[0]
+
+
+async def measure(client: AsyncClient, url: str, headers: dict, requests: int) -> tuple[float, float]:
+    """Median CPU and wall milliseconds per request."""
+    cpu, wall = [], []
+    for _ in range(requests):
+        cpu_start, wall_start = time.process_time(), time.perf_counter()
+        response = await client.get(url, headers=headers)
+        response.raise_for_status()
+        cpu.append((time.process_time() - cpu_start) * 1000)
+        wall.append((time.perf_counter() - wall_start) * 1000)
+    return statistics.median(cpu), statistics.median(wall)
+
+
+async def main(requests: int) -> None:
+    user_id, book_id = await populate()
+    headers = {"Authorization": f"Bearer {create_access_token(user_id)}"}
+    settings = get_settings()
+    endpoints = {
+        "GET /books": f"/books?size={PAGE}&include_total=false",
+        "GET /orders": f"/orders?size={PAGE}&include_total=false",
+        "GET /books/{id}/reviews": f"/books/{book_id}/reviews?size={PAGE}&include_total=false",
+    }
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://bench") as client:
+        for name, url in endpoints.items():
+            results = {}
+            for fast in (False, True):
+                settings.fast_list_responses = fast
+                await measure(client, url, headers, 5)
+                results[fast] = await measure(client, url, headers, requests)
+            (slow_cpu, slow_wall), (fast_cpu, fast_wall) = results[False], results[True]
+            print(
+                f"{name:<24} validated cpu={slow_cpu:7.2f}ms wall={slow_wall:7.2f}ms  "
+                f"orjson cpu={fast_cpu:7.2f}ms wall={fast_wall:7.2f}ms  "
+                f"cpu -{(1 - fast_cpu / slow_cpu) * 100:4.1f}%"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=100)
+    args = parser.parse_args()
+    # The app logs every request at INFO
+    logging.getLogger().setLevel(logging.WARNING)
+    asyncio.run(main(args.requests))
@@ -0,0 +1,127 @@
+"""Measure catalog latency while a burst of logins runs bcrypt on the same worker.
+
+Runs the app in-process (one event loop, like a single uvicorn worker) and
+compares bcrypt called inline on the loop against the worker pool.
+
+Usage:
+    python benchmarks/login_storm.py --logins 200 --concurrency 20
+"""
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+_tmp = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_tmp.name}/storm.db"
+
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import insert
+
+from app.database import AsyncSessionLocal, create_tables
+from app.main import app
+from app.models.book import Book
+from app.models.user import User
+from app.services import auth as auth_service
+from app.utils.security import get_password_hash, password_hasher, verify_password, verify_password_async
+
+EMAIL = "storm@example.com"
+PASSWORD = "password123"
+
+
+async def verify_inline(plain_password: str, hashed_password: str) -> bool:
+    return verify_password(plain_password, hashed_password)
+
+
+async def populate() -> None:
+    await create_tables()
+    async with AsyncSessionLocal() as session:
+        session.add(User(email=EMAIL, hashed_password=get_password_hash(PASSWORD), full_name="Storm"))
+        await session.execute(insert(Book), [
+            {
+                "title": f"Book {i}",
+                "author": f"Author {i % 50}",
+                "isbn": f"{9780000000000 + i}",
+                "price": Decimal("9.99"),
+                "stock_quantity": 10,
+            }
+            for i in range(500)
+        ])
+        await session.commit()
+
+
+async def sample_catalog(client: AsyncClient, stop: asyncio.Event) -> list[float]:
+    timings = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        response = await client.get("/books?size=20&include_total=false")
+        response.raise_for_status()
+        timings.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(0.005)
+    return timings
+
+
+async def login_storm(client: AsyncClient, logins: int, concurrency: int) -> dict[int, int]:
+    statuses: dict[int, int] = {}
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def login() -> None:
+        async with semaphore:
+            response = await client.post("/auth/login", json={"email": EMAIL, "password": PASSWORD})
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    await asyncio.gather(*(login() for _ in range(logins)))
+    return statuses
+
+
+async def run_scenario(client: AsyncClient, name: str, logins: int, concurrency: int) -> None:
+    stop = asyncio.Event()
+    sampler = asyncio.create_task(sample_catalog(client, stop))
+    start = time.perf_counter()
+    if logins:
+        statuses = await login_storm(client, logins, concurrency)
+    else:
+        await asyncio.sleep(2)
+        statuses = {}
+    elapsed = time.perf_counter() - start
+    stop.set()
+    timings = sorted(await sampler)
+
+    p99 = timings[max(int(len(timings) * 0.99) - 1, 0)]
+    print(
+        f"{name:<28} catalog n={len(timings):<5} p50={statistics.median(timings):8.2f}ms "
+        f"p99={p99:8.2f}ms max={timings[-1]:8.2f}ms  logins={statuses} in {elapsed:.1f}s"
+    )
+
+
+async def main(logins: int, concurrency: int, executor: str) -> None:
+    password_hasher.executor_type = executor
+    await populate()
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://bench") as client:
+        await run_scenario(client, "catalog only", 0, concurrency)
+
+        auth_service.verify_password_async = verify_inline
+        await run_scenario(client, "storm, bcrypt inline", logins, concurrency)
+
+        auth_service.verify_password_async = verify_password_async
+        await run_scenario(client, f"storm, bcrypt {executor} pool", logins, concurrency)
+    password_hasher.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--executor", choices=["thread", "process"], default="thread")
+    args = parser.parse_args()
+    # The app logs every request at INFO
+    logging.getLogger().setLevel(logging.WARNING)
+    asyncio.run(main(args.logins, args.concurrency, args.executor))
@@ -0,0 +1,115 @@
+"""Compare catalog search latency of the ILIKE path against the full-text backend.
+
+Usage:
+    python benchmarks/search_benchmark.py --books 100000 --queries 200
+"""
+import argparse
+import asyncio
+import itertools
+import random
+import statistics
+import sys
+import tempfile
+import time
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+
+from app.database import Base
+from app.models.book import Book
+from app.repositories.book import BookRepository
+from app.repositories.search import SearchBackend, get_search_backend
+
+SYLLABLES = "ka lo mi ra ten vo sha del in or um bre gal fi nu tor es wy".split()
+
+
+def build_vocabulary(rng: random.Random, size: int) -> list[str]:
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+def random_text(rng: random.Random, vocabulary: list[str], weights: list[float], words: int) -> str:
+    return " ".join(rng.choices(vocabulary, cum_weights=weights, k=words))
+
+
+async def populate(
+    session: AsyncSession, count: int, rng: random.Random, vocabulary: list[str], weights: list[float]
+) -> None:
+    batch = []
+    for i in range(count):
+        batch.append({
+            "title": random_text(rng, vocabulary, weights, 3).title(),
+            "author": random_text(rng, vocabulary, weights, 2).title(),
+            "description": random_text(rng, vocabulary, weights, 40),
+            "isbn": f"{9780000000000 + i}",
+            "price": Decimal(rng.randint(500, 5000)) / 100,
+            "stock_quantity": rng.randint(0, 50),
+        })
+        if len(batch) == 5000:
+            await session.execute(insert(Book), batch)
+            batch = []
+    if batch:
+        await session.execute(insert(Book), batch)
+    await session.commit()
+
+
+async def run_queries(
+    session: AsyncSession, backend: SearchBackend, terms: list[str], sort_by: str
+) -> list[float]:
+    repo = BookRepository(session, search_backend=backend)
+    timings = []
+    for term in terms:
+        start = time.perf_counter()
+        await repo.search(search=term, sort_by=sort_by, limit=20)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def report(name: str, timings: list[float]) -> None:
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(
+        f"{name:<28} mean={statistics.mean(timings):8.2f}ms "
+        f"p50={statistics.median(timings):8.2f}ms p95={p95:8.2f}ms"
+    )
+
+
+async def main(books: int, queries: int, seed: int) -> None:
+    rng = random.Random(seed)
+    vocabulary = build_vocabulary(rng, 20000)
+    weights = list(itertools.accumulate(1 / rank for rank in range(1, len(vocabulary) + 1)))
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp}/search.db")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+        session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        async with session_factory() as session:
+            print(f"Inserting {books} books...")
+            await populate(session, books, rng, vocabulary, weights)
+
+            # Mid-frequency words: selective enough to be realistic catalog searches
+            terms = [rng.choice(vocabulary[50:2000]) for _ in range(queries)]
+            fulltext = get_search_backend(engine.dialect.name)
+            await run_queries(session, fulltext, terms[:5], "created_at")
+
+            report("ilike", await run_queries(session, SearchBackend(), terms, "created_at"))
+            report(fulltext.name, await run_queries(session, fulltext, terms, "created_at"))
+            report(f"{fulltext.name} (relevance)", await run_queries(session, fulltext, terms, "relevance"))
+
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--books", type=int, default=50000)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    asyncio.run(main(args.books, args.queries, args.seed))
@@ -0,0 +1,137 @@
+"""Compare mixed read/write throughput on SQLite before and after the production profile.
+
+"default" is one engine with the driver's defaults (rollback journal, a new
+connection per session); "tuned" is the WAL profile with a single writer
+connection and a pool of read-only connections (see app/database.py).
+
+Usage:
+    python benchmarks/sqlite_mixed_load.py --books 20000 --readers 8 --writers 2 --seconds 10
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import tempfile
+import time
+from decimal import Decimal
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import insert, update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.config import Settings
+from app.database import Base, create_engines, session_factory
+from app.models.book import Book
+from app.repositories.book import BookRepository
+
+SORTS = ("created_at", "price", "title", "rating")
+
+
+async def populate(sessions: async_sessionmaker, books: int) -> None:
+    async with sessions() as session:
+        for start in range(0, books, 5000):
+            await session.execute(insert(Book), [
+                {
+                    "title": f"Book {i}",
+                    "author": f"Author {i % 500}",
+                    "description": "Description text. " * 20,
+                    "isbn": f"{9780000000000 + i}",
+                    "price": Decimal(500 + i % 4500) / 100,
+                    "stock_quantity": i % 40,
+                }
+                for i in range(start, min(start + 5000, books))
+            ])
+        await session.commit()
+
+
+class Stats:
+    def __init__(self):
+        self.latencies: list[float] = []
+        self.errors = 0
+
+    def summary(self, seconds: float) -> str:
+        if not self.latencies:
+            return f"ops/s=     0  errors={self.errors}"
+        ordered = sorted(self.latencies)
+        p99 = ordered[max(int(len(ordered) * 0.99) - 1, 0)]
+        return (
+            f"ops/s={len(ordered) / seconds:6.0f}  p50={statistics.median(ordered):7.2f}ms  "
+            f"p99={p99:8.2f}ms  errors={self.errors}"
+        )
+
+
+async def reader(sessions: async_sessionmaker, stop: asyncio.Event, stats: Stats, rng: random.Random) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        try:
+            async with sessions() as session:
+                await BookRepository(session).search(
+                    sort_by=rng.choice(SORTS), offset=rng.randint(0, 500), limit=20
+                )
+            stats.latencies.append((time.perf_counter() - start) * 1000)
+        except OperationalError:
+            stats.errors += 1
+
+
+async def writer(
+    sessions: async_sessionmaker, stop: asyncio.Event, stats: Stats, rng: random.Random, books: int
+) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        try:
+            async with sessions() as session:
+                await session.execute(
+                    update(Book)
+                    .where(Book.id == rng.randint(1, books))
+                    .values(stock_quantity=Book.stock_quantity + 1)
+                )
+                await session.commit()
+            stats.latencies.append((time.perf_counter() - start) * 1000)
+        except OperationalError:
+            stats.errors += 1
+
+
+async def run(name: str, sessions: async_sessionmaker, args: argparse.Namespace) -> None:
+    stop = asyncio.Event()
+    reads, writes = Stats(), Stats()
+    tasks = [
+        asyncio.create_task(reader(sessions, stop, reads, random.Random(i))) for i in range(args.readers)
+    ] + [
+        asyncio.create_task(writer(sessions, stop, writes, random.Random(100 + i), args.books))
+        for i in range(args.writers)
+    ]
+    await asyncio.sleep(args.seconds)
+    stop.set()
+    await asyncio.gather(*tasks)
+    print(f"{name:<8} reads  {reads.summary(args.seconds)}")
+    print(f"{name:<8} writes {writes.summary(args.seconds)}")
+
+
+async def main(args: argparse.Namespace) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite+aiosqlite:///{tmp}/mixed.db"
+        engine = create_async_engine(url, connect_args={"check_same_thread": False})
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        sessions = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        await populate(sessions, args.books)
+        await run("default", sessions, args)
+        await engine.dispose()
+
+        write_engine, read_engine = create_engines(Settings(database_url=url))
+        await run("tuned", session_factory(write_engine, read_engine), args)
+        await write_engine.dispose()
+        await read_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--books", type=int, default=20000)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=10)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,382 @@
+"""Generate a large synthetic catalog for benchmarking, deterministically from a seed.
+
+Books, users, orders, reviews and carts are generated as streams of rows
+and written in batches: COPY on PostgreSQL, executemany on SQLite. Book
+popularity follows a Zipf law, so a few books appear in most orders,
+reviews and carts, as in a real store. Rating aggregates on books are
+computed from the generated reviews, so they agree with
+seeds/rebuild_ratings.py.
+
+The same seed and volumes always produce the same rows, except that cart
+timestamps follow the time of the load so that carts are live. With --snapshot
+the loaded database is copied to a file (VACUUM INTO on SQLite, pg_dump
+custom format on PostgreSQL) that benchmark runs can restore from.
+
+Usage:
+    python seeds/generate_data.py --books 1000000 --users 200000 --orders 5000000 \\
+        --database-url sqlite+aiosqlite:///./bench.db --snapshot bench-snapshot.db
+"""
+import argparse
+import asyncio
+import itertools
+import random
+import subprocess
+import sys
+import time
+from array import array
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from decimal import Decimal
+from enum import Enum
+from pathlib import Path
+from typing import Iterable, Iterator, Sequence
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import Table, func, insert, select, text
+from sqlalchemy.ext.asyncio import AsyncConnection, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.config import get_settings
+from app.database import Base
+from app.models.book import Book, book_categories
+from app.models.cart import CartItem
+from app.models.category import Category
+from app.models.order import Order, OrderItem, OrderStatus, OrderStatusHistory
+from app.models.review import Review
+from app.models.user import User, UserRole
+from app.repositories.review import average_rating
+from app.utils.security import pwd_context
+
+# Every generated user signs in with this password
+PASSWORD = "password123"
+BCRYPT_SALT_ALPHABET = "./ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789"
+
+WORDS = (
+    "night river garden silent empire glass winter shadow golden city ocean last secret "
+    "broken paper fire stone summer iron hidden lost wild northern song house letters "
+    "tide clock forest mirror storm bridge orchard lantern harbor crown salt echo"
+).split()
+FIRST_NAMES = "Ada Ben Chloe Dev Elena Farid Grace Hugo Ines Jonas Kira Liam Maya Nico Omar Priya Quinn Rosa Sami Tara".split()
+LAST_NAMES = "Okafor Lindqvist Moreau Tanaka Silva Novak Haddad Brennan Kowalski Adeyemi Fischer Romero Chen Patel".split()
+STATUSES = [OrderStatus.PENDING, OrderStatus.PAID, OrderStatus.SHIPPED, OrderStatus.COMPLETED, OrderStatus.CANCELLED]
+STATUS_WEIGHTS = [5, 15, 15, 60, 5]
+
+# Generated timestamps fall in the three years before this instant
+EPOCH = datetime(2026, 1, 1)
+SPAN_SECONDS = 3 * 365 * 24 * 3600
+
+
+@dataclass
+class Volumes:
+    categories: int
+    books: int
+    users: int
+    orders: int
+    reviews: int
+    carts: int
+
+
+class Zipf:
+    """Draws ids 1..n where the k-th most popular is drawn with weight 1 / k**s.
+
+    Popularity ranks are shuffled over the ids, so popular rows are spread
+    across the table rather than clustered at its start.
+    """
+
+    def __init__(self, n: int, s: float, rng: random.Random):
+        self.ids = list(range(1, n + 1))
+        rng.shuffle(self.ids)
+        self.cdf = list(itertools.accumulate(1 / rank ** s for rank in range(1, n + 1)))
+        self.total = self.cdf[-1]
+
+    def draw(self, rng: random.Random) -> int:
+        return self.ids[min(bisect_right(self.cdf, rng.random() * self.total), len(self.ids) - 1)]
+
+    def distinct(self, rng: random.Random, k: int) -> list[int]:
+        k = min(k, len(self.ids))
+        chosen: dict[int, None] = {}
+        while len(chosen) < k:
+            chosen[self.draw(rng)] = None
+        return list(chosen)
+
+
+def timestamp(rng: random.Random) -> datetime:
+    return EPOCH - timedelta(seconds=rng.randrange(SPAN_SECONDS))
+
+
+def per_user(total: int, users: int, rng: random.Random) -> array:
+    """Share ``total`` rows among users, a few active users getting many (index 0 is unused)."""
+    activity = Zipf(users, 0.8, rng)
+    counts = array("i", bytes(4 * (users + 1)))
+    for _ in range(total):
+        counts[activity.draw(rng)] += 1
+    return counts
+
+
+class Generator:
+    """Row streams for each table. Each table draws from its own seeded stream, so
+    changing one volume does not reshuffle the rows of the others."""
+
+    def __init__(self, volumes: Volumes, seed: int, zipf_s: float):
+        self.volumes = volumes
+        self.seed = seed
+        self.books = Zipf(volumes.books, zipf_s, self.rng("popularity"))
+        self.categories = Zipf(volumes.categories, 1.0, self.rng("category-popularity"))
+        prices = self.rng("prices")
+        self.prices = array("i", (499 + prices.randrange(5500) for _ in range(volumes.books)))
+        # A salt drawn from the seed keeps the users table identical between runs
+        salt = "".join(self.rng("salt").choice(BCRYPT_SALT_ALPHABET) for _ in range(21)) + "e"
+        self.hashed_password = pwd_context.hash(PASSWORD, salt=salt)
+
+    def rng(self, stream: str) -> random.Random:
+        return random.Random(f"{self.seed}:{stream}")
+
+    def category_rows(self) -> Iterator[tuple]:
+        for category_id in range(1, self.volumes.categories + 1):
+            yield category_id, f"Category {category_id}", f"Synthetic category {category_id}", EPOCH
+
+    def user_rows(self) -> Iterator[tuple]:
+        rng = self.rng("users")
+        for user_id in range(1, self.volumes.users + 1):
+            role = UserRole.ADMIN if user_id == 1 else UserRole.USER
+            name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+            created_at = timestamp(rng)
+            yield user_id, f"user{user_id}@example.com", self.hashed_password, name, role, True, created_at, created_at
+
+    def reviews(self) -> Iterator[tuple[int, int, int, bool, datetime]]:
+        """(user_id, book_id, rating, is_approved, created_at) for each review, users in order."""
+        rng = self.rng("reviews")
+        counts = per_user(self.volumes.reviews, self.volumes.users, rng)
+        for user_id in range(1, self.volumes.users + 1):
+            for book_id in self.books.distinct(rng, counts[user_id]):
+                rating = rng.choices((1, 2, 3, 4, 5), weights=(5, 8, 17, 35, 35))[0]
+                yield user_id, book_id, rating, rng.random() < 0.95, timestamp(rng)
+
+    def rating_aggregates(self) -> list[array]:
+        """Per book: rating_sum, then the count of each star rating, over approved reviews."""
+        aggregates = [array("i", bytes(4 * (self.volumes.books + 1))) for _ in range(6)]
+        for _, book_id, rating, approved, _ in self.reviews():
+            if approved:
+                aggregates[0][book_id] += rating
+                aggregates[rating][book_id] += 1
+        return aggregates
+
+    def book_rows(self) -> Iterator[tuple]:
+        rng = self.rng("books")
+        aggregates = self.rating_aggregates()
+        for book_id in range(1, self.volumes.books + 1):
+            title = " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 4))).title()
+            author = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+            description = " ".join(rng.choice(WORDS) for _ in range(rng.randint(20, 80))).capitalize() + "."
+            counts = [aggregates[stars][book_id] for stars in range(1, 6)]
+            review_count, rating_sum = sum(counts), aggregates[0][book_id]
+            created_at = timestamp(rng)
+            yield (
+                book_id, f"{title} {book_id}", author, description, f"978{book_id:010d}",
+                Decimal(self.prices[book_id - 1]) / 100, rng.randrange(100), None,
+                average_rating(rating_sum, review_count), review_count, rating_sum, *counts,
+                rng.random() < 0.01, created_at, created_at,
+            )
+
+    def book_category_rows(self) -> Iterator[tuple]:
+        rng = self.rng("book-categories")
+        for book_id in range(1, self.volumes.books + 1):
+            for category_id in self.categories.distinct(rng, rng.choice((1, 1, 2, 2, 3))):
+                yield book_id, category_id
+
+    def review_rows(self) -> Iterator[tuple]:
+        for review_id, (user_id, book_id, rating, approved, created_at) in enumerate(self.reviews(), start=1):
+            yield review_id, user_id, book_id, rating, None, False, approved, created_at, created_at
+
+    def order_rows(self) -> Iterator[tuple[tuple, list[tuple], list[tuple]]]:
+        """Each order with its item rows and status history rows."""
+        rng = self.rng("orders")
+        item_id = history_id = 0
+        for order_id in range(1, self.volumes.orders + 1):
+            status = rng.choices(STATUSES, weights=STATUS_WEIGHTS)[0]
+            created_at = timestamp(rng)
+            items = []
+            for book_id in self.books.distinct(rng, rng.choice((1, 1, 1, 2, 2, 3, 4))):
+                item_id += 1
+                quantity = rng.choice((1, 1, 1, 2))
+                items.append((item_id, order_id, book_id, quantity, Decimal(self.prices[book_id - 1]) / 100))
+            # Orders that were paid carry a PAID history row, which the co-purchase index reads
+            reached = [] if status in (OrderStatus.PENDING, OrderStatus.CANCELLED) else [OrderStatus.PAID]
+            if status is not OrderStatus.PAID:
+                reached.append(status)
+            history = []
+            for history_status in reached:
+                history_id += 1
+                history.append((history_id, order_id, history_status, None, created_at))
+            total = sum(quantity * price for _, _, _, quantity, price in items)
+            order = (
+                order_id, 1 + rng.randrange(self.volumes.users), status, total, "1 Benchmark Road",
+                None, created_at, created_at,
+            )
+            yield order, items, history
+
+    def cart_rows(self) -> Iterator[tuple]:
+        """Cart items, timed relative to the load so that carts have not expired."""
+        rng = self.rng("carts")
+        counts = per_user(self.volumes.carts, self.volumes.users, rng)
+        now = datetime.utcnow()
+        item_id = 0
+        for user_id in range(1, self.volumes.users + 1):
+            for book_id in self.books.distinct(rng, counts[user_id]):
+                item_id += 1
+                added_at = now - timedelta(seconds=rng.randrange(7 * 24 * 3600))
+                yield item_id, user_id, book_id, rng.randint(1, 3), added_at, added_at + timedelta(days=7)
+
+
+COLUMNS = {
+    Category.__table__: ["id", "name", "description", "created_at"],
+    User.__table__: ["id", "email", "hashed_password", "full_name", "role", "is_active", "created_at", "updated_at"],
+    Book.__table__: [
+        "id", "title", "author", "description", "isbn", "price", "stock_quantity", "cover_image",
+        "rating", "review_count", "rating_sum", *(f"rating_{stars}_count" for stars in range(1, 6)),
+        "is_deleted", "created_at", "updated_at",
+    ],
+    book_categories: ["book_id", "category_id"],
+    Review.__table__: [
+        "id", "user_id", "book_id", "rating", "comment", "is_verified_purchase", "is_approved", "created_at", "updated_at",
+    ],
+    Order.__table__: [
+        "id", "user_id", "status", "total_amount", "shipping_address", "payment_reference", "created_at", "updated_at",
+    ],
+    OrderItem.__table__: ["id", "order_id", "book_id", "quantity", "price_at_purchase"],
+    OrderStatusHistory.__table__: ["id", "order_id", "status", "note", "created_at"],
+    CartItem.__table__: ["id", "user_id", "book_id", "quantity", "added_at", "expires_at"],
+}
+
+
+class BatchWriter:
+    """Buffers rows per table and writes full batches with COPY or executemany."""
+
+    def __init__(self, conn: AsyncConnection, batch_size: int):
+        self.conn = conn
+        self.batch_size = batch_size
+        self.copy = conn.dialect.name == "postgresql"
+        self.buffers: dict[Table, list[tuple]] = {}
+        self.written: dict[str, int] = {}
+
+    async def add(self, table: Table, rows: Iterable[tuple]) -> None:
+        buffer = self.buffers.setdefault(table, [])
+        for row in rows:
+            buffer.append(row)
+            if len(buffer) >= self.batch_size:
+                await self.flush(table)
+                buffer = self.buffers[table]
+
+    async def flush(self, table: Table | None = None) -> None:
+        for table in [table] if table is not None else list(self.buffers):
+            rows, self.buffers[table] = self.buffers[table], []
+            if rows:
+                await self._write(table, rows)
+                self.written[table.name] = self.written.get(table.name, 0) + len(rows)
+
+    async def _write(self, table: Table, rows: list[tuple]) -> None:
+        columns = COLUMNS[table]
+        if self.copy:
+            # asyncpg's COPY takes enum labels as text; the models store enum names
+            records = [tuple(value.name if isinstance(value, Enum) else value for value in row) for row in rows]
+            raw = await self.conn.get_raw_connection()
+            await raw.driver_connection.copy_records_to_table(table.name, records=records, columns=columns)
+        else:
+            await self.conn.execute(insert(table), [dict(zip(columns, row)) for row in rows])
+
+
+async def load(conn: AsyncConnection, generator: Generator, batch_size: int) -> dict[str, int]:
+    writer = BatchWriter(conn, batch_size)
+    steps: Sequence[tuple[Table, Iterable[tuple]]] = [
+        (Category.__table__, generator.category_rows()),
+        (User.__table__, generator.user_rows()),
+        (Book.__table__, generator.book_rows()),
+        (book_categories, generator.book_category_rows()),
+        (Review.__table__, generator.review_rows()),
+        (CartItem.__table__, generator.cart_rows()),
+    ]
+    for table, rows in steps:
+        started = time.perf_counter()
+        await writer.add(table, rows)
+        await writer.flush(table)
+        print(f"  {table.name:<22} {writer.written.get(table.name, 0):>10,} rows  {time.perf_counter() - started:7.1f}s")
+
+    started = time.perf_counter()
+    for order, items, history in generator.order_rows():
+        await writer.add(Order.__table__, [order])
+        await writer.add(OrderItem.__table__, items)
+        await writer.add(OrderStatusHistory.__table__, history)
+    # Orders before their items and history, for the foreign keys
+    for table in (Order.__table__, OrderItem.__table__, OrderStatusHistory.__table__):
+        await writer.flush(table)
+    print(f"  {'orders':<22} {writer.written.get('orders', 0):>10,} rows  {time.perf_counter() - started:7.1f}s")
+    return writer.written
+
+
+async def generate(args: argparse.Namespace) -> None:
+    url = args.database_url or get_settings().database_url
+    volumes = Volumes(args.categories, args.books, args.users, args.orders, args.reviews, args.carts)
+    engine = create_async_engine(url, poolclass=NullPool)
+    dialect = engine.dialect.name
+
+    async with engine.begin() as conn:
+        if args.reset:
+            await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+        if (await conn.execute(select(func.count()).select_from(Book.__table__))).scalar():
+            sys.exit("The database already has books; pass --reset to replace its contents")
+
+    print(f"Generating {volumes} with seed {args.seed} into {dialect}")
+    started = time.perf_counter()
+    generator = Generator(volumes, args.seed, args.zipf)
+    async with engine.begin() as conn:
+        if dialect == "sqlite":
+            # A failed load is simply rerun with --reset, so skip the durability work
+            await conn.exec_driver_sql("PRAGMA synchronous = OFF")
+        await load(conn, generator, args.batch_size)
+        if dialect == "postgresql":
+            for table in COLUMNS:
+                if "id" in table.c:
+                    await conn.execute(text(
+                        f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+                        f"(SELECT coalesce(max(id), 1) FROM {table.name}))"
+                    ))
+    async with engine.begin() as conn:
+        await conn.execute(text("ANALYZE"))
+    print(f"Loaded in {time.perf_counter() - started:.1f}s")
+
+    if args.snapshot:
+        await snapshot(engine, args.snapshot)
+        print(f"Snapshot written to {args.snapshot}")
+    await engine.dispose()
+
+
+async def snapshot(engine, path: str) -> None:
+    if engine.dialect.name == "sqlite":
+        Path(path).unlink(missing_ok=True)
+        async with engine.connect() as conn:
+            await conn.exec_driver_sql("VACUUM INTO ?", (path,))
+    elif engine.dialect.name == "postgresql":
+        url = engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+        subprocess.run(["pg_dump", "--format=custom", f"--file={path}", url], check=True)
+    else:
+        raise SystemExit(f"Snapshots are not supported on {engine.dialect.name}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", help="defaults to DATABASE_URL")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--categories", type=int, default=50)
+    parser.add_argument("--books", type=int, default=100_000)
+    parser.add_argument("--users", type=int, default=20_000)
+    parser.add_argument("--orders", type=int, default=200_000)
+    parser.add_argument("--reviews", type=int, default=300_000)
+    parser.add_argument("--carts", type=int, default=30_000, help="cart items across all users")
+    parser.add_argument("--zipf", type=float, default=1.1, help="exponent of book popularity")
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--reset", action="store_true", help="drop and recreate the tables first")
+    parser.add_argument("--snapshot", help="copy the loaded database to this file")
+    asyncio.run(generate(parser.parse_args()))
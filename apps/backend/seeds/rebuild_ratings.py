@@ -0,0 +1,28 @@
+"""Recompute book rating aggregates from the reviews table and report drift."""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.database import AsyncSessionLocal
+from app.services.review import ReviewService
+
+
+async def rebuild_ratings(batch_size: int, repair: bool):
+    async with AsyncSessionLocal() as db:
+        drifted = await ReviewService(db).rebuild_book_ratings(batch_size=batch_size, repair=repair)
+
+    for book_id in drifted:
+        print(f"Rating aggregates drifted for book {book_id}")
+    action = "repaired" if repair else "found"
+    print(f"\nTotal books with drift {action}: {len(drifted)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--dry-run", action="store_true", help="report drift without rewriting books")
+    args = parser.parse_args()
+    asyncio.run(rebuild_ratings(args.batch_size, repair=not args.dry_run))
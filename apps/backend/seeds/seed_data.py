@@ -10,7 +10,7 @@ from app.database import AsyncSessionLocal, create_tables
 from app.models.user import User, UserRole
 from app.models.category import Category
 from app.models.book import Book
-from app.utils.security import get_password_hash
+from app.utils.security import get_password_hash_async
 
 
 CATEGORIES = [
@@ -1189,7 +1189,7 @@ async def seed_database():
             password = user_data.pop("password")
             user = User(
                 **user_data,
-                hashed_password=get_password_hash(password)
+                hashed_password=await get_password_hash_async(password)
             )
             db.add(user)
 
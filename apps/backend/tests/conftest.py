@@ -1,5 +1,9 @@
+import re
+from collections import Counter
+
 import pytest
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, AsyncSession, async_sessionmaker
 from decimal import Decimal
 from datetime import datetime
 
@@ -11,6 +15,65 @@ from app.models.category import Category
 from app.repositories.user import UserRepository
 from app.repositories.book import BookRepository
 from app.repositories.cart import CartRepository
+from app.services.category_registry import category_registry
+from app.utils.cache import clear_caches
+from app.utils.response_cache import response_cache
+
+
+# Expanded IN lists, so that one lookup per id shows up as the same statement as a batch
+IN_LIST = re.compile(r"IN \((?:\?|%\(\w+\)s|\$\d+)(?:, (?:\?|%\(\w+\)s|\$\d+))*\)")
+
+
+class QueryLog:
+    """SQL statements executed on an engine inside ``with query_log:`` blocks.
+
+    Entering the block starts a fresh log, so one block around one request
+    records exactly that request's statements.
+    """
+
+    def __init__(self, engine: AsyncEngine):
+        self.engine = engine.sync_engine
+        self.statements: list[str] = []
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        self.statements.append(statement)
+
+    def __enter__(self) -> "QueryLog":
+        self.statements = []
+        event.listen(self.engine, "before_cursor_execute", self._record)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        event.remove(self.engine, "before_cursor_execute", self._record)
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def repeated(self) -> dict[str, int]:
+        """Statements run more than once, whatever their parameters: the signature of an N+1."""
+        counts = Counter(IN_LIST.sub("IN (?)", " ".join(statement.split())) for statement in self.statements)
+        return {statement: n for statement, n in counts.items() if n > 1}
+
+    def report(self) -> str:
+        return "\n".join(f"{i:>3}. {' '.join(statement.split())}" for i, statement in enumerate(self.statements, 1))
+
+    def assert_within(self, budget: int) -> None:
+        assert self.count <= budget, f"{self.count} queries, budget {budget}:\n{self.report()}"
+        repeated = self.repeated()
+        assert not repeated, "Repeated statements:\n" + "\n".join(f"{n}x {s}" for s, n in repeated.items())
+
+
+@pytest.fixture(autouse=True)
+def reset_caches():
+    clear_caches()
+    # Caches built by tests take over the registered name, so clear the app's own as well
+    response_cache.local.clear()
+    category_registry.reset()
+    yield
+    clear_caches()
+    response_cache.local.clear()
+    category_registry.reset()
 
 
 @pytest.fixture(scope="function")
@@ -28,6 +91,11 @@ async def db_engine():
     await engine.dispose()
 
 
+@pytest.fixture
+def query_log(db_engine):
+    return QueryLog(db_engine)
+
+
 @pytest.fixture(scope="function")
 async def db_session(db_engine):
     async_session = async_sessionmaker(
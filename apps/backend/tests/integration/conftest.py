@@ -7,11 +7,13 @@ from decimal import Decimal
 async def client(db_session):
     from app.main import app
     from app.database import get_db
+    from app.dependencies import get_read_db
 
     async def override_get_db():
         yield db_session
 
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
 
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url="http://test") as ac:
@@ -1,5 +1,8 @@
 import pytest
 
+from app.models.user import User, UserRole
+from app.utils.security import create_access_token, get_password_hash
+
 
 @pytest.mark.asyncio
 class TestAuthFlow:
@@ -120,3 +123,28 @@ class TestAuthFlow:
             json={"refresh_token": tokens["refresh_token"]}
         )
         assert refresh_response.status_code == 401
+
+    async def test_deactivation_applies_to_cached_session(self, client, db_session, sample_user):
+        admin = User(
+            email="cacheadmin@example.com",
+            hashed_password=get_password_hash("password123"),
+            full_name="Cache Admin",
+            role=UserRole.ADMIN,
+        )
+        db_session.add(admin)
+        await db_session.commit()
+
+        user_headers = {"Authorization": f"Bearer {create_access_token(sample_user.id)}"}
+        admin_headers = {"Authorization": f"Bearer {create_access_token(admin.id)}"}
+        assert (await client.get("/users/me", headers=user_headers)).status_code == 200
+
+        response = await client.put(
+            f"/admin/users/{sample_user.id}/status", headers=admin_headers, json={"is_active": False}
+        )
+        assert response.status_code == 200
+
+        assert (await client.get("/users/me", headers=user_headers)).status_code == 401
+
+        stats = await client.get("/admin/cache/stats", headers=admin_headers)
+        assert stats.status_code == 200
+        assert {"auth_tokens", "auth_users"} <= {cache["name"] for cache in stats.json()}
@@ -0,0 +1,209 @@
+import pytest
+from datetime import datetime, timedelta
+from decimal import Decimal
+from sqlalchemy import event, insert, select, text, update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.config import Settings
+from app import database
+from app.database import (
+    Base, ReplicaSet, RequestStats, create_engines, recent_writers, request_stats, session_factory, use_replica,
+)
+from app.dependencies import get_read_db
+from app.models.book import Book
+from app.models.user import User
+from app.services.analytics import AnalyticsService
+
+
+@pytest.fixture
+async def engines(tmp_path):
+    write_engine, read_engine = create_engines(
+        Settings(database_url=f"sqlite+aiosqlite:///{tmp_path}/routing.db", sqlite_read_pool_size=2)
+    )
+    async with write_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield write_engine, read_engine
+    await write_engine.dispose()
+    await read_engine.dispose()
+
+
+def new_book(isbn: str) -> Book:
+    return Book(title="Routed", author="Author", isbn=isbn, price=Decimal("10.00"))
+
+
+@pytest.mark.asyncio
+class TestSqliteEngines:
+    async def test_memory_database_uses_one_engine(self):
+        write_engine, read_engine = create_engines(Settings(database_url="sqlite+aiosqlite:///:memory:"))
+        assert write_engine is read_engine
+        await write_engine.dispose()
+
+    async def test_pragmas(self, engines):
+        write_engine, read_engine = engines
+        async with write_engine.connect() as conn:
+            assert (await conn.execute(text("PRAGMA journal_mode"))).scalar() == "wal"
+            assert (await conn.execute(text("PRAGMA synchronous"))).scalar() == 1
+            assert (await conn.execute(text("PRAGMA query_only"))).scalar() == 0
+        async with read_engine.connect() as conn:
+            assert (await conn.execute(text("PRAGMA query_only"))).scalar() == 1
+            assert (await conn.execute(text("PRAGMA temp_store"))).scalar() == 2
+
+    async def test_reader_rejects_writes(self, engines):
+        _, read_engine = engines
+        async with read_engine.connect() as conn:
+            with pytest.raises(OperationalError, match="readonly"):
+                await conn.execute(insert(Book).values(title="x", author="x", isbn="1", price=1))
+
+    async def test_session_routes_reads_until_it_writes(self, engines):
+        write_engine, read_engine = engines
+        reads = []
+        event.listen(read_engine.sync_engine, "before_cursor_execute", lambda *args: reads.append(args[2]))
+
+        async with session_factory(write_engine, read_engine)() as session:
+            await session.execute(select(Book))
+            assert session.sync_session.writing is False
+            assert len(reads) == 1
+
+            session.add(new_book("1110000000001"))
+            await session.flush()
+            assert session.sync_session.writing is True
+            # Reads its own uncommitted row through the writer
+            assert (await session.execute(select(Book.title))).scalar_one() == "Routed"
+            assert len(reads) == 1
+
+            await session.commit()
+            assert session.sync_session.writing is False
+            assert (await session.execute(select(Book.title))).scalar_one() == "Routed"
+            assert len(reads) == 2
+
+    async def test_dml_and_for_update_go_to_writer(self, engines):
+        write_engine, read_engine = engines
+        async with session_factory(write_engine, read_engine)() as session:
+            session.add(new_book("1110000000002"))
+            await session.commit()
+
+            await session.execute(update(Book).values(stock_quantity=3))
+            assert session.sync_session.writing is True
+            await session.commit()
+
+            await session.execute(select(Book).with_for_update())
+            assert session.sync_session.writing is True
+            await session.rollback()
+
+
+@pytest.mark.asyncio
+class TestReplicas:
+    async def test_pick_rotates_and_skips_lagging_replicas(self, engines):
+        first, second = engines
+        replicas = ReplicaSet([first, second], max_lag=5)
+        assert {replicas.pick(), replicas.pick()} == {first, second}
+
+        replicas.lag[second] = 30
+        assert [replicas.pick() for _ in range(3)] == [first] * 3
+
+        replicas.lag[first] = float("inf")
+        assert replicas.pick() is None
+
+    async def test_recent_writer_reads_from_primary(self, engines, monkeypatch):
+        write_engine, replica = engines
+        monkeypatch.setattr(database, "replicas", ReplicaSet([replica], max_lag=5))
+        sessions = session_factory(write_engine, write_engine)
+
+        async with sessions() as session:
+            use_replica(session)
+            assert session.sync_session.read_bind is replica.sync_engine
+        recent_writers.set(7, True)
+        async with sessions() as session:
+            use_replica(session, 7)
+            assert session.sync_session.read_bind is None
+        async with sessions() as session:
+            use_replica(session, 8)
+            assert session.sync_session.read_bind is replica.sync_engine
+
+    async def test_read_db_keeps_recent_writers_on_the_primary(self, engines, monkeypatch):
+        write_engine, replica = engines
+        monkeypatch.setattr(database, "replicas", ReplicaSet([replica], max_lag=5))
+        recent_writers.set(7, True)
+
+        async for session in get_read_db(claims={"sub": "7", "type": "access"}):
+            assert session.sync_session.read_bind is not replica.sync_engine
+        async for session in get_read_db(claims={"sub": "8", "type": "access"}):
+            assert session.sync_session.read_bind is replica.sync_engine
+            assert session.info["user_id"] == 8
+
+    async def test_analytics_on_a_lagging_replica_counts_every_day(self, engines, tmp_path, monkeypatch):
+        write_engine, _ = engines
+        replica = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/replica.db")
+        async with replica.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        sessions = session_factory(write_engine, write_engine)
+        now = datetime.utcnow()
+        for bind in (write_engine, replica):
+            async with sessions(bind=bind) as session:
+                session.add_all(
+                    User(email=f"user{days}@example.com", full_name="User", created_at=now - timedelta(days=days))
+                    for days in (0, 2, 5)
+                )
+                await session.commit()
+        # The primary has rolled up the closed days; the replica has not received the rollup yet
+        async with sessions() as session:
+            await AnalyticsService(session).roll_up_closed_days()
+        monkeypatch.setattr(database, "AsyncSessionLocal", sessions)
+        monkeypatch.setattr(database, "replicas", ReplicaSet([replica], max_lag=5))
+
+        try:
+            async for session in get_read_db(claims=None):
+                assert session.sync_session.read_bind is replica.sync_engine
+                analytics = await AnalyticsService(session).get_analytics()
+                assert analytics["total_users"] == 3
+                assert session.sync_session.writing is False
+        finally:
+            await replica.dispose()
+
+    async def test_commit_marks_user_as_recent_writer(self, engines, monkeypatch):
+        write_engine, read_engine = engines
+        monkeypatch.setattr(database, "replicas", ReplicaSet([read_engine], max_lag=5))
+
+        async with session_factory(write_engine, read_engine)() as session:
+            session.info["user_id"] = 7
+            await session.execute(select(Book))
+            await session.commit()
+            assert recent_writers.get(7) is None
+
+            session.add(new_book("1110000000003"))
+            await session.commit()
+            assert recent_writers.get(7) is True
+
+
+@pytest.mark.asyncio
+class TestRequestStats:
+    async def test_counts_queries_and_checkouts(self, engines):
+        write_engine, read_engine = engines
+        stats = RequestStats()
+        token = request_stats.set(stats)
+        try:
+            async with session_factory(write_engine, read_engine)() as session:
+                assert stats.checkouts == 0
+                await session.execute(select(Book))
+                await session.execute(select(Book.id))
+                session.add(new_book("1110000000004"))
+                await session.commit()
+        finally:
+            request_stats.reset(token)
+
+        # A reader connection for the SELECTs, the writer for the INSERT
+        assert stats.checkouts == 2
+        assert stats.queries == 3
+        assert stats.checkout_seconds > 0
+
+    async def test_unused_session_never_checks_out(self, engines):
+        write_engine, read_engine = engines
+        stats = RequestStats()
+        token = request_stats.set(stats)
+        try:
+            async with session_factory(write_engine, read_engine)():
+                pass
+        finally:
+            request_stats.reset(token)
+        assert stats == RequestStats()
@@ -1,7 +1,11 @@
 import pytest
 from decimal import Decimal
+from sqlalchemy import func, select
+from sqlalchemy.dialects import postgresql
 
+from app.models.book import Book, book_categories
 from app.models.user import User, UserRole
+from app.repositories.base import estimate_query, planned_rows
 from app.repositories.user import UserRepository
 from app.utils.security import get_password_hash
 
@@ -95,3 +99,36 @@ class TestBaseRepository:
 
         new_count = await repo.count()
         assert new_count == initial_count + 1
+
+
+# EXPLAIN (FORMAT JSON) of SELECT 1 FROM books WHERE NOT is_deleted on a large table
+PARALLEL_PLAN = [{
+    "Plan": {
+        "Node Type": "Gather", "Plan Rows": 2400000, "Workers Planned": 2,
+        "Plans": [{
+            "Node Type": "Seq Scan", "Parent Relationship": "Outer", "Parallel Aware": True,
+            "Relation Name": "books", "Plan Rows": 1000000,
+        }],
+    },
+}]
+
+
+class TestPlannerEstimate:
+    def test_planned_rows_reads_the_gather_total_not_a_worker_share(self):
+        assert planned_rows(PARALLEL_PLAN) == 2400000
+
+    def test_planned_rows_of_a_plain_scan(self):
+        assert planned_rows([{"Plan": {"Node Type": "Seq Scan", "Plan Rows": 42}}]) == 42
+        assert planned_rows([{"Plan": {"Node Type": "Result"}}]) is None
+
+    def test_estimate_query_drops_the_count_but_keeps_joins_and_filters(self):
+        count_query = (
+            select(func.count(Book.id)).where(Book.is_deleted == False)
+            .join(book_categories).where(book_categories.c.category_id == 3)
+        )
+        sql = str(estimate_query(count_query).compile(dialect=postgresql.dialect()))
+        assert "count(" not in sql
+        assert sql.startswith("SELECT 1")
+        assert "JOIN book_categories" in sql
+        assert "books.is_deleted = false" in sql
+        assert "book_categories.category_id" in sql
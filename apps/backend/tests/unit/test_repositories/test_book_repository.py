@@ -2,7 +2,12 @@ import pytest
 from decimal import Decimal
 
 from app.models.book import Book
+from app.models.category import Category
 from app.repositories.book import BookRepository
+from app.repositories.search import SearchBackend
+from app.exceptions import BadRequestException
+from app.schemas.book import Facet
+from app.utils.pagination import TotalMode, encode_cursor, next_cursor, split_page
 
 
 @pytest.mark.asyncio
@@ -110,6 +115,13 @@ class TestBookRepository:
         books, total = await repo.search(offset=0, limit=1)
         assert len(books) <= 1
 
+    async def test_search_projects_list_columns(self, db_session, sample_book):
+        repo = BookRepository(db_session)
+        books, _ = await repo.search(sort_by="updated_at")
+        assert "description" not in books[0]._fields
+        assert books[0].title == "Test Book"
+        assert books[0].updated_at == sample_book.updated_at
+
     async def test_update_stock_increase(self, db_session, sample_book):
         repo = BookRepository(db_session)
         initial_stock = sample_book.stock_quantity
@@ -141,3 +153,145 @@ class TestBookRepository:
 
         books, total = await repo.search()
         assert sample_book.id not in [b.id for b in books]
+
+    async def test_search_matches_description(self, db_session, sample_book):
+        repo = BookRepository(db_session)
+        books, total = await repo.search(search="description")
+        assert total == 1
+        assert books[0].id == sample_book.id
+
+    async def test_search_matches_isbn(self, db_session, sample_book):
+        repo = BookRepository(db_session)
+        books, total = await repo.search(search=sample_book.isbn)
+        assert total == 1
+        assert books[0].id == sample_book.id
+
+    async def test_search_matches_word_prefix(self, db_session, sample_book):
+        repo = BookRepository(db_session)
+        books, total = await repo.search(search="auth")
+        assert total == 1
+        assert books[0].id == sample_book.id
+
+    async def test_search_index_follows_updates(self, db_session, sample_book):
+        repo = BookRepository(db_session)
+        sample_book.title = "Renamed Volume"
+        await db_session.commit()
+
+        books, total = await repo.search(search="Renamed")
+        assert [b.id for b in books] == [sample_book.id]
+        books, total = await repo.search(search="Test Book")
+        assert total == 0
+
+    async def test_search_punctuation_only_falls_back_to_like(self, db_session, sample_book):
+        repo = BookRepository(db_session)
+        books, total = await repo.search(search="!!!")
+        assert total == 0
+
+    async def test_sort_by_relevance(self, db_session, sample_book):
+        repo = BookRepository(db_session)
+        for index, title in enumerate(["Dune", "Dune Messiah Dune"]):
+            db_session.add(Book(
+                title=title,
+                author="Frank Herbert",
+                isbn=f"978000000000{index}",
+                price=Decimal("9.99"),
+                stock_quantity=1,
+            ))
+        await db_session.commit()
+
+        books, total = await repo.search(search="dune", sort_by="relevance")
+        assert total == 2
+        assert books[0].title == "Dune Messiah Dune"
+
+    async def test_like_backend(self, db_session, sample_book):
+        repo = BookRepository(db_session, search_backend=SearchBackend())
+        books, total = await repo.search(search="est Boo")
+        assert total == 1
+        assert books[0].id == sample_book.id
+
+    async def test_cursor_pagination_matches_offset(self, db_session, sample_book):
+        repo = BookRepository(db_session)
+        for index in range(6):
+            db_session.add(Book(
+                title=f"Paged Book {index}",
+                author="Pager",
+                isbn=f"978111111111{index}",
+                price=Decimal("9.99") if index % 2 else Decimal("5.00"),
+                stock_quantity=1,
+            ))
+        await db_session.commit()
+
+        offset_ids = [b.id for b in (await repo.search(sort_by="price", sort_order="asc", limit=50))[0]]
+
+        cursor_ids, cursor = [], None
+        while True:
+            rows, _ = await repo.search(sort_by="price", sort_order="asc", limit=4, cursor=cursor)
+            books, has_more = split_page(rows, 3)
+            cursor_ids.extend(b.id for b in books)
+            cursor = next_cursor(books, has_more, "price:asc", "price")
+            if cursor is None:
+                break
+
+        assert cursor_ids == offset_ids
+
+    async def test_search_without_total(self, db_session, sample_book):
+        repo = BookRepository(db_session)
+        books, total = await repo.search(total_mode=TotalMode.NONE)
+        assert len(books) == 1
+        assert total is None
+
+    async def test_search_estimated_total_is_cached(self, db_session, sample_book):
+        repo = BookRepository(db_session)
+        _, total = await repo.search(total_mode=TotalMode.ESTIMATE)
+        assert total == 1
+
+        db_session.add(Book(title="Another", author="Someone", isbn="9780000000999", price=Decimal("1.00")))
+        await db_session.commit()
+
+        _, estimated = await repo.search(total_mode=TotalMode.ESTIMATE)
+        _, exact = await repo.search(total_mode=TotalMode.EXACT)
+        assert estimated == 1
+        assert exact == 2
+
+    async def test_cursor_rejected_for_relevance_sort(self, db_session, sample_book):
+        repo = BookRepository(db_session)
+        cursor = encode_cursor("created_at:desc", sample_book.created_at, sample_book.id)
+        with pytest.raises(BadRequestException):
+            await repo.search(search="test", sort_by="relevance", cursor=cursor)
+
+    async def test_facets(self, db_session, sample_book, sample_category):
+        other = Category(name="Poetry")
+        cheap = Book(title="Cheap Verse", author="Poet", isbn="9780000000555", price=Decimal("5.00"), stock_quantity=0)
+        cheap.categories.extend([sample_category, other])
+        db_session.add(cheap)
+        await db_session.commit()
+
+        repo = BookRepository(db_session)
+        facets = await repo.get_facets({Facet.CATEGORY, Facet.PRICE, Facet.AVAILABILITY})
+        assert facets["categories"] == [
+            {"id": sample_category.id, "name": "Fiction", "count": 2},
+            {"id": other.id, "name": "Poetry", "count": 1},
+        ]
+        assert [bucket["count"] for bucket in facets["price"]] == [1, 1, 0, 0, 0]
+        assert facets["price"][-1]["max"] is None
+        assert facets["availability"] == {"in_stock": 1, "out_of_stock": 1}
+
+    async def test_facets_ignore_their_own_filter(self, db_session, sample_book, sample_category):
+        other = Category(name="Poetry")
+        cheap = Book(title="Cheap Verse", author="Poet", isbn="9780000000555", price=Decimal("5.00"), stock_quantity=0)
+        cheap.categories.append(other)
+        db_session.add(cheap)
+        await db_session.commit()
+
+        repo = BookRepository(db_session)
+        facets = await repo.get_facets(
+            {Facet.CATEGORY, Facet.PRICE, Facet.AVAILABILITY}, category_id=other.id, in_stock=True
+        )
+        # Only the in-stock filter applies to categories, only the category filter to availability
+        assert facets["categories"] == [{"id": sample_category.id, "name": "Fiction", "count": 1}]
+        assert facets["availability"] == {"in_stock": 0, "out_of_stock": 1}
+        assert sum(bucket["count"] for bucket in facets["price"]) == 0
+
+        facets = await repo.get_facets({Facet.PRICE}, search="verse")
+        assert set(facets) == {"price"}
+        assert facets["price"][0]["count"] == 1
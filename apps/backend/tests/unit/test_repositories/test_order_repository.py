@@ -1,5 +1,6 @@
 import pytest
 from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
 from decimal import Decimal
 from sqlalchemy import select
 
@@ -10,6 +11,7 @@ from app.models.book import Book
 from app.models.category import Category
 from app.models.cart import CartItem
 from app.utils.security import get_password_hash
+from app.utils.pagination import next_cursor
 
 
 @pytest.fixture
@@ -147,6 +149,29 @@ class TestOrderRepository:
         assert len(orders) == 3
         assert total == 5
 
+    async def test_get_user_orders_cursor_pagination(self, db_session, order_repository, sample_user_with_orders):
+        user = sample_user_with_orders
+        created_at = datetime(2026, 1, 1, 12, 0, 0)
+        for i in range(5):
+            db_session.add(Order(
+                user_id=user.id,
+                status=OrderStatus.PENDING,
+                total_amount=Decimal("10.00"),
+                shipping_address=f"Address {i}",
+                created_at=created_at,
+            ))
+        await db_session.commit()
+
+        first_page, total = await order_repository.get_user_orders(user.id, limit=3)
+        cursor = next_cursor(first_page, True, "created_at:desc", "created_at")
+        second_page, _ = await order_repository.get_user_orders(user.id, limit=3, cursor=cursor)
+
+        ids = [o.id for o in first_page] + [o.id for o in second_page]
+        assert total == 5
+        assert len(second_page) == 2
+        assert ids == sorted(ids, reverse=True)
+        assert len(set(ids)) == 5
+
     async def test_get_all_orders(self, db_session, order_repository, sample_order):
         orders, total = await order_repository.get_all_orders(
             status=None,
@@ -196,6 +221,23 @@ class TestOrderRepository:
         assert len(orders) == 3
         assert total == 5
 
+    async def test_list_rows_sum_item_quantities(
+        self, db_session, order_repository, sample_order, sample_user_with_orders, sample_book_for_orders
+    ):
+        db_session.add(Order(user_id=sample_user_with_orders.id, total_amount=Decimal("0.00"), shipping_address="x"))
+        db_session.add(OrderItem(
+            order_id=sample_order.id, book_id=sample_book_for_orders.id, quantity=3, price_at_purchase=Decimal("1.00")
+        ))
+        await db_session.commit()
+
+        orders, _ = await order_repository.get_all_orders()
+        assert {order.id: order.item_count for order in orders} == {sample_order.id: 5, sample_order.id + 1: 0}
+        assert {order.user_email for order in orders} == {"orderuser@example.com"}
+
+        orders, _ = await order_repository.get_user_orders(sample_user_with_orders.id)
+        assert sorted(order.item_count for order in orders) == [0, 5]
+        assert "user_email" not in orders[0]._fields
+
     async def test_get_with_details(self, db_session, order_repository, sample_order):
         order = await order_repository.get_with_details(sample_order.id)
         assert order is not None
@@ -0,0 +1,166 @@
+"""Query-plan regression tests for the hot repository queries.
+
+Each case runs a repository call against a few thousand synthetic rows,
+captures the SELECTs it issues and asks the database for their plans. A
+plan that reads a whole table, or builds a throwaway index to avoid doing
+so, fails the test; so does one that stops using the index the query was
+written for.
+"""
+import random
+import re
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import event, insert, text
+
+from app.models.book import Book, book_categories
+from app.models.cart import CartItem
+from app.models.category import Category
+from app.models.order import Order, OrderItem, OrderStatus
+from app.models.review import Review
+from app.models.user import User
+from app.repositories.book import BookRepository
+from app.repositories.cart import CartRepository
+from app.repositories.order import OrderRepository
+from app.repositories.review import ReviewRepository
+from app.services.recommendation import RecommendationService
+
+BOOKS, USERS, ORDERS, CATEGORIES = 2000, 300, 3000, 20
+
+# Plan lines that read every row: a bare table scan, or a temporary index built for the query
+FULL_SCAN = re.compile(r"^SCAN (\w+)$|AUTOMATIC")
+
+
+@pytest.fixture
+async def dataset(db_session):
+    rng = random.Random(21)
+    now = datetime.utcnow()
+    await db_session.execute(insert(Category), [{"name": f"Category {i}"} for i in range(CATEGORIES)])
+    await db_session.execute(insert(User), [
+        {"email": f"reader{i}@example.com", "full_name": f"Reader {i}"} for i in range(USERS)
+    ])
+    await db_session.execute(insert(Book), [
+        {
+            "title": f"Book {i}", "author": f"Author {i % 300}", "isbn": f"{9780000000000 + i}",
+            "price": Decimal(500 + rng.randrange(4500)) / 100, "stock_quantity": rng.randrange(20),
+            "rating": Decimal(rng.randrange(500)) / 100, "is_deleted": i % 50 == 0,
+            "created_at": now - timedelta(minutes=i),
+        }
+        for i in range(BOOKS)
+    ])
+    await db_session.execute(insert(book_categories), [
+        {"book_id": book_id, "category_id": 1 + (book_id + offset) % CATEGORIES}
+        for book_id in range(1, BOOKS + 1) for offset in (0, 7)
+    ])
+    statuses = list(OrderStatus)
+    await db_session.execute(insert(Order), [
+        {
+            "user_id": 1 + rng.randrange(USERS), "status": rng.choice(statuses),
+            "total_amount": Decimal("20.00"), "shipping_address": "1 Plan Street",
+            "created_at": now - timedelta(minutes=i),
+        }
+        for i in range(ORDERS)
+    ])
+    await db_session.execute(insert(OrderItem), [
+        {"order_id": order_id, "book_id": 1 + rng.randrange(BOOKS), "quantity": 1, "price_at_purchase": Decimal("10.00")}
+        for order_id in range(1, ORDERS + 1) for _ in range(3)
+    ])
+    await db_session.execute(insert(Review), [
+        {
+            "user_id": user_id, "book_id": book_id, "rating": 1 + rng.randrange(5),
+            "is_approved": rng.random() < 0.9, "created_at": now - timedelta(minutes=user_id * book_id),
+        }
+        for user_id in range(1, USERS + 1) for book_id in rng.sample(range(1, BOOKS + 1), 10)
+    ])
+    await db_session.execute(insert(CartItem), [
+        {"user_id": user_id, "book_id": book_id, "expires_at": now + timedelta(days=rng.randrange(-3, 7))}
+        for user_id in range(1, USERS + 1) for book_id in rng.sample(range(1, BOOKS + 1), 5)
+    ])
+    await db_session.commit()
+    await db_session.execute(text("ANALYZE"))
+    return db_session
+
+
+async def query_plans(session, call) -> list[tuple[str, list[str]]]:
+    """Run ``call`` and return each SELECT it issued with the lines of its query plan."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    sync_engine = (await session.connection()).engine.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", record)
+    try:
+        await call()
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", record)
+
+    connection = await session.connection()
+    plans = []
+    for statement, parameters in statements:
+        result = await connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        plans.append((statement, [row[-1] for row in result]))
+    return plans
+
+
+def full_scans(plans: list[tuple[str, list[str]]]) -> list[str]:
+    return [
+        f"{line}\n    in: {statement}"
+        for statement, lines in plans for line in lines if FULL_SCAN.search(line)
+    ]
+
+
+def uses(plans: list[tuple[str, list[str]]], index: str) -> bool:
+    return any(index in line for _, lines in plans for line in lines)
+
+
+CASES = {
+    "user orders": (
+        lambda db: OrderRepository(db).get_user_orders(7), "ix_orders_user_id_created_at",
+    ),
+    "user orders by status": (
+        lambda db: OrderRepository(db).get_user_orders(7, status=OrderStatus.PAID), "ix_orders_user_id_created_at",
+    ),
+    "all orders by status": (
+        lambda db: OrderRepository(db).get_all_orders(status=OrderStatus.SHIPPED), "ix_orders_status_created_at",
+    ),
+    "order items": (
+        lambda db: OrderRepository(db).get_user_orders(7), "ix_order_items_order_id",
+    ),
+    "book reviews": (
+        lambda db: ReviewRepository(db).get_book_reviews(11), "ix_reviews_book_id_is_approved_created_at",
+    ),
+    "pending reviews": (
+        lambda db: ReviewRepository(db).get_pending_reviews(), "ix_reviews_is_approved_created_at",
+    ),
+    "cart": (
+        lambda db: CartRepository(db).get_user_cart(7), "ix_cart_items_user_id_expires_at",
+    ),
+    "also bought": (
+        lambda db: RecommendationService(db)._query_also_bought(11, 5), "ix_order_items_book_id_order_id",
+    ),
+    "books by newest": (
+        lambda db: BookRepository(db).search(), "ix_books_is_deleted_created_at",
+    ),
+    "books by price": (
+        lambda db: BookRepository(db).search(sort_by="price", sort_order="asc"), "ix_books_is_deleted_price",
+    ),
+    "books by rating": (
+        lambda db: BookRepository(db).search(sort_by="rating"), "ix_books_is_deleted_rating",
+    ),
+    "books in category": (
+        lambda db: BookRepository(db).search(category_id=3), "ix_book_categories_category_id",
+    ),
+}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("case", list(CASES))
+async def test_hot_query_uses_index(dataset, case):
+    call, index = CASES[case]
+    plans = await query_plans(dataset, lambda: call(dataset))
+
+    assert not full_scans(plans), "\n".join(full_scans(plans))
+    assert uses(plans, index), "\n".join(line for _, lines in plans for line in lines)
@@ -1,4 +1,5 @@
 import pytest
+from datetime import datetime, timedelta
 
 from app.models.user import User, UserRole, TokenBlacklist
 from app.repositories.user import UserRepository
@@ -22,7 +23,7 @@ class TestUserRepository:
     async def test_blacklist_token(self, db_session):
         repo = UserRepository(db_session)
         token = "test_token_value"
-        await repo.blacklist_token(token)
+        await repo.blacklist_token(token, datetime.utcnow() + timedelta(hours=1))
 
         blacklisted = await repo.is_token_blacklisted(token)
         assert blacklisted is True
@@ -30,7 +31,7 @@ class TestUserRepository:
     async def test_is_token_blacklisted_true(self, db_session):
         repo = UserRepository(db_session)
         token = "blacklisted_token"
-        blacklisted_entry = TokenBlacklist(token=token)
+        blacklisted_entry = TokenBlacklist(jti=token, expires_at=datetime.utcnow() + timedelta(hours=1))
         db_session.add(blacklisted_entry)
         await db_session.commit()
 
@@ -46,13 +47,23 @@ class TestUserRepository:
         repo = UserRepository(db_session)
         tokens = ["token1", "token2", "token3"]
         for token in tokens:
-            await repo.blacklist_token(token)
+            await repo.blacklist_token(token, datetime.utcnow() + timedelta(hours=1))
 
         assert await repo.is_token_blacklisted("token1") is True
         assert await repo.is_token_blacklisted("token2") is True
         assert await repo.is_token_blacklisted("token3") is True
         assert await repo.is_token_blacklisted("token4") is False
 
+    async def test_delete_expired_tokens(self, db_session):
+        repo = UserRepository(db_session)
+        now = datetime.utcnow()
+        await repo.blacklist_token("expired", now - timedelta(seconds=1))
+        await repo.blacklist_token("live", now + timedelta(hours=1))
+
+        assert await repo.delete_expired_tokens(now) == 1
+        assert await repo.is_token_blacklisted("expired") is False
+        assert await repo.get_blacklisted_tokens(now) == [("live", now + timedelta(hours=1))]
+
     async def test_create_user_with_base_repository_methods(self, db_session):
         repo = UserRepository(db_session)
         user_data = {
@@ -12,11 +12,13 @@ from app.utils.security import get_password_hash, create_access_token
 async def client(db_session):
     from app.main import app
     from app.database import get_db
+    from app.dependencies import get_read_db
 
     async def override_get_db():
         yield db_session
 
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
 
     transport = ASGITransport(app=app)
     async with AsyncClient(transport=transport, base_url="http://test") as ac:
@@ -50,6 +52,34 @@ async def auth_headers(client, sample_user_with_password):
     return {"Authorization": f"Bearer {tokens['access_token']}"}
 
 
+@pytest.fixture
+async def admin_user(db_session):
+    from app.schemas.user import UserCreate
+    from app.services.auth import AuthService
+
+    service = AuthService(db_session)
+    user_data = UserCreate(
+        email="admin@test.com",
+        password="admin123456",
+        full_name="Admin User"
+    )
+    user = await service.register(user_data)
+    user.role = UserRole.ADMIN
+    await db_session.commit()
+    await db_session.refresh(user)
+    return user
+
+
+@pytest.fixture
+async def admin_auth_headers(client, admin_user):
+    response = await client.post(
+        "/auth/login",
+        json={"email": admin_user.email, "password": "admin123456"}
+    )
+    tokens = response.json()
+    return {"Authorization": f"Bearer {tokens['access_token']}"}
+
+
 @pytest.fixture
 async def sample_book_for_router(db_session, sample_category):
     book = Book(
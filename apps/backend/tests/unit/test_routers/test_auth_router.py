@@ -1,6 +1,10 @@
 import pytest
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app import dependencies
+from app.main import app
 from app.schemas.user import UserCreate
+from app.utils import auth_cache
 
 
 @pytest.mark.asyncio
@@ -71,6 +75,19 @@ class TestAuthRouter:
         assert "refresh_token" in data
         assert data["token_type"] == "bearer"
 
+    async def test_login_when_hashing_saturated(self, client, sample_user_with_password, monkeypatch):
+        from app.utils.security import password_hasher
+        monkeypatch.setattr(password_hasher, "max_pending", 0)
+        response = await client.post(
+            "/auth/login",
+            json={
+                "email": sample_user_with_password.email,
+                "password": "password123"
+            }
+        )
+        assert response.status_code == 503
+        assert response.headers["Retry-After"] == "1"
+
     async def test_login_invalid_email(self, client):
         response = await client.post(
             "/auth/login",
@@ -229,3 +246,24 @@ class TestAuthRouter:
         assert response.status_code == 401
         data = response.json()
         assert "OAuth authentication only" in data["detail"]
+
+    async def test_token_decoded_once_per_request(self, client, db_engine, admin_user, admin_auth_headers, monkeypatch):
+        # With the token cache off, only the request itself can share the decoded claims
+        monkeypatch.setattr(auth_cache.token_cache, "ttl", 0)
+        decoded = []
+        decode_token = auth_cache.decode_token
+        monkeypatch.setattr(auth_cache, "decode_token", lambda token: decoded.append(token) or decode_token(token))
+        readers = []
+
+        def read_session(user_id):
+            readers.append(user_id)
+            return AsyncSession(db_engine)
+
+        monkeypatch.delitem(app.dependency_overrides, dependencies.get_read_db)
+        monkeypatch.setattr(dependencies, "read_session", read_session)
+
+        # Authenticated through get_db, reads through get_read_db
+        response = await client.get("/admin/analytics", headers=admin_auth_headers)
+        assert response.status_code == 200
+        assert readers == [admin_user.id]
+        assert len(decoded) == 1
@@ -1,6 +1,15 @@
 import pytest
 from decimal import Decimal
 
+import app.routers.books
+import app.services.category_registry
+import app.utils.response_cache
+
+from app.schemas.book import BookUpdate
+from app.schemas.category import CategoryUpdate
+from app.services.book import BookService
+from app.services.category import CategoryService
+
 
 @pytest.mark.asyncio
 class TestBooksRouter:
@@ -97,3 +106,163 @@ class TestBooksRouter:
     async def test_delete_book_unauthorized(self, client, sample_book_for_router):
         response = await client.delete(f"/books/{sample_book_for_router.id}")
         assert response.status_code == 403
+
+    async def test_search_books_sort_by_relevance(self, client, sample_book_for_router):
+        response = await client.get("/books?search=router&sort_by=relevance")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] == 1
+        assert data["items"][0]["id"] == sample_book_for_router.id
+
+    async def test_cursor_pagination(self, client, sample_book_for_router, sample_book):
+        response = await client.get("/books?size=1")
+        data = response.json()
+        assert data["next_cursor"] is not None
+
+        response = await client.get(f"/books?size=1&cursor={data['next_cursor']}")
+        assert response.status_code == 200
+        second = response.json()
+        assert second["items"][0]["id"] != data["items"][0]["id"]
+        assert second["has_more"] is False
+        assert second["next_cursor"] is None
+
+    async def test_include_total_false(self, client, sample_book_for_router, sample_book):
+        response = await client.get("/books?size=1&include_total=false")
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] is None
+        assert data["pages"] is None
+        assert data["has_more"] is True
+        assert len(data["items"]) == 1
+
+    async def test_include_total_estimate(self, client, sample_book_for_router, sample_book):
+        response = await client.get("/books?include_total=estimate")
+        assert response.status_code == 200
+        assert response.json()["total"] == 2
+
+    async def test_include_total_invalid(self, client):
+        response = await client.get("/books?include_total=maybe")
+        assert response.status_code == 422
+
+    async def test_invalid_cursor(self, client):
+        response = await client.get("/books?cursor=bogus")
+        assert response.status_code == 400
+
+    async def test_facets(self, client, sample_book_for_router, sample_category):
+        response = await client.get("/books?facets=category&facets=availability")
+        assert response.status_code == 200
+        facets = response.json()["facets"]
+        assert facets["categories"] == [{"id": sample_category.id, "name": sample_category.name, "count": 1}]
+        assert facets["availability"] == {"in_stock": 1, "out_of_stock": 0}
+        assert facets["price"] is None
+
+    async def test_facets_not_requested(self, client, sample_book_for_router):
+        response = await client.get("/books")
+        assert response.json()["facets"] is None
+
+    async def test_facets_invalid(self, client):
+        response = await client.get("/books?facets=color")
+        assert response.status_code == 422
+
+    async def test_responses_cached_until_catalog_changes(self, client, db_session, sample_book_for_router):
+        first = await client.get("/books?size=5&page=1")
+        assert first.headers["X-Cache"] == "MISS"
+
+        # Query parameter order does not matter
+        second = await client.get("/books?page=1&size=5")
+        assert second.headers["X-Cache"] == "HIT"
+        assert second.json() == first.json()
+
+        service = BookService(db_session)
+        await service.update_book(sample_book_for_router.id, BookUpdate(title="Renamed"))
+
+        third = await client.get("/books?size=5&page=1")
+        assert third.headers["X-Cache"] == "MISS"
+        assert third.json()["items"][0]["title"] == "Renamed"
+
+    async def test_order_drops_only_the_ordered_books(self, client, auth_headers, sample_book_for_router, sample_book):
+        ordered, other = f"/books/{sample_book_for_router.id}", f"/books/{sample_book.id}"
+        # Only the other book costs under 20
+        urls = [ordered, other, "/books", "/books?max_price=20"]
+        for url in urls:
+            assert (await client.get(url)).headers["X-Cache"] == "MISS"
+
+        await client.post("/cart/items", headers=auth_headers, json={"book_id": sample_book_for_router.id, "quantity": 1})
+        response = await client.post("/orders", headers=auth_headers, json={"shipping_address": "1 Test Street, Testville"})
+        assert response.status_code == 201
+
+        assert [(await client.get(url)).headers["X-Cache"] for url in urls] == ["MISS", "HIT", "MISS", "HIT"]
+        assert (await client.get(ordered)).json()["stock_quantity"] == 4
+
+    async def test_name_change_drops_only_review_lists(self, client, auth_headers, sample_book_for_router):
+        urls = ["/books", f"/books/{sample_book_for_router.id}/reviews"]
+        for url in urls:
+            await client.get(url)
+
+        response = await client.put("/users/me", headers=auth_headers, json={"full_name": "Renamed Reader"})
+        assert response.status_code == 200
+        assert [(await client.get(url)).headers["X-Cache"] for url in urls] == ["HIT", "MISS"]
+
+    async def test_errors_not_cached(self, client):
+        await client.get("/books/99999")
+        response = await client.get("/books/99999")
+        assert response.status_code == 404
+        assert "X-Cache" not in response.headers
+
+    async def test_list_etag_not_modified(self, client, sample_book_for_router):
+        response = await client.get("/books")
+        etag = response.headers["ETag"]
+        assert response.headers["Cache-Control"] == "public, no-cache"
+
+        response = await client.get("/books", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.headers["ETag"] == etag
+        assert response.content == b""
+
+    async def test_etags_not_validated_after_restart(self, client, monkeypatch, sample_book_for_router):
+        urls = ["/books", f"/books/{sample_book_for_router.id}"]
+        etags = [(await client.get(url)).headers["ETag"] for url in urls]
+
+        restarted = app.utils.response_cache.ResponseCache()
+        for module in (app.utils.response_cache, app.routers.books, app.services.category_registry):
+            monkeypatch.setattr(module, "response_cache", restarted)
+        for url, etag in zip(urls, etags):
+            response = await client.get(url, headers={"If-None-Match": etag})
+            assert response.status_code == 200
+            assert response.headers["ETag"] != etag
+
+    async def test_book_etag_and_last_modified(self, client, db_session, sample_book_for_router):
+        url = f"/books/{sample_book_for_router.id}"
+        response = await client.get(url)
+        etag = response.headers["ETag"]
+        last_modified = response.headers["Last-Modified"]
+
+        assert (await client.get(url, headers={"If-None-Match": etag})).status_code == 304
+        assert (await client.get(url, headers={"If-Modified-Since": last_modified})).status_code == 304
+
+        await BookService(db_session).update_book(sample_book_for_router.id, BookUpdate(price=Decimal("9.99")))
+
+        response = await client.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+        assert response.json()["price"] == "9.99"
+
+    async def test_book_etag_changes_with_categories(self, client, db_session, sample_book_for_router, sample_category):
+        url = f"/books/{sample_book_for_router.id}"
+        etag = (await client.get(url)).headers["ETag"]
+
+        await CategoryService(db_session).update_category(sample_category.id, CategoryUpdate(name="Renamed"))
+
+        response = await client.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.json()["categories"][0]["name"] == "Renamed"
+
+    async def test_membership_change_keeps_other_etags(self, client, db_session, sample_book_for_router, sample_book):
+        urls = [f"/books/{sample_book_for_router.id}", f"/books/{sample_book.id}"]
+        etags = [(await client.get(url)).headers["ETag"] for url in urls]
+
+        await BookService(db_session).update_book(sample_book_for_router.id, BookUpdate(category_ids=[]))
+
+        responses = [await client.get(url, headers={"If-None-Match": etag}) for url, etag in zip(urls, etags)]
+        assert [response.status_code for response in responses] == [200, 304]
+        assert responses[0].json()["categories"] == []
@@ -1,34 +1,5 @@
 import pytest
 from decimal import Decimal
-from app.models.user import UserRole
-
-
-@pytest.fixture
-async def admin_user(db_session):
-    from app.schemas.user import UserCreate
-    from app.services.auth import AuthService
-
-    service = AuthService(db_session)
-    user_data = UserCreate(
-        email="admin@test.com",
-        password="admin123456",
-        full_name="Admin User"
-    )
-    user = await service.register(user_data)
-    user.role = UserRole.ADMIN
-    await db_session.commit()
-    await db_session.refresh(user)
-    return user
-
-
-@pytest.fixture
-async def admin_auth_headers(client, admin_user):
-    response = await client.post(
-        "/auth/login",
-        json={"email": admin_user.email, "password": "admin123456"}
-    )
-    tokens = response.json()
-    return {"Authorization": f"Bearer {tokens['access_token']}"}
 
 
 @pytest.mark.asyncio
@@ -150,3 +121,32 @@ class TestCartRouter:
             json={"book_id": 99999, "quantity": 1}
         )
         assert response.status_code == 404
+
+    async def test_batch_update_cart(self, client, auth_headers, sample_book_for_router):
+        response = await client.post(
+            "/cart/items:batch",
+            headers=auth_headers,
+            json={"items": [
+                {"book_id": sample_book_for_router.id, "quantity": 2},
+                {"book_id": sample_book_for_router.id, "action": "add", "quantity": 1},
+            ]}
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total_items"] == 3
+        assert data["items"][0]["book"]["id"] == sample_book_for_router.id
+
+        response = await client.post(
+            "/cart/items:batch",
+            headers=auth_headers,
+            json={"items": [{"book_id": sample_book_for_router.id, "action": "remove"}]}
+        )
+        assert response.json()["items"] == []
+
+    async def test_batch_update_cart_validation(self, client, auth_headers):
+        response = await client.post("/cart/items:batch", headers=auth_headers, json={"items": []})
+        assert response.status_code == 422
+        response = await client.post(
+            "/cart/items:batch", headers=auth_headers, json={"items": [{"book_id": 1, "action": "double"}]}
+        )
+        assert response.status_code == 422
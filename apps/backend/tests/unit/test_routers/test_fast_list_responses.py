@@ -0,0 +1,82 @@
+import pytest
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from app.config import get_settings
+from app.models.order import Order, OrderItem, OrderStatus
+from app.models.review import Review
+
+
+@pytest.fixture
+def no_response_cache(monkeypatch):
+    monkeypatch.setattr(get_settings(), "response_cache_enabled", False)
+
+
+async def both_paths(client, monkeypatch, url, **kwargs):
+    """The same request answered by the orjson path and by the response-model path."""
+    monkeypatch.setattr(get_settings(), "fast_list_responses", True)
+    fast = await client.get(url, **kwargs)
+    monkeypatch.setattr(get_settings(), "fast_list_responses", False)
+    validated = await client.get(url, **kwargs)
+    assert fast.status_code == validated.status_code == 200
+    return fast.json(), validated.json()
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("no_response_cache")
+class TestFastListResponses:
+    async def test_books_match_response_model(self, client, monkeypatch, db_session, sample_book_for_router):
+        sample_book_for_router.created_at = datetime(2024, 5, 1, 12, 30, 15, 123456)
+        await db_session.commit()
+
+        fast, validated = await both_paths(client, monkeypatch, "/books?size=1&facets=price&facets=category")
+        assert fast == validated
+        assert fast["items"][0]["price"] == "24.99"
+        assert fast["items"][0]["categories"][0]["name"] == "Fiction"
+        assert fast["facets"]["price"][0] == {"min": "0", "max": "10", "count": 0}
+
+    async def test_books_cursor_matches(self, client, monkeypatch, db_session, sample_book_for_router, sample_book):
+        fast, validated = await both_paths(client, monkeypatch, "/books?size=1&sort_by=title&sort_order=asc")
+        assert fast == validated
+        assert fast["next_cursor"]
+
+        url = f"/books?size=1&sort_by=title&sort_order=asc&cursor={fast['next_cursor']}"
+        fast, validated = await both_paths(client, monkeypatch, url)
+        assert fast == validated
+        assert fast["items"][0]["title"] == "Test Book"
+
+    async def test_orders_match_response_model(
+        self, client, monkeypatch, db_session, auth_headers, sample_user_with_password, sample_book_for_router
+    ):
+        user = sample_user_with_password
+        for days, quantities in ((2, (1, 3)), (1, ())):
+            order = Order(
+                user_id=user.id, total_amount=Decimal("30.00"), shipping_address="1 Test Street",
+                status=OrderStatus.PAID, created_at=datetime.utcnow() - timedelta(days=days),
+            )
+            order.items = [
+                OrderItem(book_id=sample_book_for_router.id, quantity=quantity, price_at_purchase=Decimal("24.99"))
+                for quantity in quantities
+            ]
+            db_session.add(order)
+        await db_session.commit()
+
+        fast, validated = await both_paths(client, monkeypatch, "/orders?size=1", headers=auth_headers)
+        assert fast == validated
+        assert fast["items"][0]["item_count"] == 0
+        assert fast["items"][0]["status"] == "paid"
+
+        fast, _ = await both_paths(client, monkeypatch, "/orders", headers=auth_headers)
+        assert [order["item_count"] for order in fast["items"]] == [0, 4]
+
+    async def test_reviews_match_response_model(self, client, monkeypatch, db_session, sample_user, sample_book_for_router):
+        db_session.add(Review(user_id=sample_user.id, book_id=sample_book_for_router.id, rating=4, comment="Good"))
+        await db_session.commit()
+
+        fast, validated = await both_paths(client, monkeypatch, f"/books/{sample_book_for_router.id}/reviews")
+        assert fast == validated
+        assert fast["items"][0]["reviewer_name"] == "Test User"
+
+    async def test_reviews_for_missing_book(self, client):
+        response = await client.get("/books/99999/reviews")
+        assert response.status_code == 404
@@ -0,0 +1,26 @@
+import pytest
+
+from app.config import get_settings
+from app.utils.metrics import CONTENT_TYPE
+
+
+@pytest.mark.asyncio
+class TestMetricsRouter:
+    async def test_exports_route_and_query_metrics(self, client, sample_book_for_router):
+        await client.get(f"/books/{sample_book_for_router.id}")
+        await client.get("/no-such-path")
+
+        response = await client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"] == f"{CONTENT_TYPE}; charset=utf-8"
+        text = response.text
+        assert 'http_requests_total{method="GET",route="/books/{book_id}",status="200"}' in text
+        assert 'http_request_duration_seconds_bucket{method="GET",route="/books/{book_id}",le="+Inf"}' in text
+        assert 'http_requests_total{method="GET",route="unmatched",status="404"}' in text
+        assert 'http_requests_in_progress{method="GET"} 1' in text
+        assert 'db_query_duration_seconds_count{operation="SELECT"}' in text
+        assert "# TYPE db_pool_checkout_wait_seconds histogram" in text
+
+    async def test_can_be_disabled(self, client, monkeypatch):
+        monkeypatch.setattr(get_settings(), "metrics_enabled", False)
+        assert (await client.get("/metrics")).status_code == 404
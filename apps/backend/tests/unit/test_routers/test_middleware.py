@@ -0,0 +1,13 @@
+import pytest
+
+from app.config import get_settings
+
+
+@pytest.mark.asyncio
+class TestRequestMiddleware:
+    async def test_server_timing_reports_queries(self, client, auth_headers, monkeypatch):
+        assert "server-timing" not in (await client.get("/cart", headers=auth_headers)).headers
+        monkeypatch.setattr(get_settings(), "server_timing", True)
+        response = await client.get("/cart", headers=auth_headers)
+        assert response.headers["server-timing"].startswith("db;dur=")
+        assert " queries, " in response.headers["server-timing"]
@@ -0,0 +1,121 @@
+"""Query budgets per endpoint.
+
+Each case makes one request against a small catalog, with several rows
+behind every list so that a per-row lookup shows up, and fails if the
+request issues more statements than its budget or runs any statement
+more than once. Lower a budget when a change saves queries; raising one
+needs a reason in review.
+"""
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import select
+
+from app.models.book import Book
+from app.models.cart import CartItem
+from app.models.order import Order, OrderItem, OrderStatus, OrderStatusHistory
+from app.models.review import Review
+from app.models.user import User
+
+# label: (budget, request). Authenticated requests spend two queries on the token blacklist and the user
+BUDGETS = {
+    "GET /books": (4, lambda client, ctx: client.get("/books")),
+    "GET /books?category_id": (4, lambda client, ctx: client.get(f"/books?category_id={ctx.category.id}")),
+    "GET /books/{id}": (3, lambda client, ctx: client.get(f"/books/{ctx.books[0].id}")),
+    "GET /books/{id}/reviews": (3, lambda client, ctx: client.get(f"/books/{ctx.books[0].id}/reviews")),
+    "GET /books/{id}/recommendations": (
+        3, lambda client, ctx: client.get(f"/books/{ctx.books[0].id}/recommendations"),
+    ),
+    "GET /categories": (2, lambda client, ctx: client.get("/categories")),
+    "POST /books": (6, lambda client, ctx: client.post("/books", headers=ctx.admin, json={
+        "title": "Budget Book", "author": "Budget Author", "isbn": "9999999999999",
+        "price": "12.50", "stock_quantity": 3, "category_ids": [ctx.category.id],
+    })),
+    "GET /cart": (5, lambda client, ctx: client.get("/cart", headers=ctx.user)),
+    "POST /cart/items": (6, lambda client, ctx: client.post(
+        "/cart/items", headers=ctx.user, json={"book_id": ctx.books[2].id, "quantity": 1},
+    )),
+    "POST /cart/items (existing)": (6, lambda client, ctx: client.post(
+        "/cart/items", headers=ctx.user, json={"book_id": ctx.books[0].id, "quantity": 1},
+    )),
+    "POST /cart/items:batch": (9, lambda client, ctx: client.post("/cart/items:batch", headers=ctx.user, json={
+        "items": [
+            {"book_id": ctx.books[0].id, "action": "add"},
+            {"book_id": ctx.books[1].id, "action": "remove"},
+            {"book_id": ctx.books[2].id, "action": "set", "quantity": 2},
+        ],
+    })),
+    "POST /orders": (11, lambda client, ctx: client.post(
+        "/orders", headers=ctx.user, json={"shipping_address": "1 Budget Street, Testville"},
+    )),
+    "GET /orders": (4, lambda client, ctx: client.get("/orders", headers=ctx.user)),
+    "GET /orders/{id}": (6, lambda client, ctx: client.get(f"/orders/{ctx.order.id}", headers=ctx.user)),
+    "GET /admin/orders": (4, lambda client, ctx: client.get("/admin/orders", headers=ctx.admin)),
+    "GET /admin/reviews/pending": (6, lambda client, ctx: client.get("/admin/reviews/pending", headers=ctx.admin)),
+}
+
+
+@pytest.fixture
+async def catalog(db_session, sample_category, sample_user_with_password, auth_headers, admin_auth_headers):
+    books = [
+        Book(
+            title=f"Budget Book {i}", author=f"Author {i}", isbn=f"400000000000{i}",
+            price=Decimal("10.00") + i, stock_quantity=20, categories=[sample_category],
+        )
+        for i in range(3)
+    ]
+    readers = [User(email=f"reader{i}@example.com", full_name=f"Reader {i}") for i in range(3)]
+    db_session.add_all(books + readers)
+    await db_session.flush()
+
+    user_id = sample_user_with_password.id
+    order = Order(
+        user_id=user_id, status=OrderStatus.PAID, total_amount=Decimal("33.00"),
+        shipping_address="1 Budget Street, Testville",
+    )
+    order.items = [OrderItem(book_id=book.id, quantity=1, price_at_purchase=book.price) for book in books]
+    order.status_history = [OrderStatusHistory(status=OrderStatus.PAID)]
+    db_session.add(order)
+    db_session.add_all(
+        Review(user_id=reader.id, book_id=book.id, rating=4, comment="Fine", is_approved=i % 3 != 0)
+        for i, (reader, book) in enumerate((reader, book) for reader in readers for book in books)
+    )
+    db_session.add_all(CartItem(user_id=user_id, book_id=book.id, quantity=1) for book in books[:2])
+    await db_session.commit()
+    return SimpleNamespace(
+        books=books, category=sample_category, order=order, user=auth_headers, admin=admin_auth_headers,
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("label", list(BUDGETS))
+async def test_endpoint_query_budget(client, catalog, query_log, label):
+    budget, request = BUDGETS[label]
+    with query_log:
+        response = await request(client, catalog)
+
+    assert response.status_code < 400, response.text
+    query_log.assert_within(budget)
+
+
+@pytest.mark.asyncio
+async def test_query_log_flags_per_row_lookups(db_session, query_log, catalog):
+    with query_log:
+        for book in catalog.books:
+            await db_session.execute(select(Review).where(Review.book_id == book.id))
+
+    assert query_log.count == 3
+    assert list(query_log.repeated().values()) == [3]
+    with pytest.raises(AssertionError, match="Repeated statements"):
+        query_log.assert_within(10)
+
+
+@pytest.mark.asyncio
+async def test_query_log_treats_in_lists_of_any_length_alike(db_session, query_log, catalog):
+    ids = [book.id for book in catalog.books]
+    with query_log:
+        await db_session.execute(select(Book.id).where(Book.id.in_(ids[:1])))
+        await db_session.execute(select(Book.id).where(Book.id.in_(ids)))
+
+    assert list(query_log.repeated().values()) == [2]
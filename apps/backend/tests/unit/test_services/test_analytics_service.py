@@ -0,0 +1,162 @@
+import pytest
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from app.exceptions import BadRequestException
+from app.models.analytics import DailyStats
+from app.models.book import Book
+from app.models.order import Order, OrderStatus
+from app.models.user import User
+from app.repositories.analytics import AnalyticsRepository
+from app.repositories.book import BookRepository
+from app.repositories.order import OrderRepository
+from app.services.analytics import AnalyticsService, Granularity
+
+NOW = datetime.utcnow()
+TODAY = NOW.date()
+
+
+def days_ago(days: int) -> datetime:
+    return NOW - timedelta(days=days)
+
+
+@pytest.fixture
+async def history(db_session):
+    """Three users, two books and four orders spread over the last ten days."""
+    users = [
+        User(email="old@example.com", full_name="Old", created_at=days_ago(10)),
+        User(email="mid@example.com", full_name="Mid", created_at=days_ago(3)),
+        User(email="new@example.com", full_name="New", created_at=NOW),
+    ]
+    books = [
+        Book(title="Old Book", author="A", isbn="7000000000001", price=Decimal("10.00"), created_at=days_ago(10)),
+        Book(title="New Book", author="A", isbn="7000000000002", price=Decimal("20.00"), created_at=days_ago(1)),
+    ]
+    db_session.add_all(users + books)
+    await db_session.flush()
+    orders = [
+        Order(user_id=users[0].id, total_amount=Decimal("10.00"), shipping_address="x",
+              status=OrderStatus.COMPLETED, created_at=days_ago(9)),
+        Order(user_id=users[0].id, total_amount=Decimal("25.00"), shipping_address="x",
+              status=OrderStatus.PENDING, created_at=days_ago(3)),
+        Order(user_id=users[1].id, total_amount=Decimal("5.00"), shipping_address="x",
+              status=OrderStatus.CANCELLED, created_at=days_ago(2)),
+        Order(user_id=users[2].id, total_amount=Decimal("7.50"), shipping_address="x",
+              status=OrderStatus.PAID, created_at=NOW),
+    ]
+    db_session.add_all(orders)
+    await db_session.commit()
+    return {"users": users, "books": books, "orders": orders}
+
+
+@pytest.mark.asyncio
+class TestAnalyticsService:
+    async def test_totals_from_rollups_and_today(self, db_session, history):
+        service = AnalyticsService(db_session)
+        await service.roll_up_closed_days()
+        analytics = await service.get_analytics()
+
+        assert analytics["total_orders"] == 4
+        assert analytics["total_revenue"] == Decimal("17.50")
+        assert analytics["pending_orders"] == 1
+        assert analytics["total_users"] == 3
+        assert analytics["total_books"] == 2
+        assert analytics["total_reviews"] == 0
+        assert analytics["series"] == []
+
+        latest = await AnalyticsRepository(db_session).get_latest_day()
+        assert latest == TODAY - timedelta(days=1)
+
+    async def test_reads_count_days_not_rolled_up_yet(self, db_session, history):
+        analytics = await AnalyticsService(db_session).get_analytics(granularity=Granularity.DAY)
+
+        assert analytics["total_orders"] == 4
+        assert analytics["total_revenue"] == Decimal("17.50")
+        assert analytics["total_users"] == 3
+        assert analytics["total_books"] == 2
+        assert sum(point["orders"] for point in analytics["series"]) == 4
+        assert await AnalyticsRepository(db_session).get_latest_day() is None
+
+    async def test_reads_combine_rollups_with_later_days(self, db_session, history):
+        service = AnalyticsService(db_session)
+        await AnalyticsRepository(db_session).roll_up(days_ago(10).date(), TODAY - timedelta(days=2))
+        await db_session.commit()
+
+        analytics = await service.get_analytics()
+        assert analytics["total_orders"] == 4
+        assert analytics["total_users"] == 3
+        assert analytics["total_books"] == 2
+
+    async def test_rolls_up_each_day_once(self, db_session, history):
+        service = AnalyticsService(db_session)
+        await service.roll_up_closed_days()
+        rows = await AnalyticsRepository(db_session).get_daily_stats(None, TODAY)
+        assert len(rows) == 10
+
+        # A row backdated after the rollup is not picked up again
+        db_session.add(User(email="late@example.com", full_name="Late", created_at=days_ago(5)))
+        await db_session.commit()
+        await service.roll_up_closed_days()
+        analytics = await service.get_analytics()
+        assert analytics["total_users"] == 3
+
+    async def test_status_change_moves_closed_day(self, db_session, history):
+        service = AnalyticsService(db_session)
+        await service.roll_up_closed_days()
+
+        pending = history["orders"][1]
+        await OrderRepository(db_session).add_status_history(pending, OrderStatus.PAID)
+
+        analytics = await service.get_analytics()
+        assert analytics["pending_orders"] == 0
+        assert analytics["total_orders"] == 4
+        assert analytics["total_revenue"] == Decimal("42.50")
+
+    async def test_soft_delete_removes_book(self, db_session, history):
+        service = AnalyticsService(db_session)
+        await service.roll_up_closed_days()
+
+        await BookRepository(db_session).soft_delete(history["books"][0])
+        analytics = await service.get_analytics()
+        assert analytics["total_books"] == 1
+
+    @pytest.mark.parametrize("rolled_up", [True, False])
+    async def test_date_range(self, db_session, history, rolled_up):
+        service = AnalyticsService(db_session)
+        if rolled_up:
+            await service.roll_up_closed_days()
+        analytics = await service.get_analytics(
+            from_date=TODAY - timedelta(days=3), to_date=TODAY - timedelta(days=1)
+        )
+        assert analytics["total_orders"] == 2
+        assert analytics["total_revenue"] == Decimal("0.00")
+        assert analytics["total_users"] == 1
+        assert analytics["total_books"] == 1
+
+    async def test_daily_series(self, db_session, history):
+        analytics = await AnalyticsService(db_session).get_analytics(
+            from_date=TODAY - timedelta(days=3), granularity=Granularity.DAY
+        )
+        series = analytics["series"]
+        assert [point["period"] for point in series] == [TODAY - timedelta(days=d) for d in (3, 2, 1, 0)]
+        assert [point["orders"] for point in series] == [1, 1, 0, 1]
+        assert series[-1]["revenue"] == Decimal("7.50")
+        assert series[-1]["new_users"] == 1
+
+    async def test_monthly_series_covers_all_days(self, db_session, history):
+        analytics = await AnalyticsService(db_session).get_analytics(granularity=Granularity.MONTH)
+        series = analytics["series"]
+        assert series[0]["period"] == days_ago(10).date().replace(day=1)
+        assert sum(point["orders"] for point in series) == 4
+        assert sum(point["new_users"] for point in series) == 3
+
+    async def test_empty_database(self, db_session):
+        analytics = await AnalyticsService(db_session).get_analytics(granularity=Granularity.WEEK)
+        assert analytics["total_orders"] == 0
+        assert analytics["total_revenue"] == Decimal("0.00")
+        assert len(analytics["series"]) == 1
+        assert await db_session.get(DailyStats, TODAY) is None
+
+    async def test_from_after_to(self, db_session):
+        with pytest.raises(BadRequestException):
+            await AnalyticsService(db_session).get_analytics(from_date=TODAY, to_date=TODAY - timedelta(days=1))
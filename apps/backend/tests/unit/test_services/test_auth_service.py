@@ -1,12 +1,26 @@
 import pytest
+from datetime import datetime, timedelta
 
 from app.models.user import User, UserRole
 from app.services.auth import AuthService
 from app.schemas.user import UserCreate, UserLogin
-from app.utils.security import get_password_hash, create_access_token
+from app.utils.security import get_password_hash, create_access_token, decode_token, token_identifier
+from app.utils.auth_cache import invalidate_user, token_cache, user_cache
+from app.utils.revocation import revocations
 from app.exceptions import ConflictException, UnauthorizedException, NotFoundException
 
 
+def jti_of(token: str) -> str:
+    return token_identifier(token, decode_token(token))
+
+
+@pytest.fixture(autouse=True)
+def reset_revocations():
+    revocations.reset()
+    yield
+    revocations.reset()
+
+
 @pytest.mark.asyncio
 class TestAuthService:
     async def test_register_success(self, db_session):
@@ -74,13 +88,13 @@ class TestAuthService:
         assert new_tokens.access_token is not None
         assert new_tokens.refresh_token is not None
         assert new_tokens.access_token != refresh_token
-        assert await service.user_repo.is_token_blacklisted(refresh_token) is True
+        assert await service.user_repo.is_token_blacklisted(jti_of(refresh_token)) is True
 
     async def test_refresh_token_blacklisted(self, db_session, sample_user):
         service = AuthService(db_session)
         from app.utils.security import create_refresh_token
         refresh_token = create_refresh_token(sample_user.id)
-        await service.user_repo.blacklist_token(refresh_token)
+        await service.user_repo.blacklist_token(jti_of(refresh_token), datetime.utcnow() + timedelta(days=1))
 
         with pytest.raises(UnauthorizedException) as exc_info:
             await service.refresh_token(refresh_token)
@@ -108,7 +122,7 @@ class TestAuthService:
         access_token = create_access_token(sample_user.id)
 
         await service.logout(access_token, None)
-        assert await service.user_repo.is_token_blacklisted(access_token) is True
+        assert await service.user_repo.is_token_blacklisted(jti_of(access_token)) is True
 
     async def test_logout_with_both_tokens(self, db_session, sample_user):
         service = AuthService(db_session)
@@ -117,8 +131,8 @@ class TestAuthService:
         refresh_token = create_refresh_token(sample_user.id)
 
         await service.logout(access_token, refresh_token)
-        assert await service.user_repo.is_token_blacklisted(access_token) is True
-        assert await service.user_repo.is_token_blacklisted(refresh_token) is True
+        assert await service.user_repo.is_token_blacklisted(jti_of(access_token)) is True
+        assert await service.user_repo.is_token_blacklisted(jti_of(refresh_token)) is True
 
     async def test_get_current_user_success(self, db_session, sample_user):
         service = AuthService(db_session)
@@ -131,7 +145,7 @@ class TestAuthService:
     async def test_get_current_user_blacklisted_token(self, db_session, sample_user):
         service = AuthService(db_session)
         access_token = create_access_token(sample_user.id)
-        await service.user_repo.blacklist_token(access_token)
+        await service.user_repo.blacklist_token(jti_of(access_token), datetime.utcnow() + timedelta(days=1))
 
         with pytest.raises(UnauthorizedException) as exc_info:
             await service.get_current_user(access_token)
@@ -163,3 +177,113 @@ class TestAuthService:
         with pytest.raises(UnauthorizedException) as exc_info:
             await service.get_current_user(access_token)
         assert "User account is disabled" in str(exc_info.value.detail)
+
+    async def test_get_current_user_served_from_cache(self, db_session, sample_user):
+        service = AuthService(db_session)
+        access_token = create_access_token(sample_user.id)
+        await service.get_current_user(access_token)
+        db_session.expunge_all()
+
+        user = await service.get_current_user(access_token)
+        assert user.email == sample_user.email
+        assert user in db_session
+        assert token_cache.hits == 1
+        assert user_cache.hits == 1
+
+    async def test_cached_user_can_be_updated(self, db_session, sample_user):
+        service = AuthService(db_session)
+        access_token = create_access_token(sample_user.id)
+        await service.get_current_user(access_token)
+        db_session.expunge_all()
+
+        user = await service.get_current_user(access_token)
+        await service.user_repo.update(user, {"full_name": "Renamed"})
+        invalidate_user(user.id)
+        db_session.expunge_all()
+
+        refreshed = await service.user_repo.get(sample_user.id)
+        assert refreshed.full_name == "Renamed"
+
+    async def test_logout_evicts_cached_token(self, db_session, sample_user):
+        service = AuthService(db_session)
+        access_token = create_access_token(sample_user.id)
+        await service.get_current_user(access_token)
+
+        await service.logout(access_token)
+        with pytest.raises(UnauthorizedException) as exc_info:
+            await service.get_current_user(access_token)
+        assert "Token has been revoked" in str(exc_info.value.detail)
+
+    async def test_invalidate_user_drops_snapshot(self, db_session, sample_user):
+        service = AuthService(db_session)
+        access_token = create_access_token(sample_user.id)
+        await service.get_current_user(access_token)
+
+        await service.user_repo.update(sample_user, {"is_active": False})
+        invalidate_user(sample_user.id)
+        with pytest.raises(UnauthorizedException) as exc_info:
+            await service.get_current_user(access_token)
+        assert "User account is disabled" in str(exc_info.value.detail)
+
+    async def test_logout_skips_invalid_tokens(self, db_session, sample_user):
+        service = AuthService(db_session)
+        await service.logout("invalid.token", None)
+        assert await service.user_repo.get_blacklisted_tokens(datetime.utcnow()) == []
+
+    async def test_logout_twice(self, db_session, sample_user):
+        service = AuthService(db_session)
+        access_token = create_access_token(sample_user.id)
+        await service.logout(access_token)
+        await service.logout(access_token)
+        assert len(await service.user_repo.get_blacklisted_tokens(datetime.utcnow())) == 1
+
+    async def test_revocation_checked_in_memory_once_loaded(self, db_session, sample_user):
+        service = AuthService(db_session)
+        revoked = create_access_token(sample_user.id)
+        await service.user_repo.blacklist_token(jti_of(revoked), datetime.utcnow() + timedelta(days=1))
+        await service.load_revocations()
+        await service.user_repo.delete_expired_tokens(datetime.utcnow() + timedelta(days=2))
+
+        with pytest.raises(UnauthorizedException) as exc_info:
+            await service.get_current_user(revoked)
+        assert "Token has been revoked" in str(exc_info.value.detail)
+
+        user = await service.get_current_user(create_access_token(sample_user.id))
+        assert user.id == sample_user.id
+
+    async def test_logout_updates_loaded_revocations(self, db_session, sample_user):
+        service = AuthService(db_session)
+        await service.load_revocations()
+        access_token = create_access_token(sample_user.id)
+        await service.logout(access_token)
+        assert jti_of(access_token) in revocations
+
+    async def test_legacy_token_without_jti_revoked_by_digest(self, db_session, sample_user):
+        from jose import jwt
+        from app.config import get_settings
+        settings = get_settings()
+        legacy = jwt.encode(
+            {"sub": str(sample_user.id), "exp": datetime.utcnow() + timedelta(minutes=5), "type": "access"},
+            settings.secret_key,
+            algorithm=settings.algorithm,
+        )
+        service = AuthService(db_session)
+        await service.logout(legacy)
+        with pytest.raises(UnauthorizedException):
+            await service.get_current_user(legacy)
+
+    async def test_sweep_revocations(self, db_session, sample_user):
+        service = AuthService(db_session)
+        now = datetime.utcnow()
+        await service.user_repo.blacklist_token("expired", now - timedelta(minutes=1))
+        await service.user_repo.blacklist_token("live", now + timedelta(minutes=5))
+        await service.load_revocations()
+        revocations.add("expired", now - timedelta(minutes=1))
+        await service.user_repo.blacklist_token("from-other-worker", now + timedelta(minutes=5))
+
+        deleted = await service.sweep_revocations()
+        assert deleted == 1
+        assert "expired" not in revocations
+        assert "live" in revocations
+        assert "from-other-worker" in revocations
+        assert await service.user_repo.is_token_blacklisted("expired") is False
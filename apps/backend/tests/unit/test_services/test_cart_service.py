@@ -1,8 +1,13 @@
 import pytest
+from datetime import datetime, timedelta
 from decimal import Decimal
 
+from sqlalchemy import update
+
+from app.models.book import Book
+from app.models.cart import CartItem
 from app.services.cart import CartService
-from app.schemas.cart import CartItemCreate, CartItemUpdate
+from app.schemas.cart import CartBatchRequest, CartItemCreate, CartItemUpdate
 from app.exceptions import NotFoundException, BadRequestException
 
 
@@ -139,3 +144,106 @@ class TestCartService:
 
         cart = await service.get_cart(sample_user.id)
         assert cart.total_items >= 3
+
+
+@pytest.fixture
+async def second_book(db_session):
+    book = Book(title="Second Book", author="Second Author", isbn="2222222222222", price=Decimal("5.00"), stock_quantity=3)
+    db_session.add(book)
+    await db_session.commit()
+    return book
+
+
+def batch(*items: tuple) -> CartBatchRequest:
+    return CartBatchRequest(items=[
+        {"book_id": book_id, "action": action, "quantity": quantity} for book_id, action, quantity in items
+    ])
+
+
+@pytest.mark.asyncio
+class TestCartBatch:
+    async def test_adds_to_existing_and_inserts_new(self, db_session, sample_user, sample_cart_item, second_book):
+        service = CartService(db_session)
+        cart = await service.apply_batch(
+            sample_user.id, batch((sample_cart_item.book_id, "add", 3), (second_book.id, "add", 1))
+        )
+        quantities = {item.book_id: item.quantity for item in cart.items}
+        assert quantities == {sample_cart_item.book_id: 5, second_book.id: 1}
+        assert cart.subtotal == sample_cart_item.book.price * 5 + second_book.price
+
+    async def test_set_and_remove(self, db_session, sample_user, sample_cart_item, second_book):
+        service = CartService(db_session)
+        cart = await service.apply_batch(
+            sample_user.id, batch((sample_cart_item.book_id, "remove", 1), (second_book.id, "set", 2))
+        )
+        assert [(item.book_id, item.quantity) for item in cart.items] == [(second_book.id, 2)]
+
+    async def test_operations_on_one_book_apply_in_order(self, db_session, sample_user, sample_cart_item):
+        service = CartService(db_session)
+        book_id = sample_cart_item.book_id
+        cart = await service.apply_batch(
+            sample_user.id, batch((book_id, "add", 1), (book_id, "remove", 1), (book_id, "add", 4), (book_id, "add", 1))
+        )
+        assert [item.quantity for item in cart.items] == [5]
+
+    async def test_short_stock_writes_nothing(self, db_session, sample_user, sample_cart_item, second_book):
+        service = CartService(db_session)
+        with pytest.raises(BadRequestException) as exc_info:
+            await service.apply_batch(
+                sample_user.id, batch((sample_cart_item.book_id, "set", 1), (second_book.id, "add", 4))
+            )
+        assert f"Only 3 items of book {second_book.id} available" in str(exc_info.value.detail)
+
+        cart = await service.get_cart(sample_user.id, populate_existing=True)
+        assert [(item.book_id, item.quantity) for item in cart.items] == [(sample_cart_item.book_id, 2)]
+
+    async def test_missing_book_writes_nothing(self, db_session, sample_user, sample_cart_item):
+        service = CartService(db_session)
+        with pytest.raises(NotFoundException):
+            await service.apply_batch(
+                sample_user.id, batch((sample_cart_item.book_id, "remove", 1), (99999, "add", 1))
+            )
+
+        cart = await service.get_cart(sample_user.id, populate_existing=True)
+        assert len(cart.items) == 1
+
+    async def test_expired_item_is_replaced_not_added_to(self, db_session, sample_user, sample_cart_item):
+        added_at = datetime.utcnow() - timedelta(days=8)
+        sample_cart_item.added_at = added_at
+        sample_cart_item.expires_at = added_at + timedelta(days=7)
+        await db_session.commit()
+
+        service = CartService(db_session)
+        cart = await service.apply_batch(sample_user.id, batch((sample_cart_item.book_id, "add", 1)))
+        assert [item.quantity for item in cart.items] == [1]
+        assert cart.items[0].expires_at > datetime.utcnow()
+        assert cart.items[0].added_at > added_at
+
+    @pytest.mark.parametrize("in_cart", [True, False])
+    async def test_interleaved_add_batches_both_count(
+        self, db_session, sample_user, sample_cart_item, second_book, monkeypatch, in_cart
+    ):
+        book_id = sample_cart_item.book_id if in_cart else second_book.id
+        first, second = CartService(db_session), CartService(db_session)
+        get_stocks = first.inventory_service.get_stocks
+
+        async def stocks_then_other_batch(book_ids):
+            # The other batch runs between this one's reads and its write
+            stocks = await get_stocks(book_ids)
+            await second.apply_batch(sample_user.id, batch((book_id, "add", 1)))
+            return stocks
+
+        monkeypatch.setattr(first.inventory_service, "get_stocks", stocks_then_other_batch)
+        cart = await first.apply_batch(sample_user.id, batch((book_id, "add", 1)))
+        quantities = {item.book_id: item.quantity for item in cart.items}
+        assert quantities[book_id] == (4 if in_cart else 2)
+
+    async def test_short_stock_on_adds_writes_nothing(self, db_session, sample_user, sample_cart_item, second_book):
+        user_id, book_id, second_id = sample_user.id, sample_cart_item.book_id, second_book.id
+        service = CartService(db_session)
+        with pytest.raises(BadRequestException) as exc_info:
+            await service.apply_batch(user_id, batch((book_id, "add", 1), (second_id, "add", 4)))
+        assert f"Only 3 items of book {second_id} available" in str(exc_info.value.detail)
+
+        cart = await service.get_cart(user_id, populate_existing=True)
+        assert [(item.book_id, item.quantity) for item in cart.items] == [(book_id, 2)]
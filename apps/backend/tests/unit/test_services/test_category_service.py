@@ -0,0 +1,131 @@
+import pytest
+from decimal import Decimal
+from sqlalchemy import event
+
+from app.exceptions import NotFoundException
+from app.models.book import Book
+from app.models.category import Category
+from app.schemas.book import BookCreate, BookSearchParams, BookUpdate
+from app.schemas.category import CategoryCreate, CategoryUpdate
+from app.services.book import BookService
+from app.services.category import CategoryService
+from app.services.category_registry import CategoryRegistry, category_registry
+from app.utils.response_cache import CATEGORIES, response_cache
+
+
+@pytest.fixture
+def statements(db_engine):
+    """SQL statements executed while the test runs."""
+    executed = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        executed.append(statement)
+
+    event.listen(db_engine.sync_engine, "before_cursor_execute", record)
+    yield executed
+    event.remove(db_engine.sync_engine, "before_cursor_execute", record)
+
+
+@pytest.mark.asyncio
+class TestCategoryService:
+    async def test_lists_from_registry(self, db_session, sample_category, statements):
+        service = CategoryService(db_session)
+        categories = await service.get_all_categories()
+        assert [category.name for category in categories] == ["Fiction"]
+
+        statements.clear()
+        assert (await service.get_category(sample_category.id)).name == "Fiction"
+        assert await service.get_all_categories() == categories
+        assert statements == []
+
+    async def test_get_category_not_found(self, db_session, sample_category):
+        with pytest.raises(NotFoundException):
+            await CategoryService(db_session).get_category(99999)
+
+    async def test_writes_refresh_registry(self, db_session, sample_category):
+        service = CategoryService(db_session)
+        await service.get_all_categories()
+
+        created = await service.create_category(CategoryCreate(name="Poetry"))
+        await service.update_category(sample_category.id, CategoryUpdate(name="Novels"))
+        assert {category.name for category in await service.get_all_categories()} == {"Novels", "Poetry"}
+
+        await service.delete_category(created.id)
+        assert [category.name for category in category_registry.snapshot.categories] == ["Novels"]
+
+    async def test_book_list_attaches_categories_without_join(self, db_session, sample_book, sample_category, statements):
+        service = BookService(db_session)
+        await service.search_books(BookSearchParams())
+
+        statements.clear()
+        page = await service.search_books(BookSearchParams())
+        assert page.items[0].categories[0].name == "Fiction"
+        assert not any("book_categories" in statement for statement in statements)
+
+    async def test_membership_changes_reload(self, db_session, sample_book, sample_category):
+        other = Category(name="History")
+        db_session.add(other)
+        await db_session.commit()
+        service = BookService(db_session)
+        await service.search_books(BookSearchParams())
+
+        await service.update_book(sample_book.id, BookUpdate(category_ids=[other.id]))
+        await service.create_book(BookCreate(
+            title="Second", author="Author", isbn="5550000000001", price=Decimal("5.00"),
+            category_ids=[sample_category.id, other.id],
+        ))
+
+        page = await service.search_books(BookSearchParams(sort_by="title", sort_order="asc"))
+        assert [[category.name for category in item.categories] for item in page.items] == [
+            ["Fiction", "History"],
+            ["History"],
+        ]
+
+    async def test_membership_change_applied_without_reload(self, db_session, sample_book, monkeypatch):
+        other = Category(name="History")
+        db_session.add(other)
+        await db_session.commit()
+        service = BookService(db_session)
+        await service.search_books(BookSearchParams())
+        categories_version = await response_cache.version(CATEGORIES)
+
+        async def reload(db):
+            raise AssertionError("registry reloaded")
+
+        monkeypatch.setattr(category_registry, "load", reload)
+        await service.update_book(sample_book.id, BookUpdate(category_ids=[other.id]))
+
+        page = await service.search_books(BookSearchParams())
+        assert [category.name for category in page.items[0].categories] == ["History"]
+        assert await response_cache.version(CATEGORIES) == categories_version
+
+    async def test_other_workers_replay_membership_changes(self, db_session, sample_book, sample_category):
+        other = Category(name="History")
+        db_session.add(other)
+        await db_session.commit()
+        worker = CategoryRegistry()
+        await worker.load(db_session)
+        loaded_at = worker.loaded_at
+
+        await BookService(db_session).update_book(sample_book.id, BookUpdate(category_ids=[sample_category.id, other.id]))
+        snapshot = await worker.sync(db_session)
+        assert [category.name for category in worker.categories_of(sample_book.id, snapshot)] == ["Fiction", "History"]
+        assert worker.loaded_at == loaded_at
+
+    async def test_expired_change_log_reloads(self, db_session, sample_book):
+        worker = CategoryRegistry()
+        await worker.load(db_session)
+        loaded_at = worker.loaded_at
+
+        await BookService(db_session).update_book(sample_book.id, BookUpdate(category_ids=[]))
+        response_cache.local.clear()
+        snapshot = await worker.sync(db_session)
+        assert worker.categories_of(sample_book.id, snapshot) == []
+        assert worker.loaded_at > loaded_at
+
+    async def test_book_without_categories(self, db_session, sample_category):
+        db_session.add(Book(title="Loose", author="Author", isbn="5550000000002", price=Decimal("5.00")))
+        await db_session.commit()
+
+        page = await BookService(db_session).search_books(BookSearchParams())
+        assert page.items[0].categories == []
@@ -0,0 +1,68 @@
+import pytest
+from decimal import Decimal
+
+from app.models.book import Book
+from app.services.inventory import InventoryService
+from app.exceptions import NotFoundException, InsufficientStockException
+
+
+@pytest.fixture
+async def second_book(db_session):
+    book = Book(
+        title="Second Book",
+        author="Another Author",
+        isbn="9999999999999",
+        price=Decimal("5.00"),
+        stock_quantity=2,
+    )
+    db_session.add(book)
+    await db_session.commit()
+    return book
+
+
+@pytest.mark.asyncio
+class TestInventoryService:
+    async def test_get_stocks(self, db_session, sample_book, second_book):
+        service = InventoryService(db_session)
+        stocks = await service.get_stocks([sample_book.id, second_book.id])
+        assert stocks == {sample_book.id: 10, second_book.id: 2}
+
+    async def test_get_stocks_missing_book(self, db_session, sample_book):
+        service = InventoryService(db_session)
+        with pytest.raises(NotFoundException):
+            await service.get_stocks([sample_book.id, 99999])
+
+    async def test_reserve_stock_bulk(self, db_session, sample_book, second_book):
+        service = InventoryService(db_session)
+        await service.reserve_stock_bulk({sample_book.id: 3, second_book.id: 2})
+        await db_session.commit()
+
+        assert sample_book.stock_quantity == 7
+        assert second_book.stock_quantity == 0
+        assert await service.get_stock(sample_book.id) == 7
+
+    async def test_reserve_stock_bulk_shortfall(self, db_session, sample_book, second_book):
+        service = InventoryService(db_session)
+        book_id, second_id = sample_book.id, second_book.id
+        with pytest.raises(InsufficientStockException) as exc_info:
+            await service.reserve_stock_bulk({book_id: 3, second_id: 5})
+        assert "Second Book" in str(exc_info.value.detail)
+
+        await db_session.rollback()
+        assert await service.get_stocks([book_id, second_id]) == {book_id: 10, second_id: 2}
+
+    async def test_reserve_stock_bulk_deleted_book(self, db_session, sample_book):
+        sample_book.is_deleted = True
+        await db_session.commit()
+
+        service = InventoryService(db_session)
+        with pytest.raises(NotFoundException):
+            await service.reserve_stock_bulk({sample_book.id: 1})
+
+    async def test_release_stock_bulk(self, db_session, sample_book, second_book):
+        service = InventoryService(db_session)
+        await service.release_stock_bulk({sample_book.id: 1, second_book.id: 4})
+        await db_session.commit()
+
+        assert sample_book.stock_quantity == 11
+        assert second_book.stock_quantity == 6
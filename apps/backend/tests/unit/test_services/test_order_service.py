@@ -4,7 +4,7 @@ from decimal import Decimal
 from app.services.order import OrderService
 from app.schemas.order import OrderCreate, OrderStatusUpdate
 from app.models.order import OrderStatus
-from app.exceptions import NotFoundException, BadRequestException
+from app.exceptions import NotFoundException, BadRequestException, InsufficientStockException
 
 
 @pytest.mark.asyncio
@@ -159,6 +159,30 @@ class TestOrderService:
         updated_book = await book_repo.get(sample_book.id)
         assert updated_book.stock_quantity == initial_stock
 
+    async def test_create_order_stock_sold_out_after_validation(self, db_session, sample_user, sample_book):
+        from sqlalchemy import func, select, update
+        from app.models.book import Book
+        from app.models.order import Order
+        cart_service = self._get_cart_service(db_session)
+        await cart_service.add_item(sample_user.id, self._get_cart_item_create(sample_book.id, 3))
+
+        service = OrderService(db_session)
+        validate = service.cart_service.validate_cart_for_checkout
+        book_id, user_id = sample_book.id, sample_user.id
+
+        async def validate_then_sell_out(user_id):
+            cart = await validate(user_id)
+            await db_session.execute(update(Book).where(Book.id == book_id).values(stock_quantity=1))
+            return cart
+
+        service.cart_service.validate_cart_for_checkout = validate_then_sell_out
+        order_data = OrderCreate(shipping_address="123 Test Street, Test City, TC 12345")
+        with pytest.raises(InsufficientStockException):
+            await service.create_order(user_id, order_data)
+
+        assert (await db_session.execute(select(func.count(Order.id)))).scalar_one() == 0
+        assert len((await cart_service.get_cart(user_id)).items) == 1
+
     def _get_cart_service(self, db_session):
         from app.services.cart import CartService
         return CartService(db_session)
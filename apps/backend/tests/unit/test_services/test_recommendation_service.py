@@ -0,0 +1,292 @@
+import asyncio
+import time
+
+import pytest
+from decimal import Decimal
+
+from app.models.book import Book
+from app.models.order import Order, OrderItem, OrderStatus, OrderStatusHistory
+from app.schemas.order import OrderStatusUpdate
+from app.services import copurchase
+from app.services.copurchase import CoPurchaseIndex, copurchase_index, merge_rows
+from app.services.order import OrderService
+from app.services.recommendation import RecommendationService
+
+
+@pytest.fixture(autouse=True)
+def reset_index():
+    copurchase_index.reset()
+    yield
+    copurchase_index.reset()
+
+
+@pytest.fixture
+async def books(db_session):
+    books = [
+        Book(title=f"Book {i}", author="Author", isbn=f"97800000000{i:02d}", price=Decimal("10.00"), stock_quantity=50)
+        for i in range(4)
+    ]
+    db_session.add_all(books)
+    await db_session.commit()
+    return books
+
+
+async def place_order(db_session, user, books, status=OrderStatus.PAID) -> Order:
+    order = Order(
+        user_id=user.id,
+        total_amount=Decimal("10.00"),
+        shipping_address="1 Test Street",
+        status=status,
+    )
+    db_session.add(order)
+    await db_session.flush()
+    for book in books:
+        db_session.add(OrderItem(order_id=order.id, book_id=book.id, quantity=1, price_at_purchase=book.price))
+    db_session.add(OrderStatusHistory(order_id=order.id, status=OrderStatus.PENDING))
+    if status == OrderStatus.PAID:
+        db_session.add(OrderStatusHistory(order_id=order.id, status=OrderStatus.PAID))
+    await db_session.commit()
+    return order
+
+
+class TestCoPurchaseIndex:
+    async def test_top_orders_by_count(self):
+        index = CoPurchaseIndex()
+        index.add_order([1, 2, 3])
+        index.add_order([1, 3])
+        await index.compact()
+        assert index.top(1, 5) == [3, 2]
+        assert index.top(1, 1) == [3]
+        assert index.top(2, 5) == [1, 3]
+        assert index.top(99, 5) == []
+
+    async def test_top_merges_uncompacted_orders(self):
+        index = CoPurchaseIndex()
+        index.add_order([1, 2])
+        await index.compact()
+        index.add_order([1, 3])
+        index.add_order([1, 3])
+        assert index.top(1, 5) == [3, 2]
+
+    async def test_top_ranks_deltas_from_deep_in_the_row(self):
+        index = CoPurchaseIndex()
+        for other in range(2, 12):
+            for _ in range(12 - other):
+                index.add_order([1, other])
+        await index.compact()
+        assert index.top(1, 3) == [2, 3, 4]
+
+        # Book 11 sits last in the row with a count of 1; with 10 more it leads
+        for _ in range(10):
+            index.add_order([1, 11])
+        index.add_order([1, 12])
+        assert index.top(1, 3) == [11, 2, 3]
+        assert index.top(1, 20)[-2:] == [10, 12]
+
+    async def test_large_delta_brings_compaction_forward(self, db_session, sample_user, books, monkeypatch):
+        monkeypatch.setattr(copurchase, "MAX_DELTA", 2)
+        index = CoPurchaseIndex()
+        await index.build(db_session)
+        await place_order(db_session, sample_user, books)
+
+        assert await index.catch_up(db_session) == 1
+        assert index.compact_due is True
+        await index._compaction
+        assert index.compact_due is False
+        assert not index._delta
+        assert index.top(books[0].id, 5) == [book.id for book in books[1:]]
+
+    async def test_duplicate_books_in_order_counted_once(self):
+        index = CoPurchaseIndex()
+        index.add_order([1, 2, 2])
+        await index.compact()
+        assert list(index.counts) == [1, 1]
+
+    async def test_compaction_merges_only_touched_rows(self):
+        orders = [[1, 2, 3], [2, 4], [5, 6], [1, 6], [3, 7, 8], [2, 4], [9, 10]]
+        stepwise, whole = CoPurchaseIndex(), CoPurchaseIndex()
+        for order in orders:
+            stepwise.add_order(order)
+            whole.add_order(order)
+            await stepwise.compact()
+        await whole.compact()
+        assert (stepwise.rows, stepwise.indptr, stepwise.indices, stepwise.counts) == (
+            whole.rows, whole.indptr, whole.indices, whole.counts
+        )
+
+    async def test_orders_applied_during_compaction_stay_pending(self, monkeypatch):
+        index = CoPurchaseIndex()
+        index.add_order([1, 2])
+
+        def slow_merge(*args):
+            time.sleep(0.05)
+            return merge_rows(*args)
+
+        monkeypatch.setattr(copurchase, "merge_rows", slow_merge)
+        compaction = asyncio.create_task(index.compact())
+        await asyncio.sleep(0.01)
+        index.add_order([1, 3])
+        index.add_order([1, 3])
+        await compaction
+        assert list(index.rows) == [1, 2]
+        assert index.top(1, 5) == [3, 2]
+        await index.compact()
+        assert index.top(1, 5) == [3, 2]
+        assert not index._delta
+
+    async def test_save_and_load(self, tmp_path):
+        index = CoPurchaseIndex()
+        index.add_order([1, 2, 3])
+        index.add_order([2, 3])
+        index.watermark = 42
+        index.changes = 2
+        path = str(tmp_path / "copurchase.idx")
+        await index.save(path)
+
+        loaded = CoPurchaseIndex()
+        assert loaded.load(path) is True
+        assert loaded.ready is True
+        assert loaded.watermark == 42
+        assert loaded.top(2, 5) == [3, 1]
+
+    async def test_save_skipped_until_an_order_is_applied(self, tmp_path):
+        index = CoPurchaseIndex()
+        index._apply({1: (10, [1, 2])})
+        path = tmp_path / "copurchase.idx"
+        await index.save(str(path))
+        path.unlink()
+
+        await index.save(str(path))
+        assert not path.exists()
+        # A late commit below the watermark is still a change
+        index._apply({2: (5, [1, 3])})
+        await index.save(str(path))
+        assert path.exists()
+
+    def test_load_rejects_missing_or_corrupt_file(self, tmp_path):
+        path = tmp_path / "copurchase.idx"
+        assert CoPurchaseIndex().load(str(path)) is False
+        path.write_bytes(b"garbage")
+        assert CoPurchaseIndex().load(str(path)) is False
+
+
+@pytest.mark.asyncio
+class TestRecommendationService:
+    async def test_build_counts_only_paid_orders(self, db_session, sample_user, books):
+        await place_order(db_session, sample_user, books[:3])
+        await place_order(db_session, sample_user, books[:2])
+        await place_order(db_session, sample_user, [books[0], books[3]], status=OrderStatus.PENDING)
+
+        await copurchase_index.build(db_session)
+        assert copurchase_index.top(books[0].id, 5) == [books[1].id, books[2].id]
+
+    async def test_also_bought_from_index_matches_sql(self, db_session, sample_user, books):
+        await place_order(db_session, sample_user, books[:3])
+        await place_order(db_session, sample_user, books[:2])
+        service = RecommendationService(db_session)
+
+        from_sql = [book.id for book in await service.get_also_bought(books[0].id)]
+        await copurchase_index.build(db_session)
+        from_index = [book.id for book in await service.get_also_bought(books[0].id)]
+
+        assert from_index == [books[1].id, books[2].id]
+        assert from_sql == from_index
+
+    async def test_sql_fallback_ranks_only_paid_orders(self, db_session, sample_user, books):
+        await place_order(db_session, sample_user, books[:2])
+        await place_order(db_session, sample_user, [books[0], books[3]], status=OrderStatus.PENDING)
+        await place_order(db_session, sample_user, [books[0], books[3]], status=OrderStatus.PENDING)
+        service = RecommendationService(db_session)
+
+        from_sql = [book.id for book in await service.get_also_bought(books[0].id)]
+        await copurchase_index.build(db_session)
+        from_index = [book.id for book in await service.get_also_bought(books[0].id)]
+
+        assert from_sql == from_index == [books[1].id]
+
+    async def test_also_bought_skips_deleted_books(self, db_session, sample_user, books):
+        await place_order(db_session, sample_user, books[:3])
+        await copurchase_index.build(db_session)
+        books[1].is_deleted = True
+        await db_session.commit()
+
+        service = RecommendationService(db_session)
+        assert [book.id for book in await service.get_also_bought(books[0].id)] == [books[2].id]
+
+    async def test_paid_transition_updates_index(self, db_session, sample_user, books):
+        await copurchase_index.build(db_session)
+        order = await place_order(db_session, sample_user, books[1:3], status=OrderStatus.PENDING)
+
+        await OrderService(db_session).update_order_status(order.id, OrderStatusUpdate(status=OrderStatus.PAID))
+        assert copurchase_index.top(books[1].id, 5) == [books[2].id]
+
+    async def test_catch_up_is_idempotent(self, db_session, sample_user, books):
+        await copurchase_index.build(db_session)
+        await place_order(db_session, sample_user, books[:2])
+
+        assert await copurchase_index.catch_up(db_session) == 1
+        assert await copurchase_index.catch_up(db_session) == 0
+        await copurchase_index.compact()
+        assert list(copurchase_index.counts) == [1, 1]
+
+    async def test_warm_loads_snapshot_and_catches_up(self, db_session, sample_user, books, tmp_path):
+        path = str(tmp_path / "copurchase.idx")
+        await place_order(db_session, sample_user, books[:2])
+        await copurchase_index.warm(db_session, path)
+
+        await place_order(db_session, sample_user, [books[0], books[3]])
+        restarted = CoPurchaseIndex()
+        await restarted.warm(db_session, path)
+        assert sorted(restarted.top(books[0].id, 5)) == sorted([books[1].id, books[3].id])
+
+    async def test_overlapping_catch_ups_count_each_order_once(self, db_session, sample_user, books, monkeypatch):
+        index = CoPurchaseIndex()
+        await index.build(db_session)
+        await place_order(db_session, sample_user, books[:2])
+
+        paid_orders = index._paid_orders
+
+        async def slow_paid_orders(db, after):
+            orders = await paid_orders(db, after)
+            await asyncio.sleep(0.01)
+            return orders
+
+        monkeypatch.setattr(index, "_paid_orders", slow_paid_orders)
+        assert sorted(await asyncio.gather(index.catch_up(db_session), index.catch_up(db_session))) == [0, 1]
+        await index.compact()
+        assert list(index.counts) == [1, 1]
+
+    async def test_late_committed_payment_below_watermark_is_counted_once(self, db_session, sample_user, books):
+        early = await place_order(db_session, sample_user, books[:2], status=OrderStatus.PENDING)
+        late = await place_order(db_session, sample_user, books[2:], status=OrderStatus.PENDING)
+        # The later order's PAID row took a higher id but became visible first
+        db_session.add(OrderStatusHistory(id=500, order_id=late.id, status=OrderStatus.PAID))
+        await db_session.commit()
+        await copurchase_index.build(db_session)
+        assert copurchase_index.watermark == 500
+
+        db_session.add(OrderStatusHistory(id=400, order_id=early.id, status=OrderStatus.PAID))
+        await db_session.commit()
+        assert await copurchase_index.catch_up(db_session) == 1
+        assert await copurchase_index.catch_up(db_session) == 0
+        assert copurchase_index.top(books[0].id, 5) == [books[1].id]
+        assert copurchase_index.top(books[2].id, 5) == [books[3].id]
+
+    async def test_snapshot_keeps_orders_applied_within_the_window(self, db_session, sample_user, books, tmp_path):
+        path = str(tmp_path / "copurchase.idx")
+        await place_order(db_session, sample_user, books[:2])
+        await copurchase_index.warm(db_session, path)
+
+        restarted = CoPurchaseIndex()
+        await restarted.warm(db_session, path)
+        assert list(restarted.counts) == [1, 1]
+        assert [p.name for p in tmp_path.iterdir()] == ["copurchase.idx"]
+
+    async def test_warm_survives_an_unwritable_snapshot_path(self, db_session, sample_user, books, tmp_path):
+        blocker = tmp_path / "file"
+        blocker.write_text("")
+        await place_order(db_session, sample_user, books[:2])
+
+        await copurchase_index.warm(db_session, str(blocker / "copurchase.idx"))
+        assert copurchase_index.ready is True
+        assert copurchase_index.top(books[0].id, 5) == [books[1].id]
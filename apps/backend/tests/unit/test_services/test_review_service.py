@@ -0,0 +1,100 @@
+import pytest
+from decimal import Decimal
+
+from app.models.book import Book
+from app.models.user import User
+from app.schemas.review import ReviewCreate, ReviewUpdate
+from app.services.review import ReviewService
+
+
+@pytest.fixture
+async def book(db_session):
+    book = Book(title="Rated Book", author="Author", isbn="9990000000001", price=Decimal("10.00"))
+    db_session.add(book)
+    await db_session.commit()
+    return book
+
+
+@pytest.fixture
+async def reviewers(db_session):
+    users = [User(email=f"reviewer{i}@example.com", full_name=f"Reviewer {i}") for i in range(3)]
+    db_session.add_all(users)
+    await db_session.commit()
+    return users
+
+
+async def review(service, user, book, rating, comment=None):
+    return await service.create_review(user.id, book.id, ReviewCreate(rating=rating, comment=comment))
+
+
+@pytest.mark.asyncio
+class TestReviewService:
+    async def test_create_updates_aggregates(self, db_session, book, reviewers):
+        service = ReviewService(db_session)
+        await review(service, reviewers[0], book, 5)
+        await review(service, reviewers[1], book, 4)
+
+        assert book.review_count == 2
+        assert book.rating_sum == 9
+        assert book.rating == Decimal("4.50")
+        assert book.rating_histogram == {1: 0, 2: 0, 3: 0, 4: 1, 5: 1}
+
+    async def test_unapproved_review_not_counted(self, db_session, book, reviewers):
+        service = ReviewService(db_session)
+        await review(service, reviewers[0], book, 5)
+        await review(service, reviewers[1], book, 1, comment="this is spam")
+
+        assert book.review_count == 1
+        assert book.rating == Decimal("5.00")
+        assert book.rating_1_count == 0
+
+    async def test_update_moves_rating_between_stars(self, db_session, book, reviewers):
+        service = ReviewService(db_session)
+        first = await review(service, reviewers[0], book, 5)
+        await review(service, reviewers[1], book, 2)
+
+        await service.update_review(reviewers[0].id, first.id, ReviewUpdate(rating=3))
+
+        assert book.review_count == 2
+        assert book.rating_sum == 5
+        assert book.rating == Decimal("2.50")
+        assert book.rating_histogram == {1: 0, 2: 1, 3: 1, 4: 0, 5: 0}
+
+    async def test_approve_and_delete(self, db_session, book, reviewers):
+        service = ReviewService(db_session)
+        pending = await review(service, reviewers[0], book, 2, comment="total scam")
+        await review(service, reviewers[1], book, 4)
+        assert book.review_count == 1
+
+        await service.approve_review(pending.id)
+        assert book.review_count == 2
+        assert book.rating == Decimal("3.00")
+
+        await service.delete_review(reviewers[0].id, pending.id)
+        assert book.review_count == 1
+        assert book.rating_sum == 4
+        assert book.rating_histogram[2] == 0
+
+    async def test_rating_rounds_half_up(self, db_session, book, reviewers):
+        service = ReviewService(db_session)
+        for user, rating in zip(reviewers, (5, 5, 3)):
+            await review(service, user, book, rating)
+
+        assert book.rating == Decimal("4.33")
+
+    async def test_rebuild_detects_and_repairs_drift(self, db_session, sample_book, book, reviewers):
+        service = ReviewService(db_session)
+        await review(service, reviewers[0], book, 4)
+        await review(service, reviewers[1], book, 3)
+
+        # sample_book claims five reviews that do not exist
+        drifted = await service.rebuild_book_ratings(batch_size=1, repair=False)
+        assert drifted == [sample_book.id]
+
+        drifted = await service.rebuild_book_ratings(batch_size=1)
+        assert drifted == [sample_book.id]
+
+        await db_session.refresh(sample_book)
+        assert sample_book.review_count == 0
+        assert sample_book.rating == Decimal("0.00")
+        assert await service.rebuild_book_ratings() == []
@@ -0,0 +1,51 @@
+import time
+
+from app.utils.cache import TTLCache, cache_stats, clear_caches
+
+
+class TestTTLCache:
+    def test_get_and_set(self):
+        cache = TTLCache("test_get_and_set", maxsize=10, ttl=60)
+        assert cache.get("a") is None
+        cache.set("a", 1)
+        assert cache.get("a") == 1
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_entries_expire(self, monkeypatch):
+        cache = TTLCache("test_entries_expire", maxsize=10, ttl=5)
+        now = time.monotonic()
+        monkeypatch.setattr(time, "monotonic", lambda: now)
+        cache.set("a", 1)
+        monkeypatch.setattr(time, "monotonic", lambda: now + 6)
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+    def test_evicts_least_recently_used(self):
+        cache = TTLCache("test_evicts_lru", maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+
+    def test_pop(self):
+        cache = TTLCache("test_pop", maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.pop("a")
+        cache.pop("missing")
+        assert cache.get("a") is None
+
+    def test_stats_and_clear(self):
+        cache = TTLCache("test_stats_and_clear", maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.get("a")
+        cache.get("b")
+        stats = next(s for s in cache_stats() if s.name == "test_stats_and_clear")
+        assert stats.hit_ratio == 0.5
+        assert stats.size == 1
+
+        clear_caches()
+        assert len(cache) == 0
+        assert cache.stats().hit_ratio == 0.0
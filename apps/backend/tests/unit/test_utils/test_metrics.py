@@ -0,0 +1,59 @@
+import pytest
+
+from app.utils import metrics
+from app.utils.cache import TTLCache
+from app.utils.metrics import Counter, Gauge, Histogram
+
+
+@pytest.fixture
+def registered():
+    """Metrics created by the test, unregistered afterwards."""
+    before = list(metrics._registry)
+    yield
+    metrics._registry[:] = before
+
+
+class TestMetrics:
+    def test_counter_and_gauge(self, registered):
+        requests = Counter("test_requests_total", "Requests", ("route",))
+        requests.inc("/books")
+        requests.inc("/books", amount=2)
+        in_progress = Gauge("test_in_progress", "In flight")
+        in_progress.inc()
+        in_progress.dec()
+
+        assert list(requests.render()) == [
+            "# HELP test_requests_total Requests",
+            "# TYPE test_requests_total counter",
+            'test_requests_total{route="/books"} 3',
+        ]
+        assert list(in_progress.samples()) == ["test_in_progress 0"]
+
+    def test_histogram_buckets_are_cumulative(self, registered):
+        latency = Histogram("test_latency_seconds", "Latency", ("route",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            latency.observe(value, "/books")
+
+        assert list(latency.samples()) == [
+            'test_latency_seconds_bucket{route="/books",le="0.1"} 2',
+            'test_latency_seconds_bucket{route="/books",le="1.0"} 3',
+            'test_latency_seconds_bucket{route="/books",le="+Inf"} 4',
+            'test_latency_seconds_sum{route="/books"} 3.65',
+            'test_latency_seconds_count{route="/books"} 4',
+        ]
+
+    def test_label_values_are_escaped(self, registered):
+        errors = Counter("test_errors_total", "Errors", ("message",))
+        errors.inc('say "hi"\\n')
+        assert list(errors.samples()) == ['test_errors_total{message="say \\"hi\\"\\\\n"} 1']
+
+    def test_render_includes_cache_ratios(self):
+        cache = TTLCache("metrics_test", maxsize=10)
+        cache.set("key", 1)
+        cache.get("key")
+        cache.get("missing")
+
+        text = metrics.render()
+        assert 'cache_hit_ratio{cache="metrics_test"} 0.5' in text
+        assert 'cache_entries{cache="metrics_test"} 1' in text
+        assert text.endswith("\n")
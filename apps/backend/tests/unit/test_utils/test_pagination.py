@@ -1,5 +1,19 @@
 import pytest
-from app.utils.pagination import PaginationParams, PaginatedResponse
+from datetime import datetime
+from decimal import Decimal
+from types import SimpleNamespace
+
+from app.exceptions import BadRequestException
+from app.models.book import Book
+from app.utils.pagination import (
+    PaginationParams,
+    PaginatedResponse,
+    TotalMode,
+    encode_cursor,
+    decode_cursor,
+    next_cursor,
+    split_page,
+)
 
 
 class TestPaginationParams:
@@ -76,3 +90,68 @@ class TestPaginatedResponse:
     def test_create_with_zero_size(self):
         response = PaginatedResponse.create(items=[1, 2], total=10, page=1, size=0)
         assert response.pages == 0
+
+    def test_create_with_next_cursor(self):
+        response = PaginatedResponse.create(items=[1], total=50, page=1, size=1, next_cursor="abc")
+        assert response.next_cursor == "abc"
+
+    def test_create_without_next_cursor(self):
+        response = PaginatedResponse.create(items=[1], total=1, page=1, size=20)
+        assert response.next_cursor is None
+
+    def test_has_more_derived_from_total(self):
+        assert PaginatedResponse.create(items=[1], total=3, page=1, size=1).has_more is True
+        assert PaginatedResponse.create(items=[1], total=3, page=3, size=1).has_more is False
+
+    def test_create_without_total(self):
+        response = PaginatedResponse.create(items=[1], total=None, page=1, size=1, has_more=True)
+        assert response.total is None
+        assert response.pages is None
+        assert response.has_more is True
+
+    def test_total_mode_values(self):
+        assert TotalMode("false") is TotalMode.NONE
+        assert TotalMode("estimate") is TotalMode.ESTIMATE
+
+
+class TestCursor:
+    def test_roundtrip_datetime(self):
+        created_at = datetime(2026, 3, 4, 5, 6, 7, 891011)
+        cursor = encode_cursor("created_at:desc", created_at, 42)
+        assert decode_cursor(cursor, "created_at:desc", Book.created_at) == (created_at, 42)
+
+    def test_roundtrip_decimal(self):
+        cursor = encode_cursor("price:asc", Decimal("19.99"), 7)
+        assert decode_cursor(cursor, "price:asc", Book.price) == (Decimal("19.99"), 7)
+
+    def test_cursor_is_url_safe(self):
+        cursor = encode_cursor("title:asc", "??>>", 1)
+        assert "=" not in cursor and "+" not in cursor and "/" not in cursor
+
+    def test_decode_rejects_other_sort(self):
+        cursor = encode_cursor("price:asc", Decimal("1.00"), 1)
+        with pytest.raises(BadRequestException):
+            decode_cursor(cursor, "price:desc", Book.price)
+
+    def test_decode_rejects_garbage(self):
+        with pytest.raises(BadRequestException):
+            decode_cursor("not-a-cursor", "created_at:desc", Book.created_at)
+
+    def test_next_cursor_last_page(self):
+        assert next_cursor([SimpleNamespace(id=1, created_at=datetime(2026, 1, 1))], False, "k", "created_at") is None
+
+    def test_next_cursor_has_more(self):
+        items = [SimpleNamespace(id=i, price=Decimal("5.00")) for i in (3, 2)]
+        cursor = next_cursor(items, True, "price:desc", "price")
+        assert decode_cursor(cursor, "price:desc", Book.price) == (Decimal("5.00"), 2)
+
+
+class TestSplitPage:
+    def test_probe_row_means_more(self):
+        assert split_page([1, 2, 3], 2) == ([1, 2], True)
+
+    def test_exact_page_is_last(self):
+        assert split_page([1, 2], 2) == ([1, 2], False)
+
+    def test_empty(self):
+        assert split_page([], 5) == ([], False)
@@ -0,0 +1,89 @@
+import pytest
+from datetime import datetime, timedelta
+from fastapi import Request
+
+from app.utils.response_cache import (
+    BOOKS,
+    GENERATION,
+    CacheBackend,
+    ResponseCache,
+    book_key,
+    etag_matches,
+    http_date,
+    not_modified,
+    versions_etag,
+)
+
+
+@pytest.mark.asyncio
+class TestResponseCache:
+    async def test_bump_changes_version(self):
+        cache = ResponseCache(maxsize=10)
+        books, generation = await cache.version(BOOKS), await cache.version(GENERATION)
+        await cache.bump(BOOKS)
+        assert await cache.version(BOOKS) == books + 1
+        assert await cache.version(GENERATION) == generation + 1
+
+    async def test_entry_current_until_a_dependency_moves(self):
+        cache = ResponseCache(maxsize=10)
+        depends = await cache.versions([BOOKS, book_key(1)])
+        assert await cache.is_current(depends)
+
+        await cache.bump(book_key(2))
+        assert await cache.is_current(depends)
+        await cache.bump(book_key(1))
+        assert not await cache.is_current(depends)
+
+    async def test_get_and_set(self):
+        cache = ResponseCache(maxsize=10)
+        assert await cache.get("key") is None
+        await cache.set("key", b"body")
+        assert await cache.get("key") == b"body"
+
+    async def test_shared_backend_across_workers(self):
+        backend = CacheBackend()
+        first, second = ResponseCache(maxsize=10, backend=backend), ResponseCache(maxsize=10, backend=backend)
+
+        await first.set("key", b"body")
+        assert await second.get("key") == b"body"
+        assert len(second.local) == 1
+
+        await first.bump(BOOKS)
+        assert await second.version(BOOKS) == await first.version(BOOKS)
+
+    @pytest.mark.parametrize("build", [
+        lambda: ResponseCache(maxsize=10),
+        lambda: ResponseCache(maxsize=10, backend=CacheBackend()),
+    ])
+    async def test_restarted_cache_rejects_old_etags(self, build):
+        cache = build()
+        await cache.bump(BOOKS)
+        before = await cache.versions([BOOKS, book_key(1)])
+
+        restarted = build()
+        await restarted.bump(BOOKS)
+        after = await restarted.versions([BOOKS, book_key(1)])
+        assert not await restarted.is_current(before)
+        assert versions_etag(after) != versions_etag(before)
+
+
+class TestConditionalRequests:
+    def test_etag_matches(self):
+        assert etag_matches('"a", W/"b"', '"b"')
+        assert etag_matches("*", '"b"')
+        assert not etag_matches('"a"', '"b"')
+        assert not etag_matches(None, '"b"')
+
+    def test_not_modified_since(self):
+        updated_at = datetime(2026, 1, 2, 3, 4, 5, 678)
+        request = Request({"type": "http", "headers": [(b"if-modified-since", http_date(updated_at).encode())]})
+        assert not_modified(request, '"x"', updated_at)
+        assert not not_modified(request, '"x"', updated_at + timedelta(seconds=1))
+
+    def test_if_none_match_takes_precedence(self):
+        updated_at = datetime(2026, 1, 2)
+        request = Request({"type": "http", "headers": [
+            (b"if-none-match", b'"old"'),
+            (b"if-modified-since", http_date(updated_at).encode()),
+        ]})
+        assert not not_modified(request, '"new"', updated_at)
@@ -1,3 +1,5 @@
+import asyncio
+import threading
 import pytest
 from datetime import timedelta
 from app.utils.security import (
@@ -6,7 +8,12 @@ from app.utils.security import (
     create_access_token,
     create_refresh_token,
     decode_token,
+    token_identifier,
+    PasswordHasher,
+    get_password_hash_async,
+    verify_password_async,
 )
+from app.exceptions import ServiceUnavailableException
 from app.config import get_settings
 
 
@@ -101,3 +108,47 @@ class TestDecodeToken:
         token = jwt.encode(payload_data, wrong_secret, algorithm=settings.algorithm)
         decoded = decode_token(token)
         assert decoded is None
+
+    def test_tokens_have_unique_jti(self):
+        first = decode_token(create_access_token(1))
+        second = decode_token(create_access_token(1))
+        assert first["jti"] != second["jti"]
+        assert token_identifier("ignored", first) == first["jti"]
+
+    def test_token_identifier_without_jti(self):
+        identifier = token_identifier("legacy.token.value", {"sub": "1"})
+        assert len(identifier) == 64
+        assert identifier == token_identifier("legacy.token.value", {})
+
+
+@pytest.mark.asyncio
+class TestPasswordHasher:
+    async def test_async_hash_and_verify(self):
+        hashed = await get_password_hash_async("secret123")
+        assert await verify_password_async("secret123", hashed) is True
+        assert await verify_password_async("wrong", hashed) is False
+
+    async def test_rejects_when_saturated(self):
+        hasher = PasswordHasher(workers=1, max_pending=1)
+        release = threading.Event()
+        blocked = asyncio.ensure_future(hasher.run(release.wait, 5))
+        await asyncio.sleep(0)
+
+        with pytest.raises(ServiceUnavailableException) as exc_info:
+            await hasher.run(get_password_hash, "secret123")
+        assert exc_info.value.status_code == 503
+        assert exc_info.value.headers["Retry-After"] == "1"
+
+        release.set()
+        await blocked
+        assert hasher.pending == 0
+        assert verify_password("secret123", await hasher.run(get_password_hash, "secret123"))
+        hasher.shutdown()
+
+    async def test_process_executor(self):
+        hasher = PasswordHasher(workers=1, max_pending=4, executor="process")
+        try:
+            hashed = await hasher.run(get_password_hash, "secret123")
+            assert await hasher.run(verify_password, "secret123", hashed) is True
+        finally:
+            hasher.shutdown()